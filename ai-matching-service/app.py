@@ -3,17 +3,46 @@ AI-Powered Livestock Buyer-Seller Matching Service
 Built with AWS Chalice and Amazon Bedrock
 """
 from chalice import Chalice, Response
+import base64
+import hashlib
+import hmac
 import json
 import logging
-import boto3
 import os
+import sys
 import math
 import re
-from boto3.dynamodb.conditions import Key, Attr
-from typing import Dict, List, Any, Optional
+import time
+import random
+import threading
+import queue
+import bisect
+import heapq
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Iterator
 from decimal import Decimal
 from datetime import datetime
 
+from chalicelib.catalog_artifact import (
+    ARTIFACT_NAME, FLOAT, ID_LIST, PRODUCT_COLUMNS, SELLER_COLUMNS,
+    catalog_fingerprint, read_catalog_artifact
+)
+
+# boto3 and numpy dominate import time, so both are imported on first use:
+# boto3 when the service first touches DynamoDB, numpy when a snapshot is built
+@lru_cache(maxsize=None)
+def _numpy():
+    """The numpy module, or None when it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
 app = Chalice(app_name='livestock-matching-ai')
 app.log.setLevel(logging.INFO)
 
@@ -30,17 +59,394 @@ def get_config():
         'aws_region': os.getenv('AWS_DEFAULT_REGION', 'eu-west-1'),
         'products_table_name': os.getenv('PRODUCTS_TABLE_NAME', 'livestock-marketplace-dev-livestock-products'),
         'sellers_table_name': os.getenv('SELLERS_TABLE_NAME', 'livestock-marketplace-dev-livestock-sellers'),
+        'catalog_snapshot_enabled': os.getenv('CATALOG_SNAPSHOT_ENABLED', 'true').lower() == 'true',
+        'catalog_ttl_seconds': int(os.getenv('CATALOG_TTL_SECONDS', '300')),
+        'catalog_retry_seconds': int(os.getenv('CATALOG_RETRY_SECONDS', '30')),
+        'catalog_artifact_path': os.getenv('CATALOG_ARTIFACT_PATH'),
+        'scan_segments': int(os.getenv('DYNAMODB_SCAN_SEGMENTS', '4')),
+        'batch_get_workers': int(os.getenv('DYNAMODB_BATCH_GET_WORKERS', '4')),
+        'search_cache_size': int(os.getenv('SEARCH_CACHE_SIZE', '1024')),
+        'search_cache_ttl_seconds': int(os.getenv('SEARCH_CACHE_TTL_SECONDS', '300')),
+        'http_cache_max_age_seconds': int(os.getenv('HTTP_CACHE_MAX_AGE_SECONDS', '60')),
+        'cursor_signing_key': os.getenv('CURSOR_SIGNING_KEY'),
     }
 
+# BatchGetItem limits
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_BASE_DELAY_SECONDS = 0.05
+
+# Version item the data loaders write last to each table (see delta_load.py):
+# its CatalogVersion changes whenever any other item of the table does
+CATALOG_VERSION_KEY = '#catalog-version'
+CATALOG_VERSION_ATTRIBUTE = 'CatalogVersion'
+
+# Catalog snapshot artifacts, checked in order when no CATALOG_ARTIFACT_PATH is set:
+# one written to the container's /tmp, then one shipped in the deployment package
+CATALOG_ARTIFACT_PATHS = (
+    os.path.join('/tmp', ARTIFACT_NAME),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chalicelib', ARTIFACT_NAME),
+)
+
+# Number of ranked sellers returned by a search, by default and at most per page
+DEFAULT_RESULT_LIMIT = 10
+MAX_RESULT_LIMIT = 50
+
+# Longest accepted /search query, in characters
+MAX_QUERY_LENGTH = 500
+
+# Most queries accepted by one /search/batch request
+MAX_BATCH_QUERIES = 100
+
+# Parsed queries kept per container, keyed by canonical query form
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '2048'))
+
+# Vectorized relevance scoring: columns of CatalogSnapshot.score_features with the
+# scale and weight _calculate_relevance_score applies to each (35/25/20/15%)
+SCORE_FEATURES = ('Rating', 'StockScore', 'PriceScore', 'DeliveryScore')
+SCORE_SCALES = (5.0, 100.0, 100.0, 100.0)
+SCORE_WEIGHTS = (0.35, 0.25, 0.20, 0.15)
+
+# Nigerian states accepted in "in <name> state" searches, keyed by lowercase name
+NIGERIAN_STATES = {
+    'kaduna': 'Kaduna', 'lagos': 'Lagos', 'fct': 'FCT', 'kano': 'Kano',
+    'oyo': 'Oyo', 'rivers': 'Rivers', 'edo': 'Edo', 'borno': 'Borno',
+    'plateau': 'Plateau', 'kwara': 'Kwara', 'imo': 'Imo', 'sokoto': 'Sokoto',
+    'enugu': 'Enugu', 'bauchi': 'Bauchi', 'benue': 'Benue', 'taraba': 'Taraba',
+    'kebbi': 'Kebbi', 'zamfara': 'Zamfara'
+}
+
+# Generic searches that expand to every breed of the same species
+RELATED_TYPE_SPECIES = {
+    'Sheep Yankasa': 'Sheep',
+    'Cattle Sokoto Gudali': 'Cattle',
+    'Poultry Broiler': 'Poultry',
+    'Fish Tilapia': 'Fish',
+}
+
+# Compact catalog records
+_MISSING_FIELD = object()
+
+class CatalogRecord(Mapping):
+    """
+    Read-only catalog item converted once from a DynamoDB item. Attributes
+    live in __slots__ rather than a per-item dict, numeric attributes are
+    floats, and shared strings are interned. Supports the dict read interface
+    (get, [], in, keys, copy) the service uses on raw items. Attributes
+    outside the catalog artifact schema are dropped.
+    """
+    __slots__ = ()
+    FLOAT_FIELDS = frozenset()
+    INTERNED_FIELDS = frozenset()
+    ID_LIST_FIELDS = frozenset()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.__slots__)
+    
+    def __init__(self, item: Dict[str, Any]):
+        for name in self.__slots__:
+            if name not in item:
+                continue
+            value = item[name]
+            if name in self.FLOAT_FIELDS:
+                value = float(value)
+            elif name in self.ID_LIST_FIELDS:
+                value = tuple(sys.intern(str(v)) for v in value)
+            elif name in self.INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, name, value)
+    
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self._field_set:
+            return getattr(self, name, default)
+        return default
+    
+    def __getitem__(self, name: str) -> Any:
+        value = self.get(name, _MISSING_FIELD)
+        if value is _MISSING_FIELD:
+            raise KeyError(name)
+        return value
+    
+    def __iter__(self):
+        return (name for name in self.__slots__ if hasattr(self, name))
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+class SellerRecord(CatalogRecord):
+    __slots__ = tuple(SELLER_COLUMNS)
+    FLOAT_FIELDS = frozenset(name for name, kind in SELLER_COLUMNS.items() if kind == FLOAT)
+    INTERNED_FIELDS = frozenset({'SellerId', 'City', 'State'})
+    ID_LIST_FIELDS = frozenset(name for name, kind in SELLER_COLUMNS.items() if kind == ID_LIST)
+
+class ProductRecord(CatalogRecord):
+    __slots__ = tuple(PRODUCT_COLUMNS)
+    FLOAT_FIELDS = frozenset(name for name, kind in PRODUCT_COLUMNS.items() if kind == FLOAT)
+    INTERNED_FIELDS = frozenset({'ProductId', 'LivestockType', 'Species', 'Breed'})
+    ID_LIST_FIELDS = frozenset(name for name, kind in PRODUCT_COLUMNS.items() if kind == ID_LIST)
+
+# Catalog snapshot
+class CatalogSnapshot:
+    """
+    Read-only, fully indexed copy of the products and sellers tables, held
+    as ProductRecord/SellerRecord rows. A snapshot is built completely before
+    it is published and is never mutated afterwards, so callers must copy
+    items before decorating them. table_versions holds the tables' version
+    items read before the snapshot was scanned, when they had them.
+    """
+    def __init__(self, products: List[Dict[str, Any]], sellers: List[Dict[str, Any]],
+                 version: Optional[str] = None, table_versions: Optional[tuple] = None):
+        # Segmented scans return items in arbitrary order; keep snapshots deterministic
+        products = sorted(products, key=lambda p: str(p.get('ProductId')))
+        sellers = sorted(sellers, key=lambda s: str(s.get('SellerId')))
+        self.version = version or catalog_fingerprint(products, sellers)
+        self.table_versions = table_versions
+        self.products = [ProductRecord(product) for product in products]
+        self.sellers = [SellerRecord(seller) for seller in sellers]
+        self.loaded_at = time.monotonic()
+        
+        self.sellers_by_id = {}
+        self.sellers_by_city = defaultdict(list)
+        self.sellers_by_state = defaultdict(list)
+        for seller in self.sellers:
+            self.sellers_by_id[seller['SellerId']] = seller
+            self.sellers_by_city[seller.get('City')].append(seller)
+            self.sellers_by_state[seller.get('State')].append(seller)
+        
+        self.products_by_type = defaultdict(list)
+        self.products_by_species = defaultdict(list)
+        self.products_by_seller = defaultdict(list)
+        for product in self.products:
+            self.products_by_type[product.get('LivestockType')].append(product)
+            self.products_by_species[product.get('Species')].append(product)
+            for seller_id in set(product.get('SellerIds', [])):
+                self.products_by_seller[seller_id].append(product)
+        
+        # Plain dicts so lookups of unknown keys never grow a published index
+        self.sellers_by_city = dict(self.sellers_by_city)
+        self.sellers_by_state = dict(self.sellers_by_state)
+        self.products_by_type = dict(self.products_by_type)
+        self.products_by_species = dict(self.products_by_species)
+        self.products_by_seller = dict(self.products_by_seller)
+        
+        # Range indexes: (sorted keys, items in the same order) for bisect lookups
+        def min_price(product):
+            return float(product.get('MinPrice', 0))
+        
+        def capacity(seller):
+            return float(seller.get('QuantityTonsAvailable', 0))
+        
+        sellers_by_type = {}
+        for livestock_type, products in self.products_by_type.items():
+            seller_ids = {sid for product in products for sid in product.get('SellerIds', [])}
+            sellers_by_type[livestock_type] = [self.sellers_by_id[sid] for sid in sorted(seller_ids) if sid in self.sellers_by_id]
+        
+        self._price_by_type = {t: self._range_index(items, min_price) for t, items in self.products_by_type.items()}
+        self._price_by_species = {sp: self._range_index(items, min_price) for sp, items in self.products_by_species.items()}
+        self._capacity_by_type = {t: self._range_index(items, capacity) for t, items in sellers_by_type.items()}
+        self._capacity_all = self._range_index(self.sellers, capacity)
+        
+        # Contiguous seller score columns for batch relevance scoring
+        self.score_rows = {seller['SellerId']: row for row, seller in enumerate(self.sellers)}
+        self.score_features = None
+        np = _numpy()
+        if np is not None:
+            self.score_features = np.array(
+                [[float(seller.get(name, 0)) for name in SCORE_FEATURES] for seller in self.sellers],
+                dtype=np.float64
+            ).reshape(len(self.sellers), len(SCORE_FEATURES))
+    
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.loaded_at
+    
+    def renew(self) -> None:
+        """Restart the TTL of a snapshot the tables were found not to have changed since"""
+        self.loaded_at = time.monotonic()
+    
+    def products_of_type_under(self, livestock_type: str, max_price: float) -> List[Dict[str, Any]]:
+        """Products of a LivestockType with MinPrice <= max_price, cheapest first"""
+        keys, products = self._price_by_type.get(livestock_type, ([], []))
+        return products[:bisect.bisect_right(keys, max_price)]
+    
+    def products_of_species_under(self, species: str, max_price: float) -> List[Dict[str, Any]]:
+        """Products of a species with MinPrice <= max_price, cheapest first"""
+        keys, products = self._price_by_species.get(species, ([], []))
+        return products[:bisect.bisect_right(keys, max_price)]
+    
+    def sellers_with_capacity(self, min_tons: float, livestock_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sellers (of a LivestockType, if given) with at least min_tons available, largest first"""
+        if livestock_type is None:
+            keys, sellers = self._capacity_all
+        else:
+            keys, sellers = self._capacity_by_type.get(livestock_type, ([], []))
+        return sellers[bisect.bisect_left(keys, min_tons):][::-1]
+    
+    @staticmethod
+    def _range_index(items: List[Dict[str, Any]], key) -> tuple:
+        # Ties keep the snapshot's ID order so slices are deterministic
+        ordered = sorted(items, key=key)
+        return [key(item) for item in ordered], ordered
+
+# Request-scoped read cache
+class RequestReadCache:
+    """
+    Unit of work for a single request: remembers the result of every table
+    read so that repeated reads (e.g. the /search location fallback) are
+    served from memory, and counts how many reads were avoided.
+    """
+    def __init__(self):
+        self._reads = {}
+        self._lock = threading.Lock()
+        self.table_reads = 0
+        self.reads_avoided = 0
+    
+    def read(self, key: tuple, loader) -> List[Dict[str, Any]]:
+        with self._lock:
+            if key in self._reads:
+                self.reads_avoided += 1
+                return self._reads[key]
+            self.table_reads += 1
+        items = loader()
+        with self._lock:
+            self._reads[key] = items
+        return items
+    
+    def derive(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return a cached superset read (counted as avoided), or None"""
+        with self._lock:
+            items = self._reads.get(key)
+            if items is not None:
+                self.reads_avoided += 1
+            return items
+
+# Search response cache
+class SearchResponseCache:
+    """
+    Bounded LRU of /search responses keyed by normalized query params and
+    valid for a single catalog version. Entries expire after ttl_seconds, and
+    all entries are dropped as soon as a lookup sees a new catalog version.
+    Cached responses are shared between requests and must not be mutated.
+    """
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def key(params: Dict[str, Any], offset: int = 0, limit: int = DEFAULT_RESULT_LIMIT) -> str:
+        return json.dumps([params, offset, limit], sort_keys=True, default=str)
+    
+    def get(self, version: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if version != self._version:
+                self._invalidate(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, response = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, version: str, key: str, response: Dict[str, Any]) -> None:
+        with self._lock:
+            # The catalog changed while this response was built
+            if version != self._version:
+                return
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self._invalidate(None)
+    
+    def _invalidate(self, version: Optional[str]) -> None:
+        if self._entries:
+            self.invalidations += 1
+            self._entries.clear()
+        self._version = version
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations,
+                'size': len(self._entries), 'max_size': self.max_size, 'catalog_version': self._version,
+            }
+
+def _without_version_item(items: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    return (item for item in items
+            if CATALOG_VERSION_KEY not in (item.get('ProductId'), item.get('SellerId')))
+
 # Matching Service
 class LivestockMatchingService:
     def __init__(self):
         self.config = get_config()
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.config['aws_region'])
-        self.products_table = self.dynamodb.Table(self.config['products_table_name'])
-        self.sellers_table = self.dynamodb.Table(self.config['sellers_table_name'])
+        
+        # DynamoDB resource and tables, created on first data access
+        self._dynamodb = None
+        self._products_table = None
+        self._sellers_table = None
+        self._connect_lock = threading.Lock()
+        
+        # Per-container catalog snapshot, swapped as a whole on refresh
+        self._catalog = None
+        self._catalog_load_lock = threading.Lock()
+        self._catalog_load_failed_at = None
+        self._catalog_refresh_lock = threading.Lock()
+        self._catalog_refresh_thread = None
+        
+        # Holds the RequestReadCache of the request running on this thread
+        self._request_local = threading.local()
+    
+    @property
+    def dynamodb(self):
+        if self._dynamodb is None:
+            self._connect()
+        return self._dynamodb
+    
+    @property
+    def products_table(self):
+        if self._dynamodb is None:
+            self._connect()
+        return self._products_table
     
-    def find_matching_sellers(self, params: Dict[str, Any], ignore_location_filter: bool = False) -> List[Dict[str, Any]]:
+    @property
+    def sellers_table(self):
+        if self._dynamodb is None:
+            self._connect()
+        return self._sellers_table
+    
+    def _connect(self) -> None:
+        """Create the boto3 resource and Table objects once per container"""
+        with self._connect_lock:
+            if self._dynamodb is not None:
+                return
+            import boto3
+            dynamodb = boto3.resource('dynamodb', region_name=self.config['aws_region'])
+            self._products_table = dynamodb.Table(self.config['products_table_name'])
+            self._sellers_table = dynamodb.Table(self.config['sellers_table_name'])
+            # Published last: readers that see the resource also see both tables
+            self._dynamodb = dynamodb
+    
+    def find_matching_sellers(self, params: Dict[str, Any], ignore_location_filter: bool = False,
+                              limit: int = DEFAULT_RESULT_LIMIT) -> List[Dict[str, Any]]:
         try:
             # For location notice logic, we need to get all sellers first, then filter by location later
             if ignore_location_filter:
@@ -48,40 +454,29 @@ class LivestockMatchingService:
                 sellers = self._get_all_sellers()
             else:
                 sellers = self._get_filtered_sellers(params)
+            
             app.log.info(f"Found {len(sellers)} sellers")
             
             products = self._get_matching_products(params)
             app.log.info(f"Found {len(products)} products")
             
-            results = self._combine_and_rank_results(sellers, products, params)
+            results = self._combine_and_rank_results(sellers, products, params, limit)
             app.log.info(f"Combined results: {len(results)} matches")
             
-            return results[:10]
+            return results
         except Exception as e:
             app.log.error(f"Error finding matching sellers: {str(e)}")
             return []
     
     def get_top_rated_sellers(self, livestock_type: str, limit: int = 10) -> List[Dict[str, Any]]:
         try:
-            response = self.products_table.query(
-                IndexName='LivestockTypeIndex',
-                KeyConditionExpression=Key('LivestockType').eq(livestock_type)
-            )
-            
-            seller_ids = set()
-            for product in response['Items']:
-                seller_ids.update(product.get('SellerIds', []))
+            seller_ids = self._get_seller_ids_by_livestock_type(livestock_type)
             
             sellers = []
-            for seller_id in list(seller_ids)[:20]:
-                try:
-                    seller_response = self.sellers_table.get_item(Key={'SellerId': seller_id})
-                    if 'Item' in seller_response:
-                        seller = seller_response['Item']
-                        seller['Rating'] = float(seller.get('Rating', 0))
-                        sellers.append(seller)
-                except Exception:
-                    continue
+            for seller in self._get_sellers_by_ids(seller_ids):
+                seller = dict(seller)
+                seller['Rating'] = float(seller.get('Rating', 0))
+                sellers.append(seller)
             
             sellers.sort(key=lambda x: x['Rating'], reverse=True)
             return sellers[:limit]
@@ -90,60 +485,77 @@ class LivestockMatchingService:
             return []
     
     def find_sellers_by_proximity(self, location: str, radius_km: float, livestock_type: str = None) -> List[Dict[str, Any]]:
+        """
+        Up to 10 sellers within radius_km of a known location, nearest first
+        (ties by SellerId), as copies decorated with distance_km. Snapshot
+        sellers already hold float coordinates; outside the snapshot the
+        sellers table is scanned.
+        """
         try:
             ref_coords = self._get_location_coordinates(location)
             if not ref_coords:
                 return []
             
-            scan_params = {}
-            if livestock_type:
-                seller_ids = self._get_seller_ids_by_livestock_type(livestock_type)
+            seller_ids = self._get_seller_ids_by_livestock_type(livestock_type) if livestock_type else []
+            catalog = self.get_catalog()
+            if catalog is not None:
+                if seller_ids:
+                    candidates = [catalog.sellers_by_id[sid] for sid in seller_ids if sid in catalog.sellers_by_id]
+                else:
+                    candidates = catalog.sellers
+            else:
+                from boto3.dynamodb.conditions import Attr
+                
+                scan_params = {}
                 if seller_ids:
                     scan_params['FilterExpression'] = Attr('SellerId').is_in(seller_ids[:100])
+                candidates = self._scan_items(self.sellers_table, **scan_params)
             
-            response = self.sellers_table.scan(**scan_params)
-            
-            nearby_sellers = []
-            for seller in response['Items']:
+            nearby = []
+            for seller in candidates:
                 try:
-                    seller_lat = float(seller.get('Latitude', 0))
-                    seller_lon = float(seller.get('Longitude', 0))
-                    
                     distance = self._calculate_distance(
                         ref_coords['lat'], ref_coords['lon'],
-                        seller_lat, seller_lon
+                        float(seller.get('Latitude', 0)), float(seller.get('Longitude', 0))
                     )
-                    
-                    if distance <= radius_km:
-                        seller['distance_km'] = round(distance, 2)
-                        nearby_sellers.append(seller)
                 except Exception:
                     continue
+                if distance <= radius_km:
+                    nearby.append((round(distance, 2), seller['SellerId'], seller))
             
-            nearby_sellers.sort(key=lambda x: x['distance_km'])
-            return nearby_sellers[:10]
+            nearby_sellers = []
+            for distance, _, seller in heapq.nsmallest(10, nearby, key=lambda entry: entry[:2]):
+                seller = dict(seller)
+                seller['distance_km'] = distance
+                nearby_sellers.append(seller)
+            return nearby_sellers
         except Exception as e:
             app.log.error(f"Error finding sellers by proximity: {str(e)}")
             return []
     
     def find_bulk_suppliers(self, livestock_type: str, quantity_tons: float) -> List[Dict[str, Any]]:
         try:
+            catalog = self.get_catalog()
+            if catalog is not None:
+                bulk_suppliers = []
+                for seller in catalog.sellers_with_capacity(quantity_tons, livestock_type)[:10]:
+                    seller = dict(seller)
+                    seller['available_tons'] = float(seller.get('QuantityTonsAvailable', 0))
+                    seller['surplus_tons'] = seller['available_tons'] - quantity_tons
+                    bulk_suppliers.append(seller)
+                return bulk_suppliers
+            
             seller_ids = self._get_seller_ids_by_livestock_type(livestock_type)
             
             bulk_suppliers = []
-            for seller_id in seller_ids[:20]:
-                try:
-                    seller_response = self.sellers_table.get_item(Key={'SellerId': seller_id})
-                    if 'Item' in seller_response:
-                        seller = seller_response['Item']
-                        available_tons = float(seller.get('QuantityTonsAvailable', 0))
-                        
-                        if available_tons >= quantity_tons:
-                            seller['available_tons'] = available_tons
-                            seller['surplus_tons'] = available_tons - quantity_tons
-                            bulk_suppliers.append(seller)
-                except Exception:
-                    continue
+            for seller in self._get_sellers_by_ids(seller_ids):
+                available_tons = float(seller.get('QuantityTonsAvailable', 0))
+                
+                if available_tons >= quantity_tons:
+                    seller = dict(seller)
+                    seller['available_tons'] = available_tons
+                    seller['surplus_tons'] = available_tons - quantity_tons
+                    bulk_suppliers.append(seller)
             
             bulk_suppliers.sort(key=lambda x: x['available_tons'], reverse=True)
             return bulk_suppliers[:10]
@@ -153,11 +565,8 @@ class LivestockMatchingService:
     
     def get_popular_products(self) -> List[Dict[str, Any]]:
         try:
-            response = self.products_table.scan()
-            products = response['Items']
-            
             popularity_stats = {}
-            for product in products:
+            for product in self._iter_products():
                 livestock_type = product.get('LivestockType', 'Unknown')
                 seller_count = len(product.get('SellerIds', []))
                 
@@ -187,88 +596,450 @@ class LivestockMatchingService:
     def get_analysis_timestamp(self) -> str:
         return datetime.utcnow().isoformat() + 'Z'
     
+    def get_catalog(self) -> Optional[CatalogSnapshot]:
+        """
+        Return the container's catalog snapshot, loading it on first use.
+        A cold container boots from a catalog artifact when one is available
+        and reconciles it with the tables in the background; otherwise the
+        first call scans the tables. A snapshot older than the TTL keeps being
+        served while a background refresh builds its replacement. Returns None
+        when snapshots are disabled or the initial load fails, so callers read
+        the tables directly; a failed load is not retried for
+        catalog_retry_seconds, so throttled tables are not rescanned on every call.
+        """
+        if not self.config['catalog_snapshot_enabled']:
+            return None
+        
+        catalog = self._catalog
+        if catalog is None:
+            if self._catalog_load_backing_off():
+                return None
+            with self._catalog_load_lock:
+                if self._catalog is None:
+                    if self._catalog_load_backing_off():
+                        return None
+                    artifact_catalog = self._load_catalog_artifact()
+                    if artifact_catalog is not None:
+                        self._catalog = artifact_catalog
+                        self._refresh_catalog_in_background()
+                        return self._catalog
+                    try:
+                        self._catalog = self._load_catalog()
+                    except Exception as e:
+                        self._catalog_load_failed_at = time.monotonic()
+                        app.log.error(
+                            f"Error loading catalog snapshot: {str(e)}; "
+                            f"reading the tables for {self.config['catalog_retry_seconds']}s"
+                        )
+                        return None
+                    self._catalog_load_failed_at = None
+                return self._catalog
+        
+        if catalog.age_seconds() > self.config['catalog_ttl_seconds']:
+            self._refresh_catalog_in_background()
+        return catalog
+    
+    def _catalog_load_backing_off(self) -> bool:
+        failed_at = self._catalog_load_failed_at
+        return failed_at is not None and time.monotonic() - failed_at < self.config['catalog_retry_seconds']
+    
+    def _load_catalog(self, table_versions: Optional[tuple] = None) -> CatalogSnapshot:
+        # Versions are read before the scans, so a load racing the scans is seen on the next refresh
+        if table_versions is None:
+            table_versions = self._get_table_versions()
+        products = list(self._scan_items(self.products_table))
+        sellers = list(self._scan_items(self.sellers_table))
+        catalog = CatalogSnapshot(products, sellers, table_versions=table_versions)
+        app.log.info(f"Loaded catalog snapshot {catalog.version}: {len(products)} products, {len(sellers)} sellers")
+        return catalog
+    
+    def _load_catalog_artifact(self) -> Optional[CatalogSnapshot]:
+        """Build a snapshot from the first readable catalog artifact, if any"""
+        configured_path = self.config['catalog_artifact_path']
+        for path in ([configured_path] if configured_path else CATALOG_ARTIFACT_PATHS):
+            if not os.path.exists(path):
+                continue
+            try:
+                artifact = read_catalog_artifact(path)
+                catalog = CatalogSnapshot(artifact['products'], artifact['sellers'], version=artifact['version'])
+            except Exception as e:
+                app.log.error(f"Error loading catalog artifact {path}: {str(e)}")
+                continue
+            app.log.info(
+                f"Booted catalog snapshot {catalog.version} from {path} (built {artifact['created_at']}): "
+                f"{len(catalog.products)} products, {len(catalog.sellers)} sellers"
+            )
+            return catalog
+        return None
+    
+    def _refresh_catalog_in_background(self) -> None:
+        with self._catalog_refresh_lock:
+            if self._catalog_refresh_thread is not None and self._catalog_refresh_thread.is_alive():
+                return
+            self._catalog_refresh_thread = threading.Thread(
+                target=self._refresh_catalog, name='catalog-refresh', daemon=True
+            )
+            self._catalog_refresh_thread.start()
+    
+    def _get_table_versions(self) -> Optional[tuple]:
+        """
+        (products, sellers) CatalogVersion of the tables' version items, read
+        in one BatchGetItem, or None when either table has none or the read fails
+        """
+        tables = ((self.products_table, 'ProductId'), (self.sellers_table, 'SellerId'))
+        try:
+            response = self.dynamodb.batch_get_item(RequestItems={
+                table.name: {'Keys': [{key_name: CATALOG_VERSION_KEY}]} for table, key_name in tables
+            })
+        except Exception as e:
+            app.log.error(f"Error reading catalog versions: {str(e)}")
+            return None
+        responses = response.get('Responses', {})
+        versions = tuple(
+            next((item.get(CATALOG_VERSION_ATTRIBUTE) for item in responses.get(table.name, [])), None)
+            for table, _ in tables
+        )
+        return None if None in versions else versions
+    
+    def _refresh_catalog(self) -> None:
+        """
+        Replace the snapshot with a fresh scan of the tables, unless both
+        tables' version items still match the ones it was scanned at
+        """
+        previous = self._catalog
+        try:
+            table_versions = self._get_table_versions()
+            if previous is not None and table_versions is not None and table_versions == previous.table_versions:
+                previous.renew()
+                return
+            catalog = self._load_catalog(table_versions)
+        except Exception as e:
+            app.log.error(f"Error refreshing catalog snapshot: {str(e)}")
+            return
+        if previous is not None and previous.version != catalog.version:
+            app.log.info(f"Catalog snapshot {previous.version} is stale; replacing it with {catalog.version}")
+        # Single reference assignment: readers see either the old or the new snapshot
+        self._catalog = catalog
+    
+    def _scan_items(self, table, total_segments: Optional[int] = None, **scan_params) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every item of a table scan, following LastEvaluatedKey, except
+        the table's version item. With more than one segment the scan is split into Segment/TotalSegments
+        workers on a thread pool and pages are yielded as soon as any worker
+        returns them, so item order is not stable across segments.
+        """
+        if total_segments is None:
+            total_segments = self.config['scan_segments']
+        
+        if total_segments <= 1:
+            for page in self._paginate(table.scan, scan_params):
+                yield from _without_version_item(page)
+            return
+        
+        pages = queue.Queue()
+        stop = threading.Event()
+        segment_done = object()
+        
+        def scan_segment(segment: int) -> None:
+            try:
+                segment_params = dict(scan_params, Segment=segment, TotalSegments=total_segments)
+                for page in self._paginate(table.scan, segment_params):
+                    if stop.is_set():
+                        break
+                    pages.put(page)
+                pages.put(segment_done)
+            except Exception as e:
+                pages.put(e)
+        
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            for segment in range(total_segments):
+                executor.submit(scan_segment, segment)
+            try:
+                remaining = total_segments
+                while remaining:
+                    page = pages.get()
+                    if page is segment_done:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield from _without_version_item(page)
+            finally:
+                # Let workers stop early if the caller abandons the generator
+                stop.set()
+    
+    def _query_items(self, table, **query_params) -> Iterator[Dict[str, Any]]:
+        """Yield every item matching a table or GSI query, following LastEvaluatedKey"""
+        for page in self._paginate(table.query, query_params):
+            yield from page
+    
+    def _paginate(self, operation, params: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            response = operation(**params)
+            yield response['Items']
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                return
+            params = dict(params, ExclusiveStartKey=last_evaluated_key)
+    
+    @contextmanager
+    def request_scope(self):
+        """Record every table read made on this thread until the block exits"""
+        cache = RequestReadCache()
+        self._request_local.cache = cache
+        try:
+            yield cache
+        finally:
+            self._request_local.cache = None
+            app.log.info(f"Request made {cache.table_reads} table reads, {cache.reads_avoided} avoided by the request cache")
+    
+    def _request_cache(self) -> Optional[RequestReadCache]:
+        return getattr(self._request_local, 'cache', None)
+    
+    def _in_request_scope(self, func):
+        """Wrap func so worker threads share the calling request's read cache"""
+        cache = self._request_cache()
+        
+        def run(*args):
+            self._request_local.cache = cache
+            try:
+                return func(*args)
+            finally:
+                self._request_local.cache = None
+        return run
+    
+    def _cached_read(self, key: tuple, loader) -> List[Dict[str, Any]]:
+        cache = self._request_cache()
+        if cache is None:
+            return loader()
+        return cache.read(key, loader)
+    
+    def _cached_superset(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        cache = self._request_cache()
+        return cache.derive(key) if cache is not None else None
+    
+    def _iter_products(self) -> Iterator[Dict[str, Any]]:
+        """Stream all products from the snapshot, or from a table scan"""
+        catalog = self.get_catalog()
+        if catalog is not None:
+            return iter(catalog.products)
+        if self._request_cache() is None:
+            return self._scan_items(self.products_table)
+        return iter(self._cached_read(('products', 'scan'), lambda: list(self._scan_items(self.products_table))))
+    
+    def _get_products_by_type(self, livestock_type: str, max_price: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Products of one LivestockType. With max_price, the table path reads only
+        products whose MinPrice is within budget from LivestockTypePriceIndex.
+        """
+        catalog = self.get_catalog()
+        if catalog is not None:
+            if max_price is not None:
+                return catalog.products_of_type_under(livestock_type, max_price)
+            return catalog.products_by_type.get(livestock_type, [])
+        all_products = self._cached_superset(('products', 'scan'))
+        if all_products is not None:
+            return [p for p in all_products if p.get('LivestockType') == livestock_type]
+        
+        from boto3.dynamodb.conditions import Key
+        if max_price is None:
+            return self._cached_read(('products', 'LivestockType', livestock_type), lambda: list(self._query_items(
+                self.products_table,
+                IndexName='LivestockTypeIndex',
+                KeyConditionExpression=Key('LivestockType').eq(livestock_type)
+            )))
+        
+        all_of_type = self._cached_superset(('products', 'LivestockType', livestock_type))
+        if all_of_type is not None:
+            return all_of_type
+        return self._cached_read(('products', 'LivestockType', livestock_type, max_price), lambda: list(self._query_items(
+            self.products_table,
+            IndexName='LivestockTypePriceIndex',
+            KeyConditionExpression=Key('LivestockType').eq(livestock_type) & Key('MinPrice').lte(Decimal(str(max_price)))
+        )))
+    
+    def _has_livestock_type(self, livestock_type: str) -> bool:
+        """Whether any product of this LivestockType exists, reading at most one item"""
+        catalog = self.get_catalog()
+        if catalog is not None:
+            return livestock_type in catalog.products_by_type
+        from boto3.dynamodb.conditions import Key
+        items = self._cached_read(('products', 'LivestockType', livestock_type, 'exists'), lambda: self.products_table.query(
+            IndexName='LivestockTypeIndex',
+            KeyConditionExpression=Key('LivestockType').eq(livestock_type),
+            Limit=1
+        )['Items'])
+        return bool(items)
+    
+    def _get_products_by_species(self, *species: str, max_price: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Products of one or more species, read from the SpeciesIndex GSI. max_price
+        narrows snapshot reads only; callers still apply their own price filter.
+        """
+        catalog = self.get_catalog()
+        if catalog is not None:
+            if max_price is not None:
+                return [p for name in species for p in catalog.products_of_species_under(name, max_price)]
+            return [p for name in species for p in catalog.products_by_species.get(name, [])]
+        
+        all_products = self._cached_superset(('products', 'scan'))
+        if all_products is not None:
+            wanted = set(species)
+            return [p for p in all_products if p.get('Species') in wanted]
+        
+        if len(species) <= 1:
+            return [p for name in species for p in self._query_species(name)]
+        with ThreadPoolExecutor(max_workers=len(species)) as executor:
+            results = executor.map(self._in_request_scope(self._query_species), species)
+            return [p for products in results for p in products]
+    
+    def _query_species(self, species: str) -> List[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+        return self._cached_read(('products', 'Species', species), lambda: list(self._query_items(
+            self.products_table,
+            IndexName='SpeciesIndex',
+            KeyConditionExpression=Key('Species').eq(species)
+        )))
+    
     def _get_all_sellers(self) -> List[Dict[str, Any]]:
         """Get all sellers without any filtering"""
+        catalog = self.get_catalog()
+        if catalog is not None:
+            return catalog.sellers
         try:
-            response = self.sellers_table.scan()
-            return response['Items']
+            return self._cached_read(('sellers', 'scan'), lambda: list(self._scan_items(self.sellers_table)))
         except Exception as e:
             app.log.error(f"Error in _get_all_sellers: {str(e)}")
             return []
     
-    def _get_filtered_sellers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        scan_params = {}
-        filter_expressions = []
+    def _get_sellers_by_ids(self, seller_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Hydrate sellers by SellerId, skipping unknown IDs. Outside the snapshot
+        this issues BatchGetItem in 100-key chunks dispatched concurrently.
+        Returned items may be shared with the snapshot, so copy before mutating.
+        """
+        catalog = self.get_catalog()
+        if catalog is not None:
+            return [catalog.sellers_by_id[sid] for sid in seller_ids if sid in catalog.sellers_by_id]
+        all_sellers = self._cached_superset(('sellers', 'scan'))
+        if all_sellers is not None:
+            wanted = set(seller_ids)
+            return [s for s in all_sellers if s['SellerId'] in wanted]
+        return self._cached_read(
+            ('sellers', 'SellerId', frozenset(seller_ids)),
+            lambda: self._batch_get_by_ids(self.sellers_table, 'SellerId', seller_ids)
+        )
+    
+    def _get_products_by_ids(self, product_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch products by ProductId with BatchGetItem, skipping unknown IDs"""
+        all_products = self._cached_superset(('products', 'scan'))
+        if all_products is not None:
+            wanted = set(product_ids)
+            return [p for p in all_products if p['ProductId'] in wanted]
+        return self._cached_read(
+            ('products', 'ProductId', frozenset(product_ids)),
+            lambda: self._batch_get_by_ids(self.products_table, 'ProductId', product_ids)
+        )
+    
+    def _batch_get_by_ids(self, table, key_name: str, ids: List[str]) -> List[Dict[str, Any]]:
+        # BatchGetItem rejects duplicate keys within a request
+        unique_ids = list(dict.fromkeys(ids))
+        chunks = [
+            [{key_name: item_id} for item_id in unique_ids[i:i + BATCH_GET_MAX_KEYS]]
+            for i in range(0, len(unique_ids), BATCH_GET_MAX_KEYS)
+        ]
+        if len(chunks) <= 1:
+            return [item for chunk in chunks for item in self._batch_get_items(table, chunk)]
         
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.config['batch_get_workers'])) as executor:
+            results = executor.map(lambda chunk: self._batch_get_items(table, chunk), chunks)
+            return [item for chunk_items in results for item in chunk_items]
+    
+    def _batch_get_items(self, table, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch up to 100 keys, retrying UnprocessedKeys with jittered exponential backoff"""
+        items = []
+        request_items = {table.name: {'Keys': keys}}
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            response = self.dynamodb.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table.name, []))
+            
+            request_items = response.get('UnprocessedKeys')
+            if not request_items:
+                return items
+            if attempt < BATCH_GET_MAX_RETRIES:
+                time.sleep(random.uniform(0, BATCH_GET_BASE_DELAY_SECONDS * (2 ** attempt)))
+        
+        unprocessed = len(request_items[table.name]['Keys'])
+        raise ServiceError(f"BatchGetItem left {unprocessed} keys unprocessed on {table.name}")
+    
+    def _get_filtered_sellers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         location = params.get('location', {})
+        if location.get('state'):
+            return self._get_sellers_by_location('State', location['state'])
         if location.get('city'):
-            filter_expressions.append(Attr('City').eq(location['city']))
-        
-        if filter_expressions:
-            scan_params['FilterExpression'] = filter_expressions[0]
+            return self._get_sellers_by_location('City', location['city'])
+        return self._get_all_sellers()
+    
+    def _get_sellers_by_location(self, attribute: str, value: str) -> List[Dict[str, Any]]:
+        """Sellers in one city or state, read from the CityIndex/StateIndex GSI"""
+        catalog = self.get_catalog()
+        if catalog is not None:
+            index = catalog.sellers_by_state if attribute == 'State' else catalog.sellers_by_city
+            return index.get(value, [])
         
+        all_sellers = self._cached_superset(('sellers', 'scan'))
+        if all_sellers is not None:
+            return [s for s in all_sellers if s.get(attribute) == value]
+        from boto3.dynamodb.conditions import Key
         try:
-            response = self.sellers_table.scan(**scan_params)
-            return response['Items']
+            return self._cached_read(('sellers', attribute, value), lambda: list(self._query_items(
+                self.sellers_table,
+                IndexName=f'{attribute}Index',
+                KeyConditionExpression=Key(attribute).eq(value)
+            )))
         except Exception as e:
-            app.log.error(f"Error in _get_filtered_sellers: {str(e)}")
+            app.log.error(f"Error in _get_sellers_by_location: {str(e)}")
             return []
     
     def _get_matching_products(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         products = []
         
+        price_range = params.get('price_range', {})
+        if price_range.get('invalid'):
+            # If price is marked as invalid (too low), return no products without reading
+            return []
+        max_price = price_range.get('max')
+        
         livestock_type = params.get('livestock_type')
         if livestock_type:
             try:
                 # Handle generic types for price-based queries
                 if livestock_type.startswith('GENERIC_'):
                     # For generic types, find all products of that category
-                    all_products_response = self.products_table.scan()
                     category = livestock_type.replace('GENERIC_', '').title()
-                    
-                    for product in all_products_response['Items']:
-                        product_type = product.get('LivestockType', '')
-                        if category in product_type:
-                            products.append(product)
+                    products.extend(self._get_products_by_species(category, max_price=max_price))
                 else:
-                    # First try exact match
-                    response = self.products_table.query(
-                        IndexName='LivestockTypeIndex',
-                        KeyConditionExpression=Key('LivestockType').eq(livestock_type)
+                    # First try exact match, reading only the products within budget
+                    products.extend(self._get_products_by_type(livestock_type, max_price=max_price))
+                    exact_match_exists = bool(products) or (
+                        max_price is not None and self._has_livestock_type(livestock_type)
                     )
-                    products.extend(response['Items'])
                     
                     # If we got exact matches, don't expand further
                     # Only expand for truly generic searches (when no exact match found)
-                    if not products:
+                    if not exact_match_exists and livestock_type in RELATED_TYPE_SPECIES:
                         # For generic terms, search for related types
-                        all_products_response = self.products_table.scan()
-                        for product in all_products_response['Items']:
-                            product_type = product.get('LivestockType', '')
-                            
-                            # Add related types for generic searches
-                            if livestock_type == 'Sheep Yankasa' and 'Sheep' in product_type:
-                                products.append(product)
-                            elif livestock_type == 'Cattle Sokoto Gudali' and 'Cattle' in product_type:
-                                products.append(product)
-                            elif livestock_type == 'Poultry Broiler' and 'Poultry' in product_type:
-                                products.append(product)
-                            elif livestock_type == 'Fish Tilapia' and 'Fish' in product_type:
-                                products.append(product)
+                        products.extend(self._get_products_by_species(RELATED_TYPE_SPECIES[livestock_type], max_price=max_price))
                     
                     # If still no exact match, try partial matches
-                    if not products:
-                        all_products_response = self.products_table.scan()
-                        for product in all_products_response['Items']:
+                    if not exact_match_exists and not products:
+                        search_words = livestock_type.lower().split()
+                        for product in self._iter_products():
                             product_type = product.get('LivestockType', '').lower()
-                            search_type = livestock_type.lower()
                             
                             # Check if any word in the search type matches the product type
-                            search_words = search_type.split()
-                            for word in search_words:
-                                if word in product_type:
-                                    products.append(product)
-                                    break
+                            if any(word in product_type for word in search_words):
+                                products.append(product)
                                 
             except Exception as e:
                 app.log.error(f"Error getting matching products: {str(e)}")
@@ -282,12 +1053,7 @@ class LivestockMatchingService:
                 products = []
         
         # Apply price filtering with validation
-        price_range = params.get('price_range', {})
-        if price_range.get('invalid'):
-            # If price is marked as invalid (too low), return no products
-            products = []
-        elif price_range.get('max'):
-            max_price = price_range['max']
+        if max_price:
             # Filter products by price - use MinPrice for filtering
             filtered_products = []
             for p in products:
@@ -298,7 +1064,8 @@ class LivestockMatchingService:
         
         return products
     
-    def _combine_and_rank_results(self, sellers: List[Dict], products: List[Dict], params: Dict) -> List[Dict]:
+    def _combine_and_rank_results(self, sellers: List[Dict], products: List[Dict], params: Dict,
+                                  limit: Optional[int] = None) -> List[Dict]:
         seller_lookup = {seller['SellerId']: seller for seller in sellers}
         
         # Check if we have valid search criteria
@@ -313,18 +1080,17 @@ class LivestockMatchingService:
         
         # If we have products, filter sellers by product matches
         if products:
-            product_seller_ids = set()
+            # Group products by seller in one pass over the seller references
+            products_by_seller = defaultdict(list)
             for product in products:
-                product_seller_ids.update(product.get('SellerIds', []))
+                for seller_id in set(product.get('SellerIds', [])):
+                    products_by_seller[seller_id].append(product)
             
-            results = []
-            for seller_id in product_seller_ids:
-                if seller_id in seller_lookup:
-                    seller = seller_lookup[seller_id].copy()
-                    seller_products = [p for p in products if seller_id in p.get('SellerIds', [])]
-                    seller['matching_products'] = seller_products
-                    seller['relevance_score'] = self._calculate_relevance_score(seller)
-                    results.append(seller)
+            candidates = [
+                (seller_lookup[seller_id], seller_products)
+                for seller_id, seller_products in products_by_seller.items()
+                if seller_id in seller_lookup
+            ]
         else:
             # If no products match but we have location criteria, return location-based results
             # BUT only if we don't have an invalid livestock query
@@ -332,21 +1098,65 @@ class LivestockMatchingService:
             
             if has_location and not has_livestock_type and not has_invalid_livestock_query:
                 # For location-only queries, return all sellers in that location with their products
-                results = []
-                for seller in sellers:
-                    seller_copy = seller.copy()
-                    # Get all products for this seller
-                    seller_products = self._get_products_for_seller(seller['SellerId'])
-                    seller_copy['matching_products'] = seller_products
-                    seller_copy['relevance_score'] = self._calculate_relevance_score(seller_copy)
-                    results.append(seller_copy)
+                products_by_seller = self._get_products_for_sellers(sellers)
+                candidates = [(seller, products_by_seller.get(seller['SellerId'], [])) for seller in sellers]
             else:
                 # For other cases without products (including invalid livestock queries), return empty results
-                results = []
+                candidates = []
+        
+        return self._top_ranked(candidates, limit)
+    
+    def _top_ranked(self, candidates: List[tuple], limit: Optional[int] = None) -> List[Dict]:
+        """
+        Rank (seller, matching products) candidates by relevance score, highest
+        first with ties broken by SellerId, and return decorated copies of the
+        top `limit` sellers (all of them when limit is None).
+        """
+        scores = self._score_sellers(candidates)
+        ranked = (
+            (-score, seller['SellerId'], index)
+            for index, ((seller, _), score) in enumerate(zip(candidates, scores))
+        )
+        winners = sorted(ranked) if limit is None else heapq.nsmallest(limit, ranked)
         
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
+        results = []
+        for _, _, index in winners:
+            seller, seller_products = candidates[index]
+            result = seller.copy()
+            result['matching_products'] = seller_products
+            result['relevance_score'] = scores[index]
+            results.append(result)
         return results
     
+    def _score_sellers(self, candidates: List[tuple]) -> List[float]:
+        """
+        Relevance scores for a whole (seller, matching products) candidate set.
+        Snapshot sellers are scored column-wise over the snapshot's score
+        columns plus the matching-products bonus; anything else uses the
+        scalar reference. The columns are scaled, weighted and summed in the
+        reference's order and rounded with round(), so both paths agree to
+        the last bit.
+        """
+        catalog = self.get_catalog()
+        if catalog is not None and catalog.score_features is not None:
+            np = _numpy()
+            rows = [catalog.score_rows.get(seller['SellerId']) for seller, _ in candidates]
+            if None not in rows:
+                product_counts = np.fromiter(
+                    (len(seller_products) for _, seller_products in candidates),
+                    dtype=np.float64, count=len(candidates)
+                )
+                weighted = catalog.score_features[rows] / np.array(SCORE_SCALES) * np.array(SCORE_WEIGHTS)
+                scores = np.zeros(len(candidates))
+                for column in range(len(SCORE_FEATURES)):
+                    scores += weighted[:, column]
+                scores += np.minimum(product_counts / 5.0, 1.0) * 0.05
+                return [round(score, 3) for score in scores.tolist()]
+        return [
+            self._calculate_relevance_score({**seller, 'matching_products': seller_products})
+            for seller, seller_products in candidates
+        ]
+    
     def _calculate_relevance_score(self, seller: Dict) -> float:
         score = 0.0
         
@@ -375,13 +1185,8 @@ class LivestockMatchingService:
     
     def _get_seller_ids_by_livestock_type(self, livestock_type: str) -> List[str]:
         try:
-            response = self.products_table.query(
-                IndexName='LivestockTypeIndex',
-                KeyConditionExpression=Key('LivestockType').eq(livestock_type)
-            )
-            
             seller_ids = set()
-            for product in response['Items']:
+            for product in self._get_products_by_type(livestock_type):
                 seller_ids.update(product.get('SellerIds', []))
             
             return list(seller_ids)
@@ -422,26 +1227,398 @@ class LivestockMatchingService:
         
         return R * c
     
-    def _get_products_for_seller(self, seller_id: str) -> List[Dict]:
-        """Get all products for a specific seller"""
+    def _get_products_for_sellers(self, sellers: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Map each seller's ID to all of its products in one batched read.
+        Uses the snapshot's seller->products index, or the ProductIds list the
+        loader denormalizes onto seller items; older seller items without it
+        fall back to a single products scan shared by every seller.
+        """
+        catalog = self.get_catalog()
+        if catalog is not None:
+            return {s['SellerId']: catalog.products_by_seller.get(s['SellerId'], []) for s in sellers}
+        
+        products_by_seller = defaultdict(list)
         try:
-            # Scan all products to find ones that include this seller
-            response = self.products_table.scan()
-            products = response['Items']
-            
-            seller_products = []
-            for product in products:
-                seller_ids = product.get('SellerIds', [])
-                if seller_id in seller_ids:
-                    seller_products.append(product)
-            
-            return seller_products
+            if all('ProductIds' in seller for seller in sellers):
+                product_ids = [pid for seller in sellers for pid in seller['ProductIds']]
+                product_lookup = {p['ProductId']: p for p in self._get_products_by_ids(product_ids)}
+                for seller in sellers:
+                    for product_id in sorted(seller['ProductIds']):
+                        if product_id in product_lookup:
+                            products_by_seller[seller['SellerId']].append(product_lookup[product_id])
+            else:
+                seller_ids = {seller['SellerId'] for seller in sellers}
+                for product in self._iter_products():
+                    for seller_id in seller_ids.intersection(product.get('SellerIds', [])):
+                        products_by_seller[seller_id].append(product)
         except Exception as e:
-            app.log.error(f"Error getting products for seller {seller_id}: {str(e)}")
-            return []
+            app.log.error(f"Error getting products for sellers: {str(e)}")
+        return products_by_seller
+
+# Query parsing tables, compiled once at import time
+# Valid livestock types from database - more specific patterns first
+LIVESTOCK_PATTERNS = [(livestock_type, re.compile(pattern)) for livestock_type, pattern in [
+    # Exact breed matches first (highest priority)
+    ('Goat Sokoto Red', r'\b(goat sokoto red|goats? sokoto red)\b'),
+    ('Cattle Sokoto Gudali', r'\b(cattle sokoto gudali)\b'),
+    ('Cattle Muturu', r'\b(cattle muturu)\b'),
+    ('Cattle White Fulani', r'\b(cattle white fulani)\b'),
+    ('Poultry Broiler', r'\b(poultry broiler|broiller)\b'),
+    ('Poultry Noiler', r'\b(poultry noiler|noilers?|noiler chickens?|noiller)\b'),
+    ('Poultry Layer', r'\b(poultry layer|layers?|layyer)\b'),
+    ('Sheep Yankasa', r'\b(sheep yankasa|yankassa)\b'),
+    ('Sheep Balami', r'\b(sheep balami|balami sheep|balami|balamy)\b'),
+    ('Sheep Uda', r'\b(sheep uda|uda sheep)\b'),
+    ('Fish Tilapia', r'\b(fish tilapia|tilapya|tilapiya)\b'),
+    ('Fish Catfish', r'\b(fish catfish|catfish|cat fish|catfsh|catfis)\b'),
+    ('Fish Heterotis', r'\b(fish heterotis|heterotis|hetrotis)\b'),
+    
+    # Specific type matches (medium priority) - but use generic for price queries
+    ('Poultry Broiler', r'\b(broilers?|chickens?|hens?|fowls?)\b'),
+    ('Cattle Sokoto Gudali', r'\b(cattle)\b'),
+    ('Fish Tilapia', r'\b(tilapia)\b'),
+    
+    # Generic matches for price-based queries (use generic types to find all variants)
+    ('GENERIC_SHEEP', r'\b(sheep|rams?|ewes?|lambs?)\b'),
+    ('GENERIC_GOAT', r'\b(goats?)\b'),
+    ('GENERIC_CATTLE', r'\b(cows?|bulls?|beef|bovine)\b'),
+    ('GENERIC_POULTRY', r'\b(poultry|birds?)\b'),
+    ('GENERIC_FISH', r'\b(fish|fishes)\b')
+]]
+
+# Default specific type for a generic term in a query without price terms
+GENERIC_DEFAULT_TYPES = {
+    'GENERIC_GOAT': 'Goat Sokoto Red',
+    'GENERIC_SHEEP': 'Sheep Yankasa',
+    'GENERIC_CATTLE': 'Cattle Sokoto Gudali',
+    'GENERIC_POULTRY': 'Poultry Broiler',
+    'GENERIC_FISH': 'Fish Tilapia',
+}
+
+# Common non-livestock animals
+INVALID_LIVESTOCK_PATTERN = re.compile(r'\b(pigs?|horses?|rabbits?|ducks?|turkeys?|guinea fowls?|guinea|donkeys?|camels?|dinosaurs?|dogs?|cats?|elephants?|lions?|unicorns?)\b')
+PRICE_TERMS_PATTERN = re.compile(r'\b(under|below|less\s+than|maximum|cheap|affordable|budget|inexpensive)\b')
+
+LOCATION_PATTERNS = [re.compile(pattern) for pattern in [
+    r'\bin\s+([a-zA-Z]+)(\s+state)?(?:\s+under|\s+with|\s*$|\s)',  # "in Lagos state" or "in Lagos under" or "in Lagos"
+    r'(?:from|at)\s+([a-zA-Z]+)(\s+state)?(?:\s+under|\s+with|\s*$|\s)',  # "from Lagos state" or "at Lagos"
+    r'(?:near|around)\s+([a-zA-Z]+)(\s+state)?(?:\s+under|\s+with|\s*$|\s)'  # "near Lagos state"
+]]
+
+# Valid Nigerian locations (including Sokoto as a city), keyed by lowercase name
+VALID_LOCATIONS = frozenset(location.lower() for location in [
+    'Kaduna', 'Lagos', 'Abuja', 'Fct', 'Kano', 'Ibadan',
+    'Port Harcourt', 'Benin City', 'Maiduguri', 'Jos',
+    'Ilorin', 'Owerri', 'Calabar', 'Sokoto', 'Enugu', 'Zaria',
+    'Bauchi', 'Plateau', 'Benue', 'Taraba', 'Kebbi', 'Zamfara'
+])
+
+# Patterns that show a location word is part of a breed name ("Cattle Sokoto Gudali"), per location
+LIVESTOCK_CONTEXT_PATTERNS = {
+    location: [
+        re.compile(rf'\b(?:cattle|goat|sheep)\s+{location}\s+(?:red|gudali|yankasa|balami|uda|white|fulani)\b'),
+        re.compile(rf'\b(?:poultry)\s+{location}\s+(?:broiler|noiler|layer)\b')
+    ]
+    for location in VALID_LOCATIONS | set(NIGERIAN_STATES)
+}
+
+PRICE_PATTERNS = [re.compile(pattern) for pattern in [
+    r'under\s+₦?(\d+(?:,\d+)*)',
+    r'below\s+₦?(\d+(?:,\d+)*)',
+    r'less\s+than\s+₦?(\d+(?:,\d+)*)',
+    r'maximum\s+₦?(\d+(?:,\d+)*)'
+]]
+
+QUANTITY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(tons?|kg|tonnes?)')
+
+QUALITY_PATTERNS = [re.compile(pattern) for pattern in [
+    r'\b(top.?rated|highest.?rating|best|premium|high.?quality|excellent)\b',
+    r'\b(quality|rated|rating)\b'
+]]
+
+# Potentially harmful content in queries
+HARMFUL_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'<script', r'javascript:', r'on\w+\s*=', r'eval\s*\(', r'exec\s*\('
+]]
+
+VALID_LIVESTOCK_TYPES = [
+    'Poultry Broiler', 'Poultry Noiler', 'Cattle Sokoto Gudali',
+    'Fish Tilapia', 'Fish Catfish', 'Fish Heterotis',
+    'Goat Sokoto Red', 'Sheep Yankasa', 'Sheep Balami'
+]
+
+# Single-pass query parser vocabulary: the patterns above as word phrases.
+# Words are maximal \w runs of the lowercased query; words inside a phrase are
+# separated by exactly one space, matching the literal spaces in the patterns.
+LIVESTOCK_PHRASES = [
+    # Exact breed matches first (highest priority)
+    ('Goat Sokoto Red', ['goat sokoto red', 'goats sokoto red']),
+    ('Cattle Sokoto Gudali', ['cattle sokoto gudali']),
+    ('Cattle Muturu', ['cattle muturu']),
+    ('Cattle White Fulani', ['cattle white fulani']),
+    ('Poultry Broiler', ['poultry broiler', 'broiller']),
+    ('Poultry Noiler', ['poultry noiler', 'noiler', 'noilers', 'noiler chicken', 'noiler chickens', 'noiller']),
+    ('Poultry Layer', ['poultry layer', 'layer', 'layers', 'layyer']),
+    ('Sheep Yankasa', ['sheep yankasa', 'yankassa']),
+    ('Sheep Balami', ['sheep balami', 'balami sheep', 'balami', 'balamy']),
+    ('Sheep Uda', ['sheep uda', 'uda sheep']),
+    ('Fish Tilapia', ['fish tilapia', 'tilapya', 'tilapiya']),
+    ('Fish Catfish', ['fish catfish', 'catfish', 'cat fish', 'catfsh', 'catfis']),
+    ('Fish Heterotis', ['fish heterotis', 'heterotis', 'hetrotis']),
+    
+    # Specific type matches (medium priority)
+    ('Poultry Broiler', ['broiler', 'broilers', 'chicken', 'chickens', 'hen', 'hens', 'fowl', 'fowls']),
+    ('Cattle Sokoto Gudali', ['cattle']),
+    ('Fish Tilapia', ['tilapia']),
+    
+    # Generic matches
+    ('GENERIC_SHEEP', ['sheep', 'ram', 'rams', 'ewe', 'ewes', 'lamb', 'lambs']),
+    ('GENERIC_GOAT', ['goat', 'goats']),
+    ('GENERIC_CATTLE', ['cow', 'cows', 'bull', 'bulls', 'beef', 'bovine']),
+    ('GENERIC_POULTRY', ['poultry', 'bird', 'birds']),
+    ('GENERIC_FISH', ['fish', 'fishes'])
+]
+
+# First word -> [(remaining words, priority)], priority being the LIVESTOCK_PHRASES index
+LIVESTOCK_PHRASE_INDEX = defaultdict(list)
+for _priority, (_, _phrases) in enumerate(LIVESTOCK_PHRASES):
+    for _phrase in _phrases:
+        _first, *_rest = _phrase.split(' ')
+        LIVESTOCK_PHRASE_INDEX[_first].append((_rest, _priority))
+LIVESTOCK_PHRASE_INDEX = dict(LIVESTOCK_PHRASE_INDEX)
+FIRST_GENERIC_PRIORITY = next(i for i, (t, _) in enumerate(LIVESTOCK_PHRASES) if t.startswith('GENERIC_'))
+
+INVALID_LIVESTOCK_WORDS = frozenset([
+    'pig', 'pigs', 'horse', 'horses', 'rabbit', 'rabbits', 'duck', 'ducks', 'turkey', 'turkeys',
+    'guinea', 'donkey', 'donkeys', 'camel', 'camels', 'dinosaur', 'dinosaurs', 'dog', 'dogs',
+    'cat', 'cats', 'elephant', 'elephants', 'lion', 'lions', 'unicorn', 'unicorns'
+])
+PRICE_TERM_WORDS = frozenset(['under', 'below', 'maximum', 'cheap', 'affordable', 'budget', 'inexpensive'])
+QUALITY_WORDS = frozenset(['best', 'premium', 'excellent', 'quality', 'rated', 'rating'])
+# "top.?rated" style terms: head and tail around at most one optional character
+QUALITY_COMPOUNDS = (('top', 'rated'), ('highest', 'rating'), ('high', 'quality'))
+
+# Words that make a following location part of a breed name ("cattle sokoto gudali")
+BREED_CONTEXT = (
+    (frozenset(['cattle', 'goat', 'sheep']), frozenset(['red', 'gudali', 'yankasa', 'balami', 'uda', 'white', 'fulani'])),
+    (frozenset(['poultry']), frozenset(['broiler', 'noiler', 'layer'])),
+)
+
+# Keywords that introduce a location or price in the next whitespace-separated
+# chunk. The first word may end a longer chunk, as the patterns do not anchor it
+# ("goat lagos" reads as "at lagos"); "in" must start a word. Later words are
+# whole chunks.
+LOCATION_KEYWORDS = ((('in',), True), (('from', 'at'), False), (('near', 'around'), False))
+PRICE_KEYWORDS = (('under',), ('below',), ('less', 'than'), ('maximum',))
+CHUNK_KEYWORDS = tuple(k for keywords, _ in LOCATION_KEYWORDS for k in keywords) + tuple(k[0] for k in PRICE_KEYWORDS)
+
+# Tokenizer: splitting on captured \w runs yields [gap, word, gap, word, ..., gap]
+WORD_SPLIT_PATTERN = re.compile(r'(\w+)')
+DIGIT_RUN_PATTERN = re.compile(r'\d+')
+PRICE_VALUE_PATTERN = re.compile(r'₦?(\d+(?:,\d+)*)')
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _is_quality_compound(word: str) -> bool:
+    return any(
+        len(head) + len(tail) <= len(word) <= len(head) + len(tail) + 1
+        and word.startswith(head) and word.endswith(tail)
+        for head, tail in QUALITY_COMPOUNDS
+    )
+
+# Typo-tolerant vocabulary index: livestock, breed and location words mapped
+# from every variant with up to FUZZY_MAX_DISTANCE characters deleted. Two
+# words within that edit distance share a variant, so a lookup only deletes
+# characters from the query word and checks the few terms it reaches.
+FUZZY_MIN_WORD_LENGTH = 5
+FUZZY_MAX_DISTANCE = 2
+# Words shorter than this, so every word of FUZZY_MIN_WORD_LENGTH letters, are
+# corrected by at most one edit
+FUZZY_TWO_EDIT_LENGTH = 8
+
+# Only words that no English word list recognizes are typos: stopwords and
+# common English words are never corrected, however close they are to a
+# vocabulary term. Words shorter than FUZZY_MIN_WORD_LENGTH are never looked
+# up, so only longer ones are listed.
+ENGLISH_STOPWORDS = frozenset([
+    'about', 'above', 'after', 'again', 'against', 'because', 'before', 'being', 'below',
+    'between', 'could', 'doing', 'during', 'every', 'further', 'having', 'herself', 'himself',
+    'itself', 'might', 'myself', 'never', 'other', 'ought', 'ourselves', 'shall', 'should',
+    'still', 'their', 'theirs', 'themselves', 'there', 'these', 'those', 'through', 'under',
+    'until', 'where', 'which', 'while', 'whose', 'within', 'without', 'would', 'yours',
+    'yourself', 'yourselves',
+])
+COMMON_ENGLISH_WORDS = ENGLISH_STOPWORDS | frozenset([
+    # Near sheep, goat(s), cattle, lamb(s)
+    'steep', 'sheer', 'sheen', 'sheet', 'sleep', 'sweep', 'cheep', 'boats', 'coats', 'goals',
+    'gnats', 'moats', 'goads', 'gouts', 'gloat', 'gloats', 'groat', 'groats', 'castle',
+    'battle', 'rattle', 'tattle', 'wattle', 'settle', 'lamps', 'limbs', 'lamas', 'iambs', 'jambs',
+    # Near layer(s), white
+    'later', 'payer', 'payers', 'player', 'players', 'lager', 'lagers', 'laser', 'lasers',
+    'lawyer', 'lawyers', 'slayer', 'slayers', 'layed', 'lacer', 'lamer', 'while', 'write',
+    'whine', 'whale', 'whits', 'whites', 'whited', 'whiter', 'whiten',
+    # Near bulls, cows, rams, ewes, beef
+    'bills', 'balls', 'bells', 'pulls', 'dulls', 'lulls', 'hulls', 'gulls', 'mulls', 'culls',
+    'nulls', 'bulbs', 'bulks', 'bully', 'bolls', 'burls', 'crows', 'brows', 'chows', 'scows',
+    'cowls', 'ramps', 'reams', 'roams', 'trams', 'prams', 'drams', 'ewers', 'beefs', 'beefy',
+    # Near fish(es), fowls, birds, bovine
+    'fishy', 'fisher', 'fishers', 'fished', 'wishes', 'dishes', 'fiches', 'bowls', 'howls',
+    'jowls', 'yowls', 'fouls', 'foals', 'fools', 'bards', 'birdy', 'ovine',
+    # Near chicken(s), broiler(s), noiler(s)
+    'thicken', 'thickens', 'checkers', 'chickpeas', 'crickets', 'thickets', 'quickens',
+    'boiler', 'boilers', 'broiled', 'spoilers', 'trailers', 'brothers', 'rollers', 'oiler',
+    'oilers', 'toiler', 'toilers', 'nailer', 'nailers',
+    # Near place names
+    'river', 'rivets', 'divers', 'givers', 'livers', 'risers', 'rovers', 'riders', 'fivers',
+    'logos', 'legos', 'borne', 'boron', 'venue', 'balmy', 'salami',
+])
 
-# Enhanced parameter extraction with better validation
+def _deletions(word: str, distance: int) -> set:
+    """word and every string made by deleting up to distance of its characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether a and b differ by one insertion, deletion, substitution or adjacent transposition"""
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) - len(b) > 1:
+        return False
+    i = next((k for k, (x, y) in enumerate(zip(a, b)) if x != y), len(b))
+    if len(a) != len(b):
+        return a[i + 1:] == b[i:]
+    return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i + 1::-1][:2])
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+    of a and b, or max_distance + 1 as soon as it must exceed max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    before_previous, previous = None, list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, other in enumerate(b, 1):
+            cost = previous[j - 1] if char == other else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if left + 1 < cost:
+                cost = left + 1
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == other and before_previous[j - 2] + 1 < cost:
+                cost = before_previous[j - 2] + 1
+            current.append(cost)
+            left = cost
+        if min(current) > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+FUZZY_VOCABULARY = frozenset(
+    [word for _, phrases in LIVESTOCK_PHRASES for phrase in phrases for word in phrase.split(' ')]
+    + [location for location in VALID_LOCATIONS if ' ' not in location]
+    + list(NIGERIAN_STATES)
+)
+FUZZY_INDEX = defaultdict(set)
+for _term in FUZZY_VOCABULARY:
+    if len(_term) >= FUZZY_MIN_WORD_LENGTH - 1:
+        for _variant in _deletions(_term, FUZZY_MAX_DISTANCE):
+            FUZZY_INDEX[_variant].add(_term)
+FUZZY_INDEX = {variant: tuple(sorted(terms)) for variant, terms in FUZZY_INDEX.items()}
+
+# Words that show a query is about livestock even when its livestock word is
+# misspelled: generic livestock terms and breed names that are not English words.
+# A two-edit correction only names a livestock type in a query with one.
+LIVESTOCK_CUE_WORDS = frozenset([
+    'livestock', 'animal', 'animals', 'breed', 'breeds', 'herd', 'herds', 'flock', 'flocks',
+    'farm', 'farms', 'farmer', 'farmers', 'ranch', 'hatchery', 'meat', 'dairy',
+    'gudali', 'fulani', 'muturu', 'yankasa', 'balami', 'uda', 'heterotis',
+])
+
+@lru_cache(maxsize=4096)
+def nearest_vocabulary_term(word: str, max_distance: int = FUZZY_MAX_DISTANCE) -> Optional[str]:
+    """
+    The vocabulary term closest to a misspelled word, or None when the word is
+    known, too short, common English, or has no single nearest term within
+    max_distance edits
+    """
+    if (len(word) < FUZZY_MIN_WORD_LENGTH or word in FUZZY_VOCABULARY
+            or word in COMMON_ENGLISH_WORDS or word in INVALID_LIVESTOCK_WORDS or not word.isalpha()):
+        return None
+    if len(word) < FUZZY_TWO_EDIT_LENGTH:
+        max_distance = 1
+    candidates = {term for variant in _deletions(word, max_distance) for term in FUZZY_INDEX.get(variant, ())}
+    # Any term within one edit is nearest, as the word itself is not a term
+    best_terms = [term for term in candidates if _within_one_edit(word, term)]
+    if not best_terms and max_distance > 1:
+        best_terms = [term for term in candidates if _edit_distance(word, term, max_distance) <= max_distance]
+        if best_terms:
+            best_distance = min(_edit_distance(word, term, max_distance) for term in best_terms)
+            best_terms = [term for term in best_terms if _edit_distance(word, term, max_distance) == best_distance]
+    return best_terms[0] if len(best_terms) == 1 else None
+
+def correct_typos(query: str, max_distance: int = FUZZY_MAX_DISTANCE) -> Optional[str]:
+    """
+    The lowercased query with misspelled vocabulary words corrected by at most
+    max_distance edits, or None if none were
+    """
+    parts = WORD_SPLIT_PATTERN.split(query.lower())
+    corrected = False
+    for i in range(1, len(parts), 2):
+        term = nearest_vocabulary_term(parts[i], max_distance)
+        if term is not None:
+            parts[i] = term
+            corrected = True
+    return ''.join(parts) if corrected else None
+
+def _has_livestock_cue(query: str) -> bool:
+    return any(word in LIVESTOCK_CUE_WORDS for word in WORD_SPLIT_PATTERN.findall(query))
+
+def _fill_from_typo_corrections(query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill a livestock type or location that the exact parse of query missed
+    from the parse of its typo-corrected form. Recognized terms are never
+    replaced, so correction only ever adds recall. A livestock type found
+    only through a two-edit correction is filled for queries with a livestock
+    cue word alone.
+    """
+    if params.get('invalid_livestock_query') or (params['livestock_type'] and params['location']):
+        return params
+    corrected_query = correct_typos(query)
+    if corrected_query is None:
+        return params
+    corrected_params = extract_simple_parameters(corrected_query)
+    if corrected_params.get('invalid_livestock_query'):
+        return params
+    if params['livestock_type'] is None:
+        livestock_type = corrected_params['livestock_type']
+        if livestock_type is not None and not _has_livestock_cue(query):
+            one_edit_query = correct_typos(query, max_distance=1)
+            if one_edit_query is None:
+                livestock_type = None
+            elif one_edit_query != corrected_query:
+                one_edit_params = extract_simple_parameters(one_edit_query)
+                livestock_type = None if one_edit_params.get('invalid_livestock_query') else one_edit_params['livestock_type']
+        params['livestock_type'] = livestock_type
+    if not params['location']:
+        params['location'] = corrected_params['location']
+    return params
+
+# Single-pass parameter extraction
 def extract_simple_parameters(query: str) -> Dict[str, Any]:
+    """
+    Extract search parameters from a natural-language query with one tokenizer
+    pass over the lowercased query and set/dict lookups on its words. Returns
+    the same params as _extract_simple_parameters_regex, which runs one regex
+    search per pattern and is kept as the reference implementation.
+    """
     query_lower = query.lower()
     params = {
         'livestock_type': None,
@@ -451,39 +1628,125 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
         'quality_requirements': {}
     }
     
-    # Valid livestock types from database - more specific patterns first
-    livestock_patterns = [
-        # Exact breed matches first (highest priority)
-        ('Goat Sokoto Red', r'\b(goat sokoto red|goats? sokoto red)\b'),
-        ('Cattle Sokoto Gudali', r'\b(cattle sokoto gudali)\b'),
-        ('Cattle Muturu', r'\b(cattle muturu)\b'),
-        ('Cattle White Fulani', r'\b(cattle white fulani)\b'),
-        ('Poultry Broiler', r'\b(poultry broiler|broiller)\b'),
-        ('Poultry Noiler', r'\b(poultry noiler|noilers?|noiler chickens?|noiller)\b'),
-        ('Poultry Layer', r'\b(poultry layer|layers?|layyer)\b'),
-        ('Sheep Yankasa', r'\b(sheep yankasa|yankassa)\b'),
-        ('Sheep Balami', r'\b(sheep balami|balami sheep|balami|balamy)\b'),
-        ('Sheep Uda', r'\b(sheep uda|uda sheep)\b'),
-        ('Fish Tilapia', r'\b(fish tilapia|tilapya|tilapiya)\b'),
-        ('Fish Catfish', r'\b(fish catfish|catfish|cat fish|catfsh|catfis)\b'),
-        ('Fish Heterotis', r'\b(fish heterotis|heterotis|hetrotis)\b'),
-        
-        # Specific type matches (medium priority) - but use generic for price queries
-        ('Poultry Broiler', r'\b(broilers?|chickens?|hens?|fowls?)\b'),
-        ('Cattle Sokoto Gudali', r'\b(cattle)\b'),
-        ('Fish Tilapia', r'\b(tilapia)\b'),
-        
-        # Generic matches for price-based queries (use generic types to find all variants)
-        ('GENERIC_SHEEP', r'\b(sheep|rams?|ewes?|lambs?)\b'),
-        ('GENERIC_GOAT', r'\b(goats?)\b'),
-        ('GENERIC_CATTLE', r'\b(cows?|bulls?|beef|bovine)\b'),
-        ('GENERIC_POULTRY', r'\b(poultry|birds?)\b'),
-        ('GENERIC_FISH', r'\b(fish|fishes)\b')
+    # Words are maximal \w runs, gaps[k] is the text before words[k], and
+    # chunks are the whitespace-separated parts of the query
+    parts = WORD_SPLIT_PATTERN.split(query_lower)
+    words = parts[1::2]
+    gaps = parts[0:-1:2]
+    chunks = query_lower.split()
+    word_set = set(words)
+    
+    # Invalid livestock (common non-livestock animals) - return early with no results
+    if not INVALID_LIVESTOCK_WORDS.isdisjoint(word_set):
+        params['invalid_livestock_query'] = True
+        return params
+    
+    has_price_terms = not PRICE_TERM_WORDS.isdisjoint(word_set) or 'less' in word_set and any(
+        w == 'less' and k + 1 < len(words) and words[k + 1] == 'than' and gaps[k + 1].isspace()
+        for k, w in enumerate(words)
+    )
+    
+    # Livestock phrases: the highest-priority specific and generic matches
+    best_specific = best_generic = None
+    for k, w in enumerate(words):
+        for rest, priority in LIVESTOCK_PHRASE_INDEX.get(w, ()):
+            if all(k + j < len(words) and words[k + j] == part and gaps[k + j] == ' ' for j, part in enumerate(rest, 1)):
+                if priority < FIRST_GENERIC_PRIORITY:
+                    best_specific = priority if best_specific is None else min(best_specific, priority)
+                else:
+                    best_generic = priority if best_generic is None else min(best_generic, priority)
+    
+    if has_price_terms:
+        # Price-based queries keep whichever type matched first, generic or specific
+        best = best_specific if best_specific is not None else best_generic
+        if best is not None:
+            params['livestock_type'] = LIVESTOCK_PHRASES[best][0]
+    elif best_specific is not None:
+        params['livestock_type'] = LIVESTOCK_PHRASES[best_specific][0]
+    elif best_generic is not None:
+        params['livestock_type'] = GENERIC_DEFAULT_TYPES[LIVESTOCK_PHRASES[best_generic][0]]
+    
+    # Chunks (other than the last) that end with a location or price keyword
+    keyword_ends = [
+        (i, next(k for k in CHUNK_KEYWORDS if chunk.endswith(k)))
+        for i, chunk in enumerate(chunks[:-1]) if chunk.endswith(CHUNK_KEYWORDS)
     ]
     
+    # Location: the first keyword group whose first match names a valid place
+    for keywords, word_start in LOCATION_KEYWORDS:
+        i = next((
+            i + 1 for i, keyword in keyword_ends
+            if keyword in keywords
+            and not (word_start and len(chunks[i]) > len(keyword) and _is_word_char(chunks[i][-len(keyword) - 1]))
+            and chunks[i + 1].isascii() and chunks[i + 1].isalpha()
+        ), None)
+        if i is None:
+            continue
+        location = chunks[i].title()
+        location_key = location.lower()
+        is_state = i + 1 < len(chunks) and chunks[i + 1] == 'state' and location_key in NIGERIAN_STATES
+        if location_key in VALID_LOCATIONS or is_state:
+            # "Cattle Sokoto Gudali in Lagos": a location word inside a breed name is not a location
+            is_part_of_livestock_name = any(
+                words[k + 1] == location_key and words[k] in species and words[k + 2] in breeds
+                and gaps[k + 1].isspace() and gaps[k + 2].isspace()
+                for k in range(len(words) - 2)
+                for species, breeds in BREED_CONTEXT
+            )
+            if not is_part_of_livestock_name:
+                params['location']['city'] = location
+                if is_state:
+                    params['location']['state'] = NIGERIAN_STATES[location_key]
+                break
+    
+    # Price: the first keyword with a number after it
+    for first, *rest in PRICE_KEYWORDS:
+        price_match = next(filter(None, (
+            PRICE_VALUE_PATTERN.match(chunks[i + len(rest) + 1])
+            for i, keyword in keyword_ends
+            if keyword == first and i + len(rest) + 1 < len(chunks)
+            and all(chunks[i + j] == word for j, word in enumerate(rest, 1))
+        )), None)
+        if price_match:
+            price_value = int(price_match.group(1).replace(',', ''))
+            # Validate reasonable price range (1,000 to 10,000,000 Naira)
+            if 1000 <= price_value <= 10000000:
+                params['price_range']['max'] = price_value
+            elif price_value < 1000:
+                params['price_range']['invalid'] = True
+            break
+    
+    # Quantity: the first digit run that starts an amount with a unit
+    for digits in DIGIT_RUN_PATTERN.finditer(query_lower) if 'ton' in query_lower or 'kg' in query_lower else ():
+        quantity_match = QUANTITY_PATTERN.match(query_lower, digits.start())
+        if quantity_match:
+            amount = float(quantity_match.group(1))
+            # Validate reasonable quantity (0.1 to 1000 tons)
+            if 0.1 <= amount <= 1000:
+                params['quantity']['amount'] = amount
+                params['quantity']['unit'] = quantity_match.group(2)
+            break
+    
+    if not QUALITY_WORDS.isdisjoint(word_set) or any(
+        w.startswith(('top', 'high')) and _is_quality_compound(w) for w in words
+    ):
+        params['quality_requirements']['top_rated'] = True
+    
+    return params
+
+# Reference parameter extraction: one regex search per pattern
+def _extract_simple_parameters_regex(query: str) -> Dict[str, Any]:
+    query_lower = query.lower()
+    params = {
+        'livestock_type': None,
+        'location': {},
+        'price_range': {},
+        'quantity': {},
+        'quality_requirements': {}
+    }
+    
     # Check for invalid livestock types first (common non-livestock animals)
-    invalid_livestock = r'\b(pigs?|horses?|rabbits?|ducks?|turkeys?|guinea fowls?|guinea|donkeys?|camels?|dinosaurs?|dogs?|cats?|elephants?|lions?|unicorns?)\b'
-    has_invalid_livestock = bool(re.search(invalid_livestock, query_lower))
+    has_invalid_livestock = bool(INVALID_LIVESTOCK_PATTERN.search(query_lower))
     if has_invalid_livestock:
         # Mark as invalid livestock query - return early with no results
         params['livestock_type'] = None
@@ -492,11 +1755,11 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
         return params
     else:
         # Check if this is a price-based query (has price terms)
-        has_price_terms = bool(re.search(r'\b(under|below|less\s+than|maximum|cheap|affordable|budget|inexpensive)\b', query_lower))
+        has_price_terms = bool(PRICE_TERMS_PATTERN.search(query_lower))
         
         # Extract valid livestock types (check in order of specificity)
-        for livestock_type, pattern in livestock_patterns:
-            if re.search(pattern, query_lower):
+        for livestock_type, pattern in LIVESTOCK_PATTERNS:
+            if pattern.search(query_lower):
                 # For price-based queries, use generic types only for generic terms
                 if has_price_terms:
                     # Only use generic types for truly generic searches
@@ -515,78 +1778,41 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
         
         # If no specific match found and no price terms, try generic patterns
         if not params['livestock_type'] and not has_price_terms:
-            for livestock_type, pattern in livestock_patterns:
-                if livestock_type.startswith('GENERIC_') and re.search(pattern, query_lower):
+            for livestock_type, pattern in LIVESTOCK_PATTERNS:
+                if livestock_type.startswith('GENERIC_') and pattern.search(query_lower):
                     # Convert generic type to specific default type
-                    if livestock_type == 'GENERIC_GOAT':
-                        params['livestock_type'] = 'Goat Sokoto Red'
-                    elif livestock_type == 'GENERIC_SHEEP':
-                        params['livestock_type'] = 'Sheep Yankasa'
-                    elif livestock_type == 'GENERIC_CATTLE':
-                        params['livestock_type'] = 'Cattle Sokoto Gudali'
-                    elif livestock_type == 'GENERIC_POULTRY':
-                        params['livestock_type'] = 'Poultry Broiler'
-                    elif livestock_type == 'GENERIC_FISH':
-                        params['livestock_type'] = 'Fish Tilapia'
+                    params['livestock_type'] = GENERIC_DEFAULT_TYPES[livestock_type]
                     break
     
     # Extract location with validation - context-aware livestock type filtering
-    location_patterns = [
-        r'\bin\s+([a-zA-Z]+)(?:\s+state)?(?:\s+under|\s+with|\s*$|\s)',  # "in Lagos state" or "in Lagos under" or "in Lagos"
-        r'(?:from|at)\s+([a-zA-Z]+)(?:\s+state)?(?:\s+under|\s+with|\s*$|\s)',  # "from Lagos state" or "at Lagos"
-        r'(?:near|around)\s+([a-zA-Z]+)(?:\s+state)?(?:\s+under|\s+with|\s*$|\s)'  # "near Lagos state"
-    ]
-    
-    # Valid Nigerian locations (including Sokoto as a city)
-    valid_locations = [
-        'Kaduna', 'Lagos', 'Abuja', 'Fct', 'Kano', 'Ibadan', 
-        'Port Harcourt', 'Benin City', 'Maiduguri', 'Jos', 
-        'Ilorin', 'Owerri', 'Calabar', 'Sokoto', 'Enugu', 'Zaria',
-        'Bauchi', 'Plateau', 'Benue', 'Taraba', 'Kebbi', 'Zamfara'
-    ]
-    
-    for pattern in location_patterns:
-        location_match = re.search(pattern, query_lower)
+    for pattern in LOCATION_PATTERNS:
+        location_match = pattern.search(query_lower)
         if location_match:
             location = location_match.group(1).strip().title()
             
             # Check if location is valid first
-            is_valid_location = any(
-                valid_loc.lower() == location.lower()
-                for valid_loc in valid_locations
-            )
+            is_valid_location = location.lower() in VALID_LOCATIONS
+            # "in Kaduna state" searches every city in the state
+            is_state = bool(location_match.group(2)) and location.lower() in NIGERIAN_STATES
             
-            if is_valid_location:
+            if is_valid_location or is_state:
                 # Context-aware filtering: check if this location word appears as part of a livestock breed name
                 # For example, "Cattle Sokoto Gudali in Lagos" vs "Fish in Sokoto"
-                is_part_of_livestock_name = False
-                
-                # Check if the location appears immediately after livestock type words
-                livestock_context_patterns = [
-                    rf'\b(?:cattle|goat|sheep)\s+{location.lower()}\s+(?:red|gudali|yankasa|balami|uda|white|fulani)\b',
-                    rf'\b(?:poultry)\s+{location.lower()}\s+(?:broiler|noiler|layer)\b'
-                ]
-                
-                for livestock_pattern in livestock_context_patterns:
-                    if re.search(livestock_pattern, query_lower):
-                        is_part_of_livestock_name = True
-                        break
+                is_part_of_livestock_name = any(
+                    livestock_pattern.search(query_lower)
+                    for livestock_pattern in LIVESTOCK_CONTEXT_PATTERNS[location.lower()]
+                )
                 
                 # Only use as location if it's not part of a livestock breed name
                 if not is_part_of_livestock_name:
                     params['location']['city'] = location
+                    if is_state:
+                        params['location']['state'] = NIGERIAN_STATES[location.lower()]
                     break
     
     # Extract price with validation
-    price_patterns = [
-        r'under\s+₦?(\d+(?:,\d+)*)',
-        r'below\s+₦?(\d+(?:,\d+)*)',
-        r'less\s+than\s+₦?(\d+(?:,\d+)*)',
-        r'maximum\s+₦?(\d+(?:,\d+)*)'
-    ]
-    
-    for pattern in price_patterns:
-        price_match = re.search(pattern, query_lower)
+    for pattern in PRICE_PATTERNS:
+        price_match = pattern.search(query_lower)
         if price_match:
             price_str = price_match.group(1).replace(',', '')
             try:
@@ -603,7 +1829,7 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
             break
     
     # Extract quantity
-    quantity_match = re.search(r'(\d+(?:\.\d+)?)\s*(tons?|kg|tonnes?)', query_lower)
+    quantity_match = QUANTITY_PATTERN.search(query_lower)
     if quantity_match:
         amount = float(quantity_match.group(1))
         unit = quantity_match.group(2)
@@ -614,13 +1840,8 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
             params['quantity']['unit'] = unit
     
     # Quality requirements - enhanced patterns
-    quality_patterns = [
-        r'\b(top.?rated|highest.?rating|best|premium|high.?quality|excellent)\b',
-        r'\b(quality|rated|rating)\b'
-    ]
-    
-    for pattern in quality_patterns:
-        if re.search(pattern, query_lower):
+    for pattern in QUALITY_PATTERNS:
+        if pattern.search(query_lower):
             params['quality_requirements']['top_rated'] = True
             break
     
@@ -629,28 +1850,61 @@ def extract_simple_parameters(query: str) -> Dict[str, Any]:
 def validate_query(query: str) -> None:
     if not query or not query.strip():
         raise ValidationError("Query cannot be empty")
-    if len(query) > 500:
-        raise ValidationError("Query too long (max 500 characters)")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValidationError(f"Query too long (max {MAX_QUERY_LENGTH} characters)")
     
     # Check for potentially harmful content
-    harmful_patterns = [r'<script', r'javascript:', r'on\w+\s*=', r'eval\s*\(', r'exec\s*\(']
-    for pattern in harmful_patterns:
-        if re.search(pattern, query, re.IGNORECASE):
+    for pattern in HARMFUL_PATTERNS:
+        if pattern.search(query):
             raise ValidationError("Query contains invalid content")
 
+# Canonical query form: lowercase, comma-grouped numbers (40,000 or 1,50,000)
+# joined into one number, punctuation and currency symbols as spaces, single
+# spaces. The characters the harmful-content patterns look for (< : = and
+# parentheses) are kept, as are decimal points.
+THOUSANDS_SEPARATOR_PATTERN = re.compile(r'(?<=\d),(?=\d)')
+QUERY_PUNCTUATION_PATTERN = re.compile(r'[^\w\s<:=().]|(?<!\d)\.|\.(?!\d)')
+
+def canonical_query(query: str) -> str:
+    """
+    Canonical form of a query, so that "Find Cattle sellers!" and
+    "find cattle sellers" share one parse: "under ₦40,000" becomes "under 40000"
+    """
+    query = THOUSANDS_SEPARATOR_PATTERN.sub('', query.lower())
+    return ' '.join(QUERY_PUNCTUATION_PATTERN.sub(' ', query).split())
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _parse_canonical_query(canonical: str) -> Dict[str, Any]:
+    # A punctuation-only query canonicalizes to "" and parses as empty
+    if canonical:
+        validate_query(canonical)
+    return _fill_from_typo_corrections(canonical, extract_simple_parameters(canonical))
+
+def parse_query(query: str) -> Dict[str, Any]:
+    """
+    Validated search parameters for a query, served from a bounded LRU keyed
+    by canonical_query. Raises ValidationError for invalid queries.
+    """
+    # Canonicalization only shortens a query, so the length limit applies to the raw text
+    if not query or not query.strip():
+        raise ValidationError("Query cannot be empty")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValidationError(f"Query too long (max {MAX_QUERY_LENGTH} characters)")
+    params = _parse_canonical_query(canonical_query(query))
+    # Cached params are shared; callers get their own nested dicts
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in params.items()}
+
+def query_cache_stats() -> Dict[str, int]:
+    info = _parse_canonical_query.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
 def validate_livestock_type(livestock_type: str) -> None:
     if not livestock_type or not livestock_type.strip():
         raise ValidationError("Livestock type cannot be empty")
     
-    valid_types = [
-        'Poultry Broiler', 'Poultry Noiler', 'Cattle Sokoto Gudali', 
-        'Fish Tilapia', 'Fish Catfish', 'Fish Heterotis',
-        'Goat Sokoto Red', 'Sheep Yankasa', 'Sheep Balami'
-    ]
-    
     # Allow partial matches for flexibility
-    if not any(livestock_type.lower() in vt.lower() or vt.lower() in livestock_type.lower() for vt in valid_types):
-        raise ValidationError(f"Invalid livestock type. Available types: {', '.join(valid_types)}")
+    if not any(livestock_type.lower() in vt.lower() or vt.lower() in livestock_type.lower() for vt in VALID_LIVESTOCK_TYPES):
+        raise ValidationError(f"Invalid livestock type. Available types: {', '.join(VALID_LIVESTOCK_TYPES)}")
 
 def validate_location(location: str) -> None:
     if not location or not location.strip():
@@ -675,157 +1929,86 @@ def validate_radius(radius: float) -> None:
 
 # Initialize services
 matching_service = LivestockMatchingService()
+search_response_cache = SearchResponseCache(
+    matching_service.config['search_cache_size'], matching_service.config['search_cache_ttl_seconds']
+)
+
+# Continuation cursors are signed so clients cannot forge offsets or params. A cursor
+# may come back to any container, so they all need the deployment's key; without
+# one no cursors are issued or accepted.
+if matching_service.config['cursor_signing_key']:
+    CURSOR_SIGNING_KEY = matching_service.config['cursor_signing_key'].encode('utf-8')
+else:
+    app.log.warning("CURSOR_SIGNING_KEY is not set; responses carry no next_cursor")
+    CURSOR_SIGNING_KEY = None
+
+def encode_cursor(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Opaque continuation cursor: base64url JSON payload and its HMAC-SHA256
+    signature, or None when no CURSOR_SIGNING_KEY is configured
+    """
+    if CURSOR_SIGNING_KEY is None:
+        return None
+    data = base64.urlsafe_b64encode(
+        json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).rstrip(b'=')
+    return (data + b'.' + _cursor_signature(data)).decode('ascii')
+
+def decode_cursor(cursor: Any) -> Dict[str, Any]:
+    """Payload of a cursor issued by encode_cursor; raises ValidationError otherwise"""
+    if isinstance(cursor, str) and CURSOR_SIGNING_KEY is not None:
+        data, _, signature = cursor.encode('utf-8').partition(b'.')
+        if hmac.compare_digest(signature, _cursor_signature(data)):
+            return json.loads(base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4)))
+    raise ValidationError("Invalid cursor")
+
+def _cursor_signature(data: bytes) -> bytes:
+    digest = hmac.new(CURSOR_SIGNING_KEY, data, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=')
+
+def validate_limit(limit: Any) -> int:
+    if limit is None:
+        return DEFAULT_RESULT_LIMIT
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_RESULT_LIMIT:
+        raise ValidationError(f"limit must be an integer between 1 and {MAX_RESULT_LIMIT}")
+    return limit
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return {'status': 'healthy', 'service': 'livestock-matching-ai'}
+    return {
+        'status': 'healthy',
+        'service': 'livestock-matching-ai',
+        'query_cache': query_cache_stats(),
+        'search_cache': search_response_cache.stats(),
+    }
 
 @app.route('/search', methods=['POST'])
 def search_livestock():
     """
     Natural language livestock search endpoint
-    Accepts queries like: "Find goats in Kaduna under 40,000 Naira"
+    Accepts queries like: "Find goats in Kaduna under 40,000 Naira", with an
+    optional page size ("limit"). Responses with more ranked sellers carry a
+    "next_cursor" when CURSOR_SIGNING_KEY is set; posting it back as "cursor"
+    returns the next page.
     """
     try:
         request_data = app.current_request.json_body
         query = request_data.get('query', '').strip()
+        limit = validate_limit(request_data.get('limit'))
+        
+        if request_data.get('cursor'):
+            page = decode_cursor(request_data['cursor'])
+            # Pages are slices of one ranking, which only holds for one catalog version
+            catalog = matching_service.get_catalog()
+            if page['version'] != (catalog.version if catalog is not None else None):
+                raise ValidationError("Search results have changed since this cursor was issued; start a new search")
+            return _cached_search(page['params'], page['offset'], page['limit'] if 'limit' not in request_data else limit)
         
         if not query:
             raise ValidationError("Query is required")
         
-        validate_query(query)
-        
-        # Process natural language query with simple extraction
-        extracted_params = extract_simple_parameters(query)
-        
-        requested_livestock = extracted_params.get('livestock_type')
-        requested_location = extracted_params.get('location', {}).get('city')
-        requested_price = extracted_params.get('price_range', {}).get('max')
-        
-        # For location-specific queries, we need to check both location-specific and all results
-        if requested_location and requested_livestock:
-            # First, try to find results in the specific location
-            location_specific_results = matching_service.find_matching_sellers(extracted_params)
-            
-            # If no results in specific location, get all results to show alternatives
-            if not location_specific_results:
-                # Remove location filter and search again
-                params_without_location = extracted_params.copy()
-                params_without_location['location'] = {}
-                all_results = matching_service.find_matching_sellers(params_without_location, ignore_location_filter=True)
-                
-                # Filter results by location manually
-                other_location_results = [
-                    seller for seller in all_results 
-                    if seller.get('City', '').lower() != requested_location.lower()
-                ]
-                
-                # Set up location notice response
-                if other_location_results:
-                    show_location_notice = True
-                    search_message = f"No {requested_livestock} sellers found in {requested_location}. Showing available sellers in other locations:"
-                    final_results = other_location_results[:10]
-                else:
-                    show_location_notice = False
-                    search_message = f"No {requested_livestock} sellers found"
-                    final_results = []
-            else:
-                # Found results in requested location
-                show_location_notice = False
-                search_message = f"Found {len(location_specific_results)} seller{'s' if len(location_specific_results) != 1 else ''} for {requested_livestock} in {requested_location}"
-                final_results = location_specific_results
-        else:
-            # For non-location-specific queries, use standard search
-            raw_results = matching_service.find_matching_sellers(extracted_params)
-            show_location_notice = False
-            final_results = raw_results
-            
-            # Standard search summary for other cases
-            search_message = f"Found {len(raw_results)} seller{'s' if len(raw_results) != 1 else ''}"
-            if requested_livestock:
-                search_message += f" for {requested_livestock}"
-            if requested_location:
-                search_message += f" in {requested_location}"
-            if requested_price:
-                search_message += f" under ₦{requested_price:,}"
-        
-        # Format results for buyer consumption - simple and clear
-        buyer_results = []
-        for seller in final_results:
-            # Get seller rating with simple display
-            rating_value = round(float(seller.get('Rating', 0)), 1)
-            
-            # Use farm name directly from database (now stored in correct format)
-            farm_name = seller.get('Name', 'Unknown Farm')
-            
-            # Extract essential seller information - clean and simple
-            seller_info = {
-                'farm_name': farm_name,
-                'location': seller.get('City', 'Unknown'),
-                'rating': rating_value,
-                'phone': seller.get('Phone', 'Contact via platform'),
-                'livestock': []
-            }
-            
-            # Add livestock products with clear pricing
-            for product in seller.get('matching_products', []):
-                min_price = int(product.get('MinPrice', 0))
-                max_price = int(product.get('MaxPrice', 0))
-                
-                # Create simple price display
-                if min_price == max_price:
-                    price_display = f"₦{min_price:,}"
-                else:
-                    price_display = f"₦{min_price:,} - ₦{max_price:,}"
-                
-                livestock_info = {
-                    'type': product.get('LivestockType', 'Unknown'),
-                    'price': price_display
-                }
-                seller_info['livestock'].append(livestock_info)
-            
-            buyer_results.append(seller_info)
-        
-        # Create clean, buyer-focused response
-        if show_location_notice:
-            # When showing alternatives due to location unavailability
-            response = {
-                'message': f"No {requested_livestock} sellers found in {requested_location}. Showing {len(buyer_results)} sellers in nearby areas:",
-                'sellers': buyer_results,
-                'tip': "💡 Contact sellers about delivery to your area"
-            }
-        elif requested_location and requested_livestock and final_results:
-            # When found results in requested location
-            response = {
-                'message': f"Found {len(buyer_results)} {requested_livestock} seller{'s' if len(buyer_results) != 1 else ''} in {requested_location}",
-                'sellers': buyer_results,
-                'tip': "💡 Compare prices and ratings to find the best deal"
-            }
-        elif final_results:
-            # General search results
-            livestock_text = f" {requested_livestock} seller{'s' if len(buyer_results) != 1 else ''}" if requested_livestock else f" seller{'s' if len(buyer_results) != 1 else ''}"
-            location_text = f" in {requested_location}" if requested_location else ""
-            price_text = f" under ₦{requested_price:,}" if requested_price else ""
-            
-            response = {
-                'message': f"Found {len(buyer_results)}{livestock_text}{location_text}{price_text}",
-                'sellers': buyer_results,
-                'tip': "💡 Contact sellers directly to discuss your needs"
-            }
-        else:
-            # No results found
-            response = {
-                'message': "No sellers found matching your search",
-                'sellers': [],
-                'suggestions': [
-                    "Try a different livestock type",
-                    "Search in nearby cities", 
-                    "Increase your budget if you set a price limit"
-                ]
-            }
-        
-        return response
+        return _cached_search(parse_query(query), 0, limit)
         
     except ValidationError as e:
         return Response(
@@ -848,6 +2031,259 @@ def search_livestock():
             headers={'Content-Type': 'application/json'}
         )
 
+@app.route('/search/batch', methods=['POST'])
+def batch_search_livestock():
+    """
+    Run many natural language searches in one request
+    Accepts {"queries": [...]} and returns one result per query, in order:
+    {"query": ..., "response": {...}} or {"query": ..., "error": "..."}
+    """
+    try:
+        request_data = app.current_request.json_body
+        if request_data is not None and not isinstance(request_data, dict):
+            raise ValidationError('Request body must be a JSON object with "queries"')
+        queries = (request_data or {}).get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            raise ValidationError("queries must be a non-empty list")
+        if len(queries) > MAX_BATCH_QUERIES:
+            raise ValidationError(f"Too many queries (max {MAX_BATCH_QUERIES})")
+        
+        # Invalid queries get a per-item error; the rest are searched together
+        parsed = {}
+        errors = {}
+        for index, query in enumerate(queries):
+            try:
+                if not isinstance(query, str):
+                    raise ValidationError("Query must be a string")
+                if not query.strip():
+                    raise ValidationError("Query is required")
+                parsed[index] = parse_query(query.strip())
+            except ValidationError as e:
+                errors[index] = str(e)
+        
+        responses = dict(zip(parsed, _cached_searches(list(parsed.values()))))
+        
+        results = []
+        for index, query in enumerate(queries):
+            if index in errors:
+                results.append({'query': query, 'error': errors[index]})
+            else:
+                results.append({'query': query, 'response': responses[index]})
+        
+        return {
+            'results': results,
+            'unique_searches': len({SearchResponseCache.key(params) for params in parsed.values()}),
+        }
+        
+    except ValidationError as e:
+        return Response(
+            body={'error': str(e)},
+            status_code=400,
+            headers={'Content-Type': 'application/json'}
+        )
+    except Exception as e:
+        app.log.error(f"Unexpected error in batch search: {str(e)}")
+        return Response(
+            body={'error': 'Internal server error'},
+            status_code=500,
+            headers={'Content-Type': 'application/json'}
+        )
+
+def _cached_search(extracted_params: Dict[str, Any], offset: int = 0,
+                   limit: int = DEFAULT_RESULT_LIMIT) -> Dict[str, Any]:
+    return _cached_searches([extracted_params], offset, limit)[0]
+
+def _cached_searches(params_list: List[Dict[str, Any]], offset: int = 0,
+                     limit: int = DEFAULT_RESULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    /search response pages for parsed queries, in order. Identical params are
+    searched once; responses come from the response cache, keyed by params,
+    page and the catalog snapshot version, and all cache misses run in a
+    single request scope so each table read is made at most once. Without a
+    snapshot there is no version to key on, so the searches always run.
+    """
+    catalog = matching_service.get_catalog()
+    version = catalog.version if catalog is not None else None
+    
+    keys = [SearchResponseCache.key(params, offset, limit) for params in params_list]
+    responses = {}
+    misses = {}
+    for key, params in zip(keys, params_list):
+        if key in responses or key in misses:
+            continue
+        response = search_response_cache.get(version, key) if version is not None else None
+        if response is None:
+            misses[key] = params
+        else:
+            responses[key] = response
+    
+    if misses:
+        with matching_service.request_scope():
+            for key, params in misses.items():
+                responses[key] = _search(params, offset, limit, version)
+                if version is not None:
+                    search_response_cache.put(version, key, responses[key])
+    return [responses[key] for key in keys]
+
+def _search(extracted_params: Dict[str, Any], offset: int = 0, limit: int = DEFAULT_RESULT_LIMIT,
+            catalog_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a /search for parsed query params and build the buyer-facing response
+    for ranks [offset, offset + limit). Rankings are deterministic for a
+    catalog version, so consecutive pages never overlap or skip sellers.
+    """
+    # One extra rank tells whether a next page exists
+    depth = offset + limit
+    requested_livestock = extracted_params.get('livestock_type')
+    requested_location = extracted_params.get('location', {}).get('city')
+    requested_state = extracted_params.get('location', {}).get('state')
+    requested_price = extracted_params.get('price_range', {}).get('max')
+    
+    # For location-specific queries, we need to check both location-specific and all results
+    if requested_location and requested_livestock:
+        # First, try to find results in the specific location
+        location_specific_ranked = matching_service.find_matching_sellers(extracted_params, limit=depth + 1)
+        location_specific_results = location_specific_ranked[offset:depth]
+        has_more = len(location_specific_ranked) > depth
+        
+        # If no results in specific location, get all results to show alternatives
+        if not location_specific_ranked:
+            # Remove location filter and search again
+            params_without_location = extracted_params.copy()
+            params_without_location['location'] = {}
+            all_ranked = matching_service.find_matching_sellers(
+                params_without_location, ignore_location_filter=True, limit=depth + 1
+            )
+            all_results = all_ranked[offset:depth]
+            has_more = len(all_ranked) > depth
+            
+            # Filter results by location manually
+            if requested_state:
+                other_location_results = [
+                    seller for seller in all_results
+                    if seller.get('State', '').lower() != requested_state.lower()
+                ]
+            else:
+                other_location_results = [
+                    seller for seller in all_results 
+                    if seller.get('City', '').lower() != requested_location.lower()
+                ]
+            
+            # Set up location notice response
+            if other_location_results:
+                show_location_notice = True
+                search_message = f"No {requested_livestock} sellers found in {requested_location}. Showing available sellers in other locations:"
+                final_results = other_location_results
+            else:
+                show_location_notice = False
+                search_message = f"No {requested_livestock} sellers found"
+                final_results = []
+        else:
+            # Found results in requested location
+            show_location_notice = False
+            search_message = f"Found {len(location_specific_results)} seller{'s' if len(location_specific_results) != 1 else ''} for {requested_livestock} in {requested_location}"
+            final_results = location_specific_results
+    else:
+        # For non-location-specific queries, use standard search
+        ranked = matching_service.find_matching_sellers(extracted_params, limit=depth + 1)
+        raw_results = ranked[offset:depth]
+        has_more = len(ranked) > depth
+        show_location_notice = False
+        final_results = raw_results
+        
+        # Standard search summary for other cases
+        search_message = f"Found {len(raw_results)} seller{'s' if len(raw_results) != 1 else ''}"
+        if requested_livestock:
+            search_message += f" for {requested_livestock}"
+        if requested_location:
+            search_message += f" in {requested_location}"
+        if requested_price:
+            search_message += f" under ₦{requested_price:,}"
+    
+    # Format results for buyer consumption - simple and clear
+    buyer_results = []
+    for seller in final_results:
+        # Get seller rating with simple display
+        rating_value = round(float(seller.get('Rating', 0)), 1)
+        
+        # Use farm name directly from database (now stored in correct format)
+        farm_name = seller.get('Name', 'Unknown Farm')
+        
+        # Extract essential seller information - clean and simple
+        seller_info = {
+            'farm_name': farm_name,
+            'location': seller.get('City', 'Unknown'),
+            'rating': rating_value,
+            'phone': seller.get('Phone', 'Contact via platform'),
+            'livestock': []
+        }
+        
+        # Add livestock products with clear pricing
+        for product in seller.get('matching_products', []):
+            min_price = int(product.get('MinPrice', 0))
+            max_price = int(product.get('MaxPrice', 0))
+            
+            # Create simple price display
+            if min_price == max_price:
+                price_display = f"₦{min_price:,}"
+            else:
+                price_display = f"₦{min_price:,} - ₦{max_price:,}"
+            
+            livestock_info = {
+                'type': product.get('LivestockType', 'Unknown'),
+                'price': price_display
+            }
+            seller_info['livestock'].append(livestock_info)
+        
+        buyer_results.append(seller_info)
+    
+    # Create clean, buyer-focused response
+    if show_location_notice:
+        # When showing alternatives due to location unavailability
+        response = {
+            'message': f"No {requested_livestock} sellers found in {requested_location}. Showing {len(buyer_results)} sellers in nearby areas:",
+            'sellers': buyer_results,
+            'tip': "💡 Contact sellers about delivery to your area"
+        }
+    elif requested_location and requested_livestock and final_results:
+        # When found results in requested location
+        response = {
+            'message': f"Found {len(buyer_results)} {requested_livestock} seller{'s' if len(buyer_results) != 1 else ''} in {requested_location}",
+            'sellers': buyer_results,
+            'tip': "💡 Compare prices and ratings to find the best deal"
+        }
+    elif final_results:
+        # General search results
+        livestock_text = f" {requested_livestock} seller{'s' if len(buyer_results) != 1 else ''}" if requested_livestock else f" seller{'s' if len(buyer_results) != 1 else ''}"
+        location_text = f" in {requested_location}" if requested_location else ""
+        price_text = f" under ₦{requested_price:,}" if requested_price else ""
+        
+        response = {
+            'message': f"Found {len(buyer_results)}{livestock_text}{location_text}{price_text}",
+            'sellers': buyer_results,
+            'tip': "💡 Contact sellers directly to discuss your needs"
+        }
+    else:
+        # No results found
+        response = {
+            'message': "No sellers found matching your search",
+            'sellers': [],
+            'suggestions': [
+                "Try a different livestock type",
+                "Search in nearby cities", 
+                "Increase your budget if you set a price limit"
+            ]
+        }
+    
+    next_cursor = encode_cursor({
+        'params': extracted_params, 'offset': depth, 'limit': limit, 'version': catalog_version
+    }) if has_more else None
+    if next_cursor is not None:
+        response['next_cursor'] = next_cursor
+    return response
+
+
 @app.route('/recommendations/top-rated', methods=['POST'])
 def get_top_rated_sellers():
     """
@@ -953,25 +2389,60 @@ def proximity_search():
             headers={'Content-Type': 'application/json'}
         )
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 7232 requires for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (c[2:] if c.startswith('W/') else c for c in candidates)
+
+def _public_cache_control() -> str:
+    return f"public, max-age={matching_service.config['http_cache_max_age_seconds']}"
+
+def _conditional_response(etag: str, build_body) -> Response:
+    """
+    Answer a GET with a strong ETag: 304 without building the body when the
+    client already holds this representation, otherwise the body from
+    build_body(). Both carry Cache-Control so shared caches can reuse them.
+    """
+    headers = {
+        'ETag': etag,
+        'Cache-Control': _public_cache_control(),
+    }
+    if _etag_matches(app.current_request.headers.get('if-none-match'), etag):
+        return Response(body='', status_code=304, headers=headers)
+    headers['Content-Type'] = 'application/json'
+    return Response(body=build_body(), status_code=200, headers=headers)
+
 @app.route('/insights/popular-products', methods=['GET'])
 def get_popular_products():
     """
     Get insights on popular livestock products
     """
     try:
-        results = matching_service.get_popular_products()
+        def build_body():
+            return {
+                'message': f"Popular livestock types (by seller count)",
+                'products': matching_service.get_popular_products()
+            }
         
-        return {
-            'message': f"Popular livestock types (by seller count)",
-            'products': results
-        }
+        # The insights only change with the catalog, so its version identifies them
+        catalog = matching_service.get_catalog()
+        if catalog is None:
+            # No version to validate against: cacheable for max-age, without an ETag
+            return Response(
+                body=build_body(),
+                status_code=200,
+                headers={'Content-Type': 'application/json', 'Cache-Control': _public_cache_control()}
+            )
+        return _conditional_response(f'"popular-products-{catalog.version}"', build_body)
         
     except Exception as e:
         app.log.error(f"Error getting popular products: {str(e)}")
         return Response(
             body={'error': 'Internal server error'},
             status_code=500,
-            headers={'Content-Type': 'application/json'}
+            headers={'Content-Type': 'application/json', 'Cache-Control': 'no-store'}
         )
 
 @app.route('/search/bulk-capacity', methods=['POST'])
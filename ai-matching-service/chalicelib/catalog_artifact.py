@@ -0,0 +1,240 @@
+"""
+Catalog snapshot artifact
+Compact, versioned binary copy of the products and sellers tables that the
+data loaders write next to the tables and the matching service boots from.
+
+Layout (buffers use the writer's byte order, recorded in the header):
+    MAGIC                 8 bytes
+    header length         uint32
+    header                UTF-8 JSON: format, version, counts, column directory
+    padding               to an 8-byte boundary
+    column buffers        8-byte aligned; float64 columns, int32 string-table
+                          indexes, and offsets/values pairs for ID lists
+
+Every string (IDs, names, cities, types) is stored once in a shared string
+table, so columns only hold int32 indexes into it. The file is read through
+mmap and typed memoryviews, so no JSON or per-item parsing is involved, and
+decoded into plain item dicts column by column; the matching service copies
+those into its snapshot records anyway.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Any, Optional
+
+MAGIC = b'LVCATLG\x00'
+FORMAT_VERSION = 1
+ARTIFACT_NAME = 'catalog.snapshot'
+
+# Column kinds
+FLOAT = 'f8'
+STRING = 'str'
+ID_LIST = 'ids'
+
+# Catalog schema shared by the loaders and the service's record types
+PRODUCT_COLUMNS = {
+    'ProductId': STRING,
+    'LivestockType': STRING,
+    'Species': STRING,
+    'Breed': STRING,
+    'BasePrice': FLOAT,
+    'MinPrice': FLOAT,
+    'MaxPrice': FLOAT,
+    'SellerIds': ID_LIST,
+}
+
+SELLER_COLUMNS = {
+    'SellerId': STRING,
+    'Name': STRING,
+    'Phone': STRING,
+    'City': STRING,
+    'State': STRING,
+    'Latitude': FLOAT,
+    'Longitude': FLOAT,
+    'Rating': FLOAT,
+    'QuantityTonsAvailable': FLOAT,
+    'PhotoURL': STRING,
+    'StockScore': FLOAT,
+    'PriceScore': FLOAT,
+    'DeliveryScore': FLOAT,
+    'ProductIds': ID_LIST,
+}
+
+_TABLES = (('products', 'ProductId', PRODUCT_COLUMNS), ('sellers', 'SellerId', SELLER_COLUMNS))
+_HEADER_LENGTH = struct.Struct('<I')
+_ALIGNMENT = 8
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def catalog_fingerprint(products: List[Dict[str, Any]], sellers: List[Dict[str, Any]]) -> str:
+    """
+    Content version of a catalog, independent of where the items came from:
+    numbers are compared as floats so loader Decimals, table Decimals and
+    artifact floats of the same value fingerprint identically, and only
+    schema attributes count, as only those are stored in the artifact.
+    """
+    def canonical(value):
+        if isinstance(value, Decimal):
+            return float(value)
+        raise TypeError(f"Unsupported catalog value: {value!r}")
+
+    digest = hashlib.sha1()
+    for table, key_name, schema in _TABLES:
+        items = products if table == 'products' else sellers
+        for item in sorted(items, key=lambda i: str(i.get(key_name))):
+            content = {name: value for name, value in item.items() if name in schema}
+            digest.update(json.dumps(content, sort_keys=True, default=canonical).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def write_catalog_artifact(path: str, products: List[Dict[str, Any]], sellers: List[Dict[str, Any]],
+                           version: Optional[str] = None) -> str:
+    """
+    Write products and sellers to a snapshot artifact at path and return its
+    version. Attributes outside the catalog schema are not stored; a missing
+    ID list is stored as empty. The file is replaced atomically.
+    """
+    if version is None:
+        version = catalog_fingerprint(products, sellers)
+
+    strings = {}
+    def string_index(value) -> int:
+        return strings.setdefault(str(value), len(strings))
+
+    buffers = {}
+    counts = {}
+    for table, key_name, schema in _TABLES:
+        items = sorted(products if table == 'products' else sellers, key=lambda i: str(i.get(key_name)))
+        counts[table] = len(items)
+        for name, kind in schema.items():
+            column = f"{table}.{name}"
+            if kind == FLOAT:
+                buffers[column] = array('d', (float(item[name]) if name in item else float('nan') for item in items))
+            elif kind == STRING:
+                buffers[column] = array('i', (string_index(item[name]) if name in item else -1 for item in items))
+            else:
+                offsets, values = array('i', [0]), array('i')
+                for item in items:
+                    values.extend(string_index(v) for v in item.get(name) or [])
+                    offsets.append(len(values))
+                buffers[f"{column}.offsets"] = offsets
+                buffers[f"{column}.values"] = values
+
+    encoded = [value.encode('utf-8') for value in strings]
+    string_offsets = array('i', [0])
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+    buffers['strings.offsets'] = string_offsets
+    buffers['strings.data'] = b''.join(encoded)
+
+    directory = {}
+    position = 0
+    for column, buffer in buffers.items():
+        size = len(buffer) if isinstance(buffer, bytes) else buffer.itemsize * len(buffer)
+        directory[column] = {
+            'typecode': 'B' if isinstance(buffer, bytes) else buffer.typecode,
+            'offset': position,
+            'length': len(buffer),
+        }
+        position += _aligned(size)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'version': version,
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'byteorder': sys.byteorder,
+        'counts': counts,
+        'columns': directory,
+    }, sort_keys=True).encode('utf-8')
+    prefix = MAGIC + _HEADER_LENGTH.pack(len(header)) + header
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(prefix + b'\x00' * (_aligned(len(prefix)) - len(prefix)))
+        for buffer in buffers.values():
+            data = buffer if isinstance(buffer, bytes) else buffer.tobytes()
+            f.write(data + b'\x00' * (_aligned(len(data)) - len(data)))
+    os.replace(temp_path, path)
+    return version
+
+
+def read_catalog_artifact(path: str) -> Dict[str, Any]:
+    """
+    Memory-map a snapshot artifact and decode it into catalog items.
+    Returns a dict with version, created_at, products and sellers; numbers
+    come back as floats. Raises ArtifactError for unreadable artifacts.
+    """
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _decode(view)
+            finally:
+                view.release()
+
+
+def _decode(view: memoryview) -> Dict[str, Any]:
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ArtifactError("Not a catalog snapshot artifact")
+    header_start = len(MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack(view[len(MAGIC):header_start])
+    try:
+        header = json.loads(bytes(view[header_start:header_start + header_length]).decode('utf-8'))
+    except ValueError as e:
+        raise ArtifactError(f"Corrupt artifact header: {str(e)}")
+    if header.get('format') != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format {header.get('format')}")
+    data_start = _aligned(header_start + header_length)
+    swap = header['byteorder'] != sys.byteorder
+
+    def column(name: str):
+        entry = header['columns'][name]
+        start = data_start + entry['offset']
+        raw = view[start:start + entry['length'] * array(entry['typecode']).itemsize]
+        if entry['typecode'] == 'B':
+            return raw
+        if swap:
+            values = array(entry['typecode'], raw.tobytes())
+            values.byteswap()
+            return values
+        return raw.cast(entry['typecode'])
+
+    string_offsets = column('strings.offsets')
+    string_data = column('strings.data')
+    strings = [
+        str(string_data[string_offsets[i]:string_offsets[i + 1]], 'utf-8')
+        for i in range(len(string_offsets) - 1)
+    ]
+
+    catalog = {'version': header['version'], 'created_at': header['created_at']}
+    for table, _, schema in _TABLES:
+        items = [{} for _ in range(header['counts'][table])]
+        for name, kind in schema.items():
+            if kind == FLOAT:
+                for item, value in zip(items, column(f"{table}.{name}")):
+                    if value == value:  # NaN marks a missing attribute
+                        item[name] = value
+            elif kind == STRING:
+                for item, index in zip(items, column(f"{table}.{name}")):
+                    if index >= 0:
+                        item[name] = strings[index]
+            else:
+                offsets = column(f"{table}.{name}.offsets")
+                values = column(f"{table}.{name}.values")
+                for i, item in enumerate(items):
+                    item[name] = [strings[v] for v in values[offsets[i]:offsets[i + 1]]]
+        catalog[table] = items
+    return catalog
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
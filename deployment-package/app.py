@@ -5,9 +5,13 @@ Built with AWS Chalice - Single Table Design
 from chalice import Chalice, Response
 import json
 import logging
+import base64
 import boto3
+import hashlib
+import hmac
 import os
 import re
+import time
 from boto3.dynamodb.conditions import Key, Attr
 from typing import Dict, List, Any, Optional
 from decimal import Decimal
@@ -28,14 +32,78 @@ def get_config():
     return {
         'aws_region': os.getenv('AWS_DEFAULT_REGION', 'us-east-1'),
         'livestock_table_name': os.getenv('LIVESTOCK_TABLE_NAME', 'livestock-matching-table'),
+        'products_cache_ttl_seconds': int(os.getenv('PRODUCTS_CACHE_TTL_SECONDS', '60')),
+        'http_cache_max_age_seconds': int(os.getenv('HTTP_CACHE_MAX_AGE_SECONDS', '60')),
+        'cursor_signing_key': os.getenv('CURSOR_SIGNING_KEY'),
     }
 
+# GET /products page sizes, and how many pages a container keeps
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+PRODUCT_PAGE_CACHE_SIZE = 256
+
+# Item the data loaders write last on every load (see delta_load.py), holding
+# the table's content version in CatalogVersion; it is not a product
+CATALOG_VERSION_KEY = '#catalog-version'
+CATALOG_VERSION_ATTRIBUTE = 'CatalogVersion'
+
 # Matching Service
 class LivestockMatchingService:
     def __init__(self):
         self.config = get_config()
         self.dynamodb = boto3.resource('dynamodb', region_name=self.config['aws_region'])
         self.table = self.dynamodb.Table(self.config['livestock_table_name'])
+        
+        # GET /products pages by (catalog version or None, limit, start key): (products, last key, etag, loaded_at)
+        self._product_pages = {}
+    
+    def get_catalog_version(self) -> Optional[str]:
+        """The table's catalog version with a single GetItem, or None if no loader recorded one"""
+        response = self.table.get_item(Key={'ProductName': CATALOG_VERSION_KEY})
+        return response.get('Item', {}).get(CATALOG_VERSION_ATTRIBUTE)
+    
+    def get_product_page(self, limit: int, start_key: Optional[Dict[str, Any]] = None,
+                         version: Optional[str] = None) -> tuple:
+        """
+        Return (products, last_evaluated_key, etag) for a GET /products page of
+        at most limit items after start_key. With the catalog version the page
+        is cached per container until the version changes and its ETag is
+        product_page_etag(); without one (tables loaded before version items)
+        the page is re-read every products_cache_ttl_seconds and its ETag is a
+        fingerprint of the page.
+        """
+        cache_key = json.dumps([version, limit, start_key], sort_keys=True)
+        page = self._product_pages.get(cache_key)
+        if page is None or (version is None and time.monotonic() - page[3] > self.config['products_cache_ttl_seconds']):
+            scan_params = {'Limit': limit}
+            if start_key:
+                scan_params['ExclusiveStartKey'] = start_key
+            response = self.table.scan(**scan_params)
+            products = []
+            for item in response['Items']:
+                if item.get('ProductName') == CATALOG_VERSION_KEY:
+                    continue
+                product_info = {
+                    'product_name': item.get('ProductName'),
+                    'species': item.get('Species'),
+                    'base_price': float(item.get('BasePrice', 0)),
+                    'price_range': f"₦{int(item.get('MinPrice', 0)):,} - ₦{int(item.get('MaxPrice', 0)):,}",
+                    'seller_count': len(item.get('SellerIds', []))
+                }
+                products.append(product_info)
+            
+            last_key = response.get('LastEvaluatedKey')
+            if version is not None:
+                etag = product_page_etag(version, limit, start_key)
+            else:
+                fingerprint = hashlib.sha1(json.dumps([products, last_key], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+                etag = f'"products-{fingerprint}"'
+            page = (products, last_key, etag, time.monotonic())
+            self._product_pages.pop(cache_key, None)
+            self._product_pages[cache_key] = page
+            while len(self._product_pages) > PRODUCT_PAGE_CACHE_SIZE:
+                self._product_pages.pop(next(iter(self._product_pages)))
+        return page[0], page[1], page[2]
     
     def find_matching_sellers(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
         try:
@@ -57,6 +125,7 @@ class LivestockMatchingService:
         
         product_name = params.get('product_name')
         species = params.get('species')
+        max_price = params.get('price_range', {}).get('max')
         
         try:
             if product_name:
@@ -66,10 +135,23 @@ class LivestockMatchingService:
                 )
                 if 'Item' in response:
                     products.append(response['Item'])
+            elif species and max_price:
+                # Read only the species' products within budget from the price-ordered index
+                query_params = {
+                    'IndexName': 'SpeciesPriceIndex',
+                    'KeyConditionExpression': Key('Species').eq(species) & Key('MinPrice').lte(Decimal(str(max_price)))
+                }
+                while True:
+                    response = self.table.query(**query_params)
+                    products.extend(response['Items'])
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+                return products
             else:
                 # Scan all products and filter by species if specified
                 response = self.table.scan()
-                all_products = response['Items']
+                all_products = [item for item in response['Items'] if item.get('ProductName') != CATALOG_VERSION_KEY]
                 
                 if species:
                     # Filter by species
@@ -237,9 +319,49 @@ def validate_query(query: str) -> None:
     if len(query) > 500:
         raise ValidationError("Query too long (max 500 characters)")
 
+def validate_page_size(limit: Optional[str]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        raise ValidationError(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}")
+    return int(limit)
+
 # Initialize services
 matching_service = LivestockMatchingService()
 
+# Continuation cursors are signed so clients cannot forge scan positions. A cursor
+# may come back to any container, so they all need the deployment's key; without
+# one no cursors are issued or accepted.
+if matching_service.config['cursor_signing_key']:
+    CURSOR_SIGNING_KEY = matching_service.config['cursor_signing_key'].encode('utf-8')
+else:
+    app.log.warning("CURSOR_SIGNING_KEY is not set; responses carry no next_cursor")
+    CURSOR_SIGNING_KEY = None
+
+def encode_cursor(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Opaque continuation cursor: base64url JSON payload and its HMAC-SHA256
+    signature, or None when no CURSOR_SIGNING_KEY is configured
+    """
+    if CURSOR_SIGNING_KEY is None:
+        return None
+    data = base64.urlsafe_b64encode(
+        json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).rstrip(b'=')
+    return (data + b'.' + _cursor_signature(data)).decode('ascii')
+
+def decode_cursor(cursor: Any) -> Dict[str, Any]:
+    """Payload of a cursor issued by encode_cursor; raises ValidationError otherwise"""
+    if isinstance(cursor, str) and CURSOR_SIGNING_KEY is not None:
+        data, _, signature = cursor.encode('utf-8').partition(b'.')
+        if hmac.compare_digest(signature, _cursor_signature(data)):
+            return json.loads(base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4)))
+    raise ValidationError("Invalid cursor")
+
+def _cursor_signature(data: bytes) -> bytes:
+    digest = hmac.new(CURSOR_SIGNING_KEY, data, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b'=')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -302,34 +424,67 @@ def search_livestock():
             headers={'Content-Type': 'application/json'}
         )
 
+def product_page_etag(version: str, limit: int, start_key: Optional[Dict[str, Any]]) -> str:
+    """ETag of a GET /products page: the catalog version plus the page's position"""
+    position = hashlib.sha1(json.dumps([limit, start_key], sort_keys=True, default=str).encode('utf-8')).hexdigest()[:8]
+    return f'"products-{version}-{position}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 7232 requires for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (c[2:] if c.startswith('W/') else c for c in candidates)
+
 @app.route('/products', methods=['GET'])
 def list_products():
     """
-    List all available products
+    List available products, at most "limit" per page
+    A response with more products carries "next_cursor" when CURSOR_SIGNING_KEY
+    is set; passing it back as the "cursor" query parameter returns the next page.
     """
     try:
-        response = matching_service.table.scan()
-        products = []
+        query_params = app.current_request.query_params or {}
+        limit = validate_page_size(query_params.get('limit'))
+        start_key = decode_cursor(query_params['cursor'])['start_key'] if query_params.get('cursor') else None
         
-        for item in response['Items']:
-            product_info = {
-                'product_name': item.get('ProductName'),
-                'species': item.get('Species'),
-                'base_price': float(item.get('BasePrice', 0)),
-                'price_range': f"₦{int(item.get('MinPrice', 0)):,} - ₦{int(item.get('MaxPrice', 0)):,}",
-                'seller_count': len(item.get('SellerIds', []))
-            }
-            products.append(product_info)
+        cache_control = f"public, max-age={matching_service.config['http_cache_max_age_seconds']}"
+        if_none_match = app.current_request.headers.get('if-none-match')
         
-        return {
+        # Revalidation costs one GetItem of the catalog version, never a scan
+        version = matching_service.get_catalog_version()
+        if version is not None:
+            etag = product_page_etag(version, limit, start_key)
+            if _etag_matches(if_none_match, etag):
+                return Response(body='', status_code=304, headers={'ETag': etag, 'Cache-Control': cache_control})
+        
+        products, last_key, etag = matching_service.get_product_page(limit, start_key, version)
+        headers = {'ETag': etag, 'Cache-Control': cache_control}
+        
+        if _etag_matches(if_none_match, etag):
+            return Response(body='', status_code=304, headers=headers)
+        
+        body = {
             'message': f"Found {len(products)} products",
             'products': products
         }
+        next_cursor = encode_cursor({'start_key': last_key}) if last_key else None
+        if next_cursor is not None:
+            body['next_cursor'] = next_cursor
         
+        headers['Content-Type'] = 'application/json'
+        return Response(body=body, status_code=200, headers=headers)
+        
+    except ValidationError as e:
+        return Response(
+            body={'error': str(e)},
+            status_code=400,
+            headers={'Content-Type': 'application/json', 'Cache-Control': 'no-store'}
+        )
     except Exception as e:
         app.log.error(f"Error listing products: {str(e)}")
         return Response(
             body={'error': 'Internal server error'},
             status_code=500,
-            headers={'Content-Type': 'application/json'}
+            headers={'Content-Type': 'application/json', 'Cache-Control': 'no-store'}
         )
\ No newline at end of file
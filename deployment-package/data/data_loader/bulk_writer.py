@@ -0,0 +1,161 @@
+"""
+Bulk DynamoDB writer shared by the data loaders
+Buffers puts and deletes into 25-item BatchWriteItem requests, sends them
+from a thread pool, retries unprocessed items with jittered exponential
+backoff, and reports throughput when the writer is closed.
+"""
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Optional
+
+from botocore.exceptions import ClientError
+
+# BatchWriteItem limits
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_RETRIES = 8
+BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+BATCH_WRITE_MAX_DELAY_SECONDS = 5.0
+DEFAULT_WRITE_WORKERS = 8
+
+# Errors after which the same batch is sent again
+RETRYABLE_ERROR_CODES = frozenset([
+    'ProvisionedThroughputExceededException', 'ThrottlingException',
+    'RequestLimitExceeded', 'InternalServerError',
+])
+
+
+class BulkWriteError(Exception):
+    pass
+
+
+class BulkWriter:
+    """
+    Bulk puts and deletes on one table:
+
+        with BulkWriter(products_table, description='products') as writer:
+            for item in items:
+                writer.put(item)
+
+    Requests for the same key are applied in the order they were made, so the
+    last put or delete of a key wins, as with serial put_item calls. At most
+    two batches per worker are in flight, so memory stays bounded however
+    many items are written. Leaving the block waits for every batch and
+    prints throughput; a failed batch raises BulkWriteError.
+    """
+    def __init__(self, table, workers: int = DEFAULT_WRITE_WORKERS, description: str = 'items',
+                 key_names: Optional[List[str]] = None):
+        self.table = table
+        self.workers = workers
+        self.description = description
+        self.key_names = key_names or [key['AttributeName'] for key in table.key_schema]
+
+        self._buffer = {}  # key -> request, in arrival order
+        self._in_flight = {}  # future -> keys of its batch
+        self._executor = None
+        self._lock = threading.Lock()
+        self._started_at = None
+
+        self.items_written = 0
+        self.batches = 0
+        self.retries = 0
+
+    def __enter__(self) -> 'BulkWriter':
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+        if exc_type is None:
+            self.report()
+        return False
+
+    def put(self, item: Dict[str, Any]) -> None:
+        self._add(self._key(item), {'PutRequest': {'Item': item}})
+
+    def delete(self, key: Dict[str, Any]) -> None:
+        key = {name: key[name] for name in self.key_names}
+        self._add(self._key(key), {'DeleteRequest': {'Key': key}})
+
+    def flush(self) -> None:
+        """Send buffered requests and wait for every batch in flight"""
+        if self._buffer:
+            self._submit()
+        self._wait_for_in_flight(0)
+
+    def stats(self) -> Dict[str, float]:
+        seconds = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            'items': self.items_written,
+            'batches': self.batches,
+            'retries': self.retries,
+            'seconds': seconds,
+            'items_per_second': self.items_written / seconds if seconds else 0.0,
+        }
+
+    def report(self) -> None:
+        stats = self.stats()
+        print(
+            f"Wrote {stats['items']} {self.description} to {self.table.name} in {stats['batches']} batches "
+            f"({stats['retries']} retries): {stats['seconds']:.1f}s, {stats['items_per_second']:.0f} items/s"
+        )
+
+    def _key(self, item: Dict[str, Any]) -> tuple:
+        return tuple(item[name] for name in self.key_names)
+
+    def _add(self, key: tuple, request: Dict[str, Any]) -> None:
+        if key in self._buffer:
+            # A batch may not name a key twice; the later request replaces the earlier one
+            del self._buffer[key]
+        else:
+            # An earlier request for this key may still be in flight; let it land first
+            while any(key in keys for keys in self._in_flight.values()):
+                self._wait_for_in_flight(len(self._in_flight) - 1)
+        self._buffer[key] = request
+        if len(self._buffer) >= BATCH_WRITE_MAX_ITEMS:
+            self._submit()
+
+    def _submit(self) -> None:
+        requests = list(self._buffer.values())
+        keys = set(self._buffer)
+        self._buffer = {}
+        self._wait_for_in_flight(2 * self.workers - 1)
+        self._in_flight[self._executor.submit(self._send, requests)] = keys
+
+    def _wait_for_in_flight(self, limit: int) -> None:
+        while len(self._in_flight) > limit:
+            done, _ = wait(self._in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                del self._in_flight[future]
+                future.result()
+
+    def _send(self, requests: List[Dict[str, Any]]) -> None:
+        """Write one batch, retrying UnprocessedItems and throttling with jittered exponential backoff"""
+        name = self.table.name
+        total = len(requests)
+        for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+            try:
+                response = self.table.meta.client.batch_write_item(RequestItems={name: requests})
+                requests = response.get('UnprocessedItems', {}).get(name, [])
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in RETRYABLE_ERROR_CODES:
+                    raise
+
+            if not requests:
+                with self._lock:
+                    self.items_written += total
+                    self.batches += 1
+                return
+            if attempt < BATCH_WRITE_MAX_RETRIES:
+                with self._lock:
+                    self.retries += 1
+                delay = min(BATCH_WRITE_MAX_DELAY_SECONDS, BATCH_WRITE_BASE_DELAY_SECONDS * (2 ** attempt))
+                time.sleep(random.uniform(0, delay))
+
+        raise BulkWriteError(f"BatchWriteItem left {len(requests)} requests unprocessed on {name}")
@@ -13,10 +13,19 @@ ENVIRONMENT = os.getenv('ENVIRONMENT', 'dev')
 PRODUCTS_TABLE_NAME = os.getenv('PRODUCTS_TABLE_NAME', f"{PROJECT_NAME}-{ENVIRONMENT}-products")
 SELLERS_TABLE_NAME = os.getenv('SELLERS_TABLE_NAME', f"{PROJECT_NAME}-{ENVIRONMENT}-sellers")
 
+# Parallel BatchWriteItem workers per table load
+WRITE_WORKERS = int(os.getenv('LOADER_WRITE_WORKERS', '8'))
+
 # Data File Paths
 DATASETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'datasets')
 SELLERS_EXCEL_FILE = os.path.join(DATASETS_DIR, 'sellers_dataset.xlsx')
 
+# Catalog snapshot artifact the matching service boots from (written after each load)
+CATALOG_ARTIFACT_PATH = os.getenv(
+    'CATALOG_ARTIFACT_PATH',
+    os.path.join(os.path.dirname(__file__), '..', '..', '..', 'ai-matching-service', 'chalicelib', 'catalog.snapshot')
+)
+
 # Verify file exists
 if not os.path.exists(SELLERS_EXCEL_FILE):
     print(f"Warning: Excel file not found at {SELLERS_EXCEL_FILE}")
@@ -0,0 +1,177 @@
+"""
+Delta loads shared by the data loaders
+Every item a loader computes carries a hash of its content in ItemHash. A
+delta load reads the keys and hashes already in the table, writes only the
+items whose content changed, and deletes the items the new load no longer
+produces once every write has landed, so the table is never empty part-way
+through a refresh.
+"""
+import hashlib
+import json
+from decimal import Decimal
+from typing import Dict, List, Any, Optional
+
+from bulk_writer import BulkWriter, DEFAULT_WRITE_WORKERS
+
+ITEM_HASH_ATTRIBUTE = 'ItemHash'
+PLAN_SAMPLE_SIZE = 10
+
+# Version item: one item per table whose CatalogVersion changes whenever any
+# other item does, so readers can learn the table's version with one GetItem
+VERSION_ITEM_KEY = '#catalog-version'
+VERSION_ATTRIBUTE = 'CatalogVersion'
+
+# Plan actions
+CREATE = 'create'
+UPDATE = 'update'
+UNCHANGED = 'unchanged'
+DELETE = 'delete'
+
+
+def item_hash(item: Dict[str, Any]) -> str:
+    """Content hash of an item, ignoring any hash already stored on it"""
+    def canonical(value):
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Unsupported item value: {value!r}")
+
+    content = {name: value for name, value in item.items() if name != ITEM_HASH_ATTRIBUTE}
+    data = json.dumps(content, sort_keys=True, separators=(',', ':'), default=canonical)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+
+def stored_hashes(table, key_names: List[str]) -> Dict[tuple, Optional[str]]:
+    """Key -> stored ItemHash for every item in the table, following LastEvaluatedKey"""
+    names = {f"#a{i}": name for i, name in enumerate(key_names + [ITEM_HASH_ATTRIBUTE])}
+    params = {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+    hashes = {}
+    while True:
+        response = table.scan(**params)
+        for item in response['Items']:
+            hashes[tuple(item[name] for name in key_names)] = item.get(ITEM_HASH_ATTRIBUTE)
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            return hashes
+        params['ExclusiveStartKey'] = last_evaluated_key
+
+
+class DeltaLoad:
+    """
+    Delta load of one table:
+
+        with DeltaLoad(products_table, description='products', dry_run=DRY_RUN) as delta:
+            for item in items:
+                delta.put(item)
+
+    put() stamps the item's hash on it and writes it only when the table holds
+    different content for its key. Leaving the block deletes every item that
+    was not put and prints the plan. With dry_run the plan is printed and
+    nothing is written; with rewrite every put item is written regardless of
+    its stored hash. With version_item, the table's version item (keyed
+    VERSION_ITEM_KEY) is written last, once every put and delete has landed.
+    """
+    def __init__(self, table, workers: int = DEFAULT_WRITE_WORKERS, description: str = 'items',
+                 key_names: Optional[List[str]] = None, dry_run: bool = False, rewrite: bool = False,
+                 version_item: bool = False):
+        self.table = table
+        self.workers = workers
+        self.description = description
+        self.key_names = key_names or [key['AttributeName'] for key in table.key_schema]
+        self.dry_run = dry_run
+        self.rewrite = rewrite
+        self.version_key = (VERSION_ITEM_KEY,) if version_item else None
+
+        self._stored = {}
+        self._stored_version = None
+        self._current = {}  # key -> hash of the item last put
+        self.actions = {}  # key -> plan action
+        self._writer = None
+
+    def __enter__(self) -> 'DeltaLoad':
+        self._stored = stored_hashes(self.table, self.key_names)
+        self._stored_version = self._stored.pop(self.version_key, None)
+        if not self.dry_run:
+            self._writer = BulkWriter(self.table, workers=self.workers, description=self.description,
+                                      key_names=self.key_names).__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None:
+            if self._writer is not None:
+                self._writer.__exit__(exc_type, exc_value, traceback)
+            return False
+
+        stale = [key for key in self._stored if key not in self._current]
+        for key in stale:
+            self.actions[key] = DELETE
+        if self._writer is not None:
+            try:
+                # Remove stale items only after every new and changed item is in place
+                self._writer.flush()
+                for key in stale:
+                    self._writer.delete(dict(zip(self.key_names, key)))
+                if self.version_key is not None:
+                    self._writer.flush()
+                    self._put_version_item()
+            except BaseException as e:
+                self._writer.__exit__(type(e), e, e.__traceback__)
+                raise
+            self._writer.__exit__(None, None, None)
+        self.report()
+        return False
+
+    def put(self, item: Dict[str, Any]) -> None:
+        key = tuple(item[name] for name in self.key_names)
+        digest = item_hash(item)
+        item[ITEM_HASH_ATTRIBUTE] = digest
+
+        stored = self._stored.get(key)
+        if key not in self._stored:
+            self.actions[key] = CREATE
+        else:
+            self.actions[key] = UNCHANGED if stored == digest else UPDATE
+
+        # A key put again (a product finalized twice) is compared with what was last put
+        previous = self._current[key] if key in self._current else stored
+        self._current[key] = digest
+        if self._writer is not None and (self.rewrite or digest != previous):
+            self._writer.put(item)
+
+    @property
+    def version(self) -> str:
+        """Content version of the items put so far: a hash of their keys and item hashes"""
+        digest = hashlib.sha1()
+        for key, item_digest in sorted(self._current.items()):
+            digest.update(json.dumps([[str(part) for part in key], item_digest]).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def _put_version_item(self) -> None:
+        item = dict(zip(self.key_names, self.version_key))
+        item[VERSION_ATTRIBUTE] = self.version
+        item[ITEM_HASH_ATTRIBUTE] = item_hash(item)
+        if self.rewrite or item[ITEM_HASH_ATTRIBUTE] != self._stored_version:
+            self._writer.put(item)
+
+    @property
+    def items_written(self) -> int:
+        return self._writer.items_written if self._writer is not None else 0
+
+    def plan(self) -> Dict[str, List[tuple]]:
+        plan = {CREATE: [], UPDATE: [], UNCHANGED: [], DELETE: []}
+        for key, action in self.actions.items():
+            plan[action].append(key)
+        return plan
+
+    def report(self) -> None:
+        plan = self.plan()
+        mode = 'Dry run' if self.dry_run else 'Delta load'
+        print(
+            f"{mode} of {self.description} in {self.table.name}: {len(plan[CREATE])} to create, "
+            f"{len(plan[UPDATE])} to update, {len(plan[DELETE])} to delete, {len(plan[UNCHANGED])} unchanged"
+        )
+        for action in (CREATE, UPDATE, DELETE):
+            keys = plan[action]
+            if keys:
+                sample = ', '.join('/'.join(str(part) for part in key) for key in keys[:PLAN_SAMPLE_SIZE])
+                more = f" (+{len(keys) - PLAN_SAMPLE_SIZE} more)" if len(keys) > PLAN_SAMPLE_SIZE else ''
+                print(f"  {action}: {sample}{more}")
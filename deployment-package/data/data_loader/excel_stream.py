@@ -0,0 +1,101 @@
+"""
+Streaming seller spreadsheet ingest shared by the data loaders
+Reads the workbook in openpyxl read-only mode and yields one row at a time,
+and folds rows into per-key running state so that memory grows with the
+number of products and sellers, not with the number of rows.
+"""
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import openpyxl
+
+REQUIRED_COLUMN = 'SellerID'
+
+
+def iter_sheet_rows(path: str, sheet_name: str = 'Sheet1') -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of a sheet as dicts keyed by the header row, skipping rows
+    without a SellerID. The workbook is streamed, never loaded whole.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header_row = next(rows, None) or ()
+        headers = [value for value in header_row if value]
+        for row in rows:
+            row_dict = {headers[i]: value for i, value in enumerate(row) if i < len(headers)}
+            if row_dict.get(REQUIRED_COLUMN):  # Skip empty rows
+                yield row_dict
+    finally:
+        wb.close()
+
+
+class PriceStats:
+    """Running min/max/sum/count of a price column"""
+    __slots__ = ('minimum', 'maximum', 'total', 'count')
+
+    def __init__(self):
+        self.minimum = None
+        self.maximum = None
+        self.total = 0
+        self.count = 0
+
+    def add(self, price) -> None:
+        if self.count == 0 or price < self.minimum:
+            self.minimum = price
+        if self.count == 0 or price > self.maximum:
+            self.maximum = price
+        self.total += price
+        self.count += 1
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count
+
+
+def aggregate_by_key(rows: Iterator[Dict[str, Any]], key_name: str,
+                     new_state: Callable[[Dict[str, Any]], Any],
+                     update: Callable[[Any, Dict[str, Any]], None],
+                     on_final: Optional[Callable[[Any, Any], None]] = None) -> Dict[Any, Any]:
+    """
+    Fold rows into one running state per row[key_name] and return the states
+    in first-appearance order.
+
+    on_final(key, state) is called once per key when its state can no longer
+    change. While the sheet is sorted by key_name that is as soon as the
+    key's run of rows ends, so items can be written while the rest of the
+    sheet is still being read; once a key goes backwards the remaining keys
+    are finalized after the last row. A key that was finalized early and then
+    shows up again is finalized a second time with its complete state.
+    """
+    states = {}
+    finalized = set()
+    ordered = True
+    current = None
+    for row in rows:
+        key = row[key_name]
+        if key != current:
+            if current is not None and ordered:
+                if not _ascending(current, key):
+                    ordered = False
+                elif on_final is not None:
+                    on_final(current, states[current])
+                    finalized.add(current)
+            finalized.discard(key)
+            current = key
+        state = states.get(key)
+        if state is None:
+            state = states[key] = new_state(row)
+        update(state, row)
+
+    if on_final is not None:
+        for key, state in states.items():
+            if key not in finalized:
+                on_final(key, state)
+    return states
+
+
+def _ascending(previous, key) -> bool:
+    try:
+        return key > previous
+    except TypeError:  # Blank or mixed-type keys: treat the sheet as unsorted
+        return False
@@ -1,7 +1,7 @@
 import boto3
-import openpyxl
 import random
 import os
+import sys
 from decimal import Decimal
 from collections import defaultdict
 
@@ -11,7 +11,19 @@ try:
 except ImportError:
     pass
 
-from config import AWS_REGION, PRODUCTS_TABLE_NAME, SELLERS_TABLE_NAME, SELLERS_EXCEL_FILE
+from config import AWS_REGION, PRODUCTS_TABLE_NAME, SELLERS_TABLE_NAME, SELLERS_EXCEL_FILE, CATALOG_ARTIFACT_PATH, WRITE_WORKERS
+from delta_load import DeltaLoad
+from excel_stream import PriceStats, aggregate_by_key, iter_sheet_rows
+
+# Snapshot artifact writer shared with the matching service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'ai-matching-service'))
+try:
+    from chalicelib.catalog_artifact import write_catalog_artifact
+except ImportError:
+    write_catalog_artifact = None
+
+DRY_RUN = '--dry-run' in sys.argv[1:]  # Print the delta plan without writing
+FULL_RELOAD = '--full' in sys.argv[1:]  # Rewrite every item, even if unchanged
 
 # AWS setup
 dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
@@ -27,40 +39,36 @@ cities = [
     # Add 10-20 more for variety
 ]
 
-# Load Excel
+# Stream the seller sheet: each product is written as soon as its rows are
+# all read, sellers once the whole sheet has been read
+seller_data = {}  # For Sellers table
+seller_product_ids = defaultdict(set)  # Seller -> products adjacency, denormalized onto sellers
+product_items = {}
 
-wb = openpyxl.load_workbook(SELLERS_EXCEL_FILE)
-sheet = wb['Sheet1']
-data = []
-headers = [cell.value for cell in sheet[1] if cell.value]
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    row_dict = {headers[i]: value for i, value in enumerate(row) if i < len(headers)}
-    if row_dict.get('SellerID'):  # Skip empty
-        data.append(row_dict)
+def new_product(entry):
+    return {'SellerIds': set(), 'UnitPrices': PriceStats()}
 
-# Group for Products table
-products_dict = defaultdict(lambda: {'SellerIds': [], 'UnitPrices': []})
-seller_data = defaultdict(dict)  # For Sellers table
-
-for entry in data:
+def add_row(info, entry):
     product_id = entry['ProductID']
     seller_id = entry['SellerID']
-    livestock_type = f"{entry['Species']} {entry['Breed']}"
     
     # Products aggregation
-    products_dict[product_id]['SellerIds'].append(seller_id)
-    products_dict[product_id]['LivestockType'] = livestock_type  # Assume consistent per product
-    products_dict[product_id]['Species'] = entry['Species']
-    products_dict[product_id]['Breed'] = entry['Breed']
-    products_dict[product_id]['UnitPrices'].append(entry['UnitPrice'])
+    info['SellerIds'].add(seller_id)
+    info['LivestockType'] = f"{entry['Species']} {entry['Breed']}"  # Assume consistent per product
+    info['Species'] = entry['Species']
+    info['Breed'] = entry['Breed']
+    info['UnitPrices'].add(entry['UnitPrice'])
+    seller_product_ids[seller_id].add(product_id)
     
     # Sellers aggregation (take first occurrence for shared fields)
-    if not seller_data[seller_id]:
-        city = random.choice(cities)
+    if seller_id not in seller_data:
+        # Placeholder details are seeded per seller so unchanged rows reload as unchanged items
+        placeholder = random.Random(seller_id)
+        city = placeholder.choice(cities)
         seller_data[seller_id] = {
             'SellerId': seller_id,
             'Name': f"Farm {seller_id.replace('SELL', '')}",  # Convert SELL1024 to Farm 1024
-            'Phone': f"+234{random.randint(1000000000, 9999999999)}",  # Placeholder
+            'Phone': f"+234{placeholder.randint(1000000000, 9999999999)}",  # Placeholder
             'City': city['City'],
             'State': city['State'],
             'Latitude': Decimal(str(city['Lat'])),
@@ -78,23 +86,43 @@ for entry in data:
         seller_data[seller_id]['QuantityTonsAvailable'], Decimal(str(entry['Quantity'] or 0))
     )
 
-# Load Sellers table
-for seller in seller_data.values():
-    sellers_table.put_item(Item=seller)
+# Load Products table, writing only new and changed items, then its version item
+with DeltaLoad(products_table, workers=WRITE_WORKERS, description='products',
+               dry_run=DRY_RUN, rewrite=FULL_RELOAD, version_item=True) as delta:
+    def write_product(product_id, info):
+        prices = info['UnitPrices']
+        product = {
+            'ProductId': product_id,
+            'LivestockType': info['LivestockType'],
+            'Species': info['Species'],
+            'Breed': info['Breed'],
+            'BasePrice': Decimal(str(prices.average)),  # Average
+            'MinPrice': Decimal(str(prices.minimum)),
+            'MaxPrice': Decimal(str(prices.maximum)),
+            'SellerIds': sorted(info['SellerIds'])  # Dedupe
+        }
+        product_items[product_id] = product
+        delta.put(product)
+
+    aggregate_by_key(iter_sheet_rows(SELLERS_EXCEL_FILE), 'ProductID', new_product, add_row, write_product)
+
+# Load Sellers table, writing only new and changed items, then its version item
+with DeltaLoad(sellers_table, workers=WRITE_WORKERS, description='sellers',
+               dry_run=DRY_RUN, rewrite=FULL_RELOAD, version_item=True) as delta:
+    for seller in seller_data.values():
+        seller['ProductIds'] = sorted(seller_product_ids[seller['SellerId']])
+        delta.put(seller)
 
-# Load Products table
-for product_id, info in products_dict.items():
-    min_price = min(info['UnitPrices'])
-    max_price = max(info['UnitPrices'])
-    products_table.put_item(Item={
-        'ProductId': product_id,
-        'LivestockType': info['LivestockType'],
-        'Species': info['Species'],
-        'Breed': info['Breed'],
-        'BasePrice': Decimal(str(sum(info['UnitPrices']) / len(info['UnitPrices']))),  # Average
-        'MinPrice': Decimal(str(min_price)),
-        'MaxPrice': Decimal(str(max_price)),
-        'SellerIds': list(set(info['SellerIds']))  # Dedupe
-    })
+print("Data loaded successfully!")
 
-print("Data loaded successfully!")
\ No newline at end of file
+# Write the catalog snapshot artifact from exactly the items loaded above
+if DRY_RUN:
+    print("Dry run: catalog snapshot artifact not written")
+elif write_catalog_artifact is None:
+    print("Warning: ai-matching-service not found, skipping catalog snapshot artifact")
+else:
+    try:
+        version = write_catalog_artifact(CATALOG_ARTIFACT_PATH, list(product_items.values()), list(seller_data.values()))
+        print(f"Catalog snapshot {version} written to {CATALOG_ARTIFACT_PATH}")
+    except Exception as e:
+        print(f"Warning: Could not write catalog snapshot artifact: {str(e)}")
\ No newline at end of file
@@ -1,18 +1,27 @@
 """
 Data Loader for livestock-matching-table
 Loads data from Excel into a single DynamoDB table with embedded seller information
+
+Usage: python data_loader.py [--dry-run] [--full]
 """
 import boto3
-import openpyxl
 import random
 import os
+import sys
 from decimal import Decimal
-from collections import defaultdict
 
 # Configuration
 AWS_REGION = 'us-east-1'
 TABLE_NAME = 'livestock-matching-table'
 SELLERS_EXCEL_FILE = '../data/datasets/sellers_dataset.xlsx'
+WRITE_WORKERS = int(os.getenv('LOADER_WRITE_WORKERS', '8'))
+DRY_RUN = '--dry-run' in sys.argv[1:]  # Print the delta plan without writing
+FULL_RELOAD = '--full' in sys.argv[1:]  # Rewrite every item, even if unchanged
+
+# Bulk writer and delta loads shared by the data loaders
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'data_loader'))
+from delta_load import DeltaLoad
+from excel_stream import PriceStats, aggregate_by_key, iter_sheet_rows
 
 # AWS setup
 dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
@@ -34,42 +43,38 @@ cities = [
 
 print(f"Loading data from {SELLERS_EXCEL_FILE}...")
 
-# Load Excel file
+# Stream the Excel file: rows are read one at a time and folded into running
+# per-product state, and each product is written as soon as its rows are all read
 excel_path = os.path.join(os.path.dirname(__file__), SELLERS_EXCEL_FILE)
-wb = openpyxl.load_workbook(excel_path)
-sheet = wb['Sheet1']
-
-# Extract headers and data
-data = []
-headers = [cell.value for cell in sheet[1] if cell.value]
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    row_dict = {headers[i]: value for i, value in enumerate(row) if i < len(headers)}
-    if row_dict.get('SellerID'):  # Skip empty rows
-        data.append(row_dict)
-
-print(f"Loaded {len(data)} rows from Excel")
+rows_read = 0
+product_order = {}  # ProductID -> position of its first row
+name_order = {}  # ProductName -> position of the latest product seen under it
 
-# Group data by ProductID and aggregate seller information
-products_dict = defaultdict(lambda: {'SellerIds': [], 'UnitPrices': [], 'Sellers': {}})
+def new_product(entry):
+    product_order[entry['ProductID']] = len(product_order)
+    return {'UnitPrices': PriceStats(), 'Sellers': {}}
 
-for entry in data:
-    product_id = entry['ProductID']
+def add_row(info, entry):
+    global rows_read
+    rows_read += 1
     seller_id = entry['SellerID']
-    livestock_type = f"{entry['Species']} {entry['Breed']}"
     
     # Add to products dictionary
-    products_dict[product_id]['LivestockType'] = livestock_type
-    products_dict[product_id]['Species'] = entry['Species']
-    products_dict[product_id]['Breed'] = entry['Breed']
-    products_dict[product_id]['UnitPrices'].append(entry['UnitPrice'])
+    info['LivestockType'] = f"{entry['Species']} {entry['Breed']}"
+    info['Species'] = entry['Species']
+    info['Breed'] = entry['Breed']
+    name_order[entry['Breed']] = max(name_order.get(entry['Breed'], -1), product_order[entry['ProductID']])
+    info['UnitPrices'].add(entry['UnitPrice'])
     
     # Store seller information (only once per seller per product)
-    if seller_id not in products_dict[product_id]['Sellers']:
-        city = random.choice(cities)
-        products_dict[product_id]['Sellers'][seller_id] = {
+    if seller_id not in info['Sellers']:
+        # Placeholder details are seeded per seller so unchanged rows reload as unchanged items
+        placeholder = random.Random(seller_id)
+        city = placeholder.choice(cities)
+        info['Sellers'][seller_id] = {
             'SellerId': seller_id,
             'Name': f"Farm {seller_id.replace('SELL', '')}",
-            'Phone': f"+234{random.randint(7000000000, 9999999999)}",
+            'Phone': f"+234{placeholder.randint(7000000000, 9999999999)}",
             'City': city['City'],
             'State': city['State'],
             'Latitude': Decimal(str(city['Lat'])),
@@ -82,55 +87,40 @@ for entry in data:
             'DeliveryScore': Decimal(str(entry['DeliveryScore'] or 0))
         }
 
-print(f"Processed {len(products_dict)} unique products")
+# Load data into DynamoDB table, writing only new and changed items and deleting
+# stale ones afterwards, so the table is never empty during a reload. The version
+# item written last gives the API a catalog version (and /products ETag) per GetItem
+with DeltaLoad(table, workers=WRITE_WORKERS, description='products', key_names=['ProductName'],
+               dry_run=DRY_RUN, rewrite=FULL_RELOAD, version_item=True) as delta:
+    def write_product(product_id, info):
+        # Products sharing a breed share one item; the one whose rows start last wins,
+        # so skip products already superseded by a later one
+        product_name = info['Breed']  # ProductName is now the primary key
+        if name_order[product_name] > product_order[product_id]:
+            return
+        
+        # Convert sellers dict to list
+        sellers_list = list(info['Sellers'].values())
+        
+        # Create item with ProductName as the primary key (simplified structure)
+        item = {
+            'ProductName': product_name,  # ProductName is the primary key
+            'Species': info['Species'],  # Add Species field as requested
+            'BasePrice': Decimal(str(round(info['UnitPrices'].average, 2))),
+            'MaxPrice': Decimal(str(info['UnitPrices'].maximum)),
+            'MinPrice': Decimal(str(info['UnitPrices'].minimum)),
+            'SellerIds': sellers_list
+        }
+        delta.put(item)
 
-# Clear existing data from table
-print("Clearing existing data from table...")
-try:
-    # Scan and delete all existing items
-    response = table.scan()
-    items_to_delete = response['Items']
-    
-    # Delete items in batches
-    with table.batch_writer() as batch:
-        for item in items_to_delete:
-            batch.delete_item(Key={'ProductName': item['ProductName']})
-    
-    print(f"Deleted {len(items_to_delete)} existing items")
-except Exception as e:
-    print(f"Error clearing table: {str(e)}")
+    products_dict = aggregate_by_key(iter_sheet_rows(excel_path), 'ProductID', new_product, add_row, write_product)
+items_loaded = delta.items_written
 
-# Load data into DynamoDB table
-items_loaded = 0
-for product_id, info in products_dict.items():
-    min_price = min(info['UnitPrices'])
-    max_price = max(info['UnitPrices'])
-    base_price = sum(info['UnitPrices']) / len(info['UnitPrices'])
-    
-    # Convert sellers dict to list
-    sellers_list = list(info['Sellers'].values())
-    
-    # Create item with ProductName as the primary key (simplified structure)
-    product_name = info['Breed']  # ProductName is now the primary key
-    item = {
-        'ProductName': product_name,  # ProductName is the primary key
-        'Species': info['Species'],  # Add Species field as requested
-        'BasePrice': Decimal(str(round(base_price, 2))),
-        'MaxPrice': Decimal(str(max_price)),
-        'MinPrice': Decimal(str(min_price)),
-        'SellerIds': sellers_list
-    }
-    
-    try:
-        table.put_item(Item=item)
-        items_loaded += 1
-        if items_loaded % 10 == 0:
-            print(f"Loaded {items_loaded} items...")
-    except Exception as e:
-        print(f"Error loading {product_id}: {str(e)}")
+print(f"Loaded {rows_read} rows from Excel")
+print(f"Processed {len(products_dict)} unique products")
 
 print(f"\n✅ Data loading complete!")
-print(f"Total items loaded: {items_loaded}")
+print(f"Total items written: {items_loaded}")
 print(f"Table name: {TABLE_NAME}")
 print(f"Region: {AWS_REGION}")
 
@@ -142,7 +132,7 @@ if items_loaded > 0:
     print(f"ProductName (PK): {sample_info['Breed']}")
     print(f"Species: {sample_info['Species']}")
     print(f"Number of sellers: {len(sample_info['Sellers'])}")
-    print(f"Price range: {min(sample_info['UnitPrices'])} - {max(sample_info['UnitPrices'])}")
+    print(f"Price range: {sample_info['UnitPrices'].minimum} - {sample_info['UnitPrices'].maximum}")
 
 # Verify the data structure
 print("\n🔍 Verifying loaded data...")
@@ -107,6 +107,9 @@ cd ../..
 # Step 3: Update Chalice Configuration
 echo "⚙️  Step 3: Updating Chalice Configuration..."
 
+# Every Lambda container signs and checks pagination cursors with the same key
+CURSOR_SIGNING_KEY=$(python -c "import secrets; print(secrets.token_urlsafe(32))")
+
 # Update .chalice/config.json with actual table names
 cat > .chalice/config.json << EOF
 {
@@ -120,6 +123,7 @@ cat > .chalice/config.json << EOF
             "environment_variables": {
                 "PRODUCTS_TABLE_NAME": "$PRODUCTS_TABLE",
                 "SELLERS_TABLE_NAME": "$SELLERS_TABLE",
+                "CURSOR_SIGNING_KEY": "$CURSOR_SIGNING_KEY",
                 "BEDROCK_MODEL_ID": "anthropic.claude-3-sonnet-20240229-v1:0"
             }
         }
@@ -8,6 +8,24 @@ resource "aws_dynamodb_table" "livestock_matching" {
     type = "S"
   }
 
+  attribute {
+    name = "Species"
+    type = "S"
+  }
+
+  attribute {
+    name = "MinPrice"
+    type = "N"
+  }
+
+  # Price-ordered products per species for "under ₦X" searches
+  global_secondary_index {
+    name            = "SpeciesPriceIndex"
+    hash_key        = "Species"
+    range_key       = "MinPrice"
+    projection_type = "ALL"
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -18,6 +18,11 @@ resource "aws_dynamodb_table" "livestock_products" {
     type = "S"
   }
 
+  attribute {
+    name = "MinPrice"
+    type = "N"
+  }
+
   global_secondary_index {
     name            = "SpeciesIndex"
     hash_key        = "Species"
@@ -30,6 +35,14 @@ resource "aws_dynamodb_table" "livestock_products" {
     projection_type = "ALL"
   }
 
+  # Price-ordered products per type for "under ₦X" searches
+  global_secondary_index {
+    name            = "LivestockTypePriceIndex"
+    hash_key        = "LivestockType"
+    range_key       = "MinPrice"
+    projection_type = "ALL"
+  }
+
   point_in_time_recovery {
     enabled = true
   }
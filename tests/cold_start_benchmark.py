@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the matching service
+Imports ai-matching-service/app.py in fresh interpreters, the way a new Lambda
+container does, and reports where the time goes: module import, the first
+/health call, and the deferred boto3 and numpy initialisation that the first
+data access pays for. Runs offline; no AWS calls are made.
+
+Usage: python tests/cold_start_benchmark.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ai-matching-service')
+
+# Timed in a fresh interpreter; prints one JSON line of phase durations in ms
+PHASES_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.health_check()
+health = time.perf_counter()
+app.matching_service.products_table
+connected = time.perf_counter()
+app._numpy()
+numpy_loaded = time.perf_counter()
+print(json.dumps({
+    'import app': (imported - start) * 1000,
+    'first /health': (health - imported) * 1000,
+    'boto3 resource + tables': (connected - health) * 1000,
+    'numpy': (numpy_loaded - connected) * 1000,
+}))
+"""
+
+def run_phases() -> Dict[str, float]:
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get('AWS_DEFAULT_REGION', 'eu-west-1'))
+    output = subprocess.run(
+        [sys.executable, '-c', PHASES_SCRIPT], cwd=SERVICE_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def import_breakdown(top: int = 15) -> List[tuple]:
+    """Modules imported directly by app.py, by cumulative import time (ms)"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=SERVICE_DIR,
+        capture_output=True, text=True, check=True
+    ).stderr
+    children, modules = [], []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        # -X importtime prints a module after everything it imported
+        if depth == 1:
+            children.append((name.strip(), int(cumulative_us) / 1000))
+        elif depth == 0:
+            if name.strip() == 'app':
+                modules = children + [('app (module body)', int(self_us) / 1000)]
+            children = []
+    modules.sort(key=lambda m: m[1], reverse=True)
+    return modules[:top]
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("🚀 COLD START BENCHMARK")
+    print("=" * 60)
+    print(f"Fresh interpreters: {runs}\n")
+
+    samples = [run_phases() for _ in range(runs)]
+    print(f"{'Phase':<28}{'median ms':>12}{'max ms':>12}")
+    print("-" * 52)
+    for phase in samples[0]:
+        values = [sample[phase] for sample in samples]
+        print(f"{phase:<28}{statistics.median(values):>12.1f}{max(values):>12.1f}")
+
+    print("\n📦 Import breakdown (cumulative ms, single run)")
+    print("-" * 52)
+    for name, milliseconds in import_breakdown():
+        print(f"{name:<40}{milliseconds:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Shared pytest fixtures
+In-memory stand-ins for the DynamoDB tables and a small catalog, plus the
+matching service wired to them, so the unit tests run without AWS.
+"""
+import copy
+import os
+import sys
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AI_SERVICE_DIR = os.path.join(REPO_ROOT, 'ai-matching-service')
+LOADER_DIR = os.path.join(REPO_ROOT, 'deployment-package', 'data', 'data_loader')
+
+sys.path.insert(0, AI_SERVICE_DIR)
+sys.path.insert(0, LOADER_DIR)
+
+PRODUCTS_TABLE_NAME = 'test-livestock-products'
+SELLERS_TABLE_NAME = 'test-livestock-sellers'
+
+
+def _operand(value, item):
+    from boto3.dynamodb.conditions import AttributeBase
+    if isinstance(value, AttributeBase):
+        return item.get(value.name)
+    return value
+
+
+def condition_matches(condition, item) -> bool:
+    """Evaluate a boto3 Key/Attr condition against a plain item"""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return condition_matches(values[0], item) and condition_matches(values[1], item)
+    if operator == 'OR':
+        return condition_matches(values[0], item) or condition_matches(values[1], item)
+    if operator == 'NOT':
+        return not condition_matches(values[0], item)
+    left, right = _operand(values[0], item), _operand(values[-1], item)
+    if operator == '=':
+        return left == right
+    if operator == 'IN':
+        return left in right
+    if left is None:
+        return False
+    if operator == '<=':
+        return left <= right
+    if operator == '<':
+        return left < right
+    if operator == '>=':
+        return left >= right
+    if operator == '>':
+        return left > right
+    if operator == 'BETWEEN':
+        return _operand(values[1], item) <= left <= right
+    raise NotImplementedError(operator)
+
+
+class InMemoryTable:
+    """
+    DynamoDB Table stand-in keyed on one hash key. Scans and queries page
+    through items in key order, page_size at a time, and every read is
+    recorded in reads as (operation, IndexName). BatchWriteItem goes through
+    meta.client, as with boto3 Tables, and each batch's size is recorded in
+    batch_writes.
+    """
+    def __init__(self, resource, name: str, key_name: str, page_size: int = 3):
+        self.resource = resource
+        self.meta = SimpleNamespace(client=resource)
+        self.batch_writes = []
+        self.name = name
+        self.key_schema = [{'AttributeName': key_name, 'KeyType': 'HASH'}]
+        self.key_name = key_name
+        self.page_size = page_size
+        self.items = {}
+        self.reads = []
+        self._lock = threading.Lock()
+
+    def put_item(self, Item):
+        with self._lock:
+            self.items[Item[self.key_name]] = copy.deepcopy(Item)
+        return {}
+
+    def delete_item(self, Key):
+        with self._lock:
+            self.items.pop(Key[self.key_name], None)
+        return {}
+
+    def get_item(self, Key):
+        self.reads.append(('get_item', None))
+        item = self.items.get(Key[self.key_name])
+        return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def scan(self, FilterExpression=None, ProjectionExpression=None, ExpressionAttributeNames=None,
+             Segment=None, TotalSegments=None, Limit=None, ExclusiveStartKey=None):
+        self.reads.append(('scan', None))
+        items = list(self.items.values())
+        if TotalSegments:
+            items = [item for item in items if sorted(self.items).index(item[self.key_name]) % TotalSegments == Segment]
+        response = self._page(items, Limit, ExclusiveStartKey)
+        if FilterExpression is not None:
+            response['Items'] = [item for item in response['Items'] if condition_matches(FilterExpression, item)]
+        if ProjectionExpression:
+            names = [ExpressionAttributeNames.get(name.strip(), name.strip()) for name in ProjectionExpression.split(',')]
+            response['Items'] = [{name: item[name] for name in names if name in item} for item in response['Items']]
+        return response
+
+    def query(self, KeyConditionExpression, IndexName=None, Limit=None, ExclusiveStartKey=None, **params):
+        self.reads.append(('query', IndexName))
+        items = [item for item in self.items.values() if condition_matches(KeyConditionExpression, item)]
+        return self._page(items, Limit, ExclusiveStartKey)
+
+    def _page(self, items, limit, start_key):
+        items = sorted(items, key=lambda item: str(item[self.key_name]))
+        start = 0
+        if start_key:
+            start = next((i for i, item in enumerate(items) if str(item[self.key_name]) > str(start_key[self.key_name])), len(items))
+        size = limit or self.page_size
+        page = items[start:start + size]
+        response = {'Items': copy.deepcopy(page), 'Count': len(page)}
+        if start + size < len(items):
+            response['LastEvaluatedKey'] = {self.key_name: page[-1][self.key_name]}
+        return response
+
+
+class InMemoryResource:
+    """boto3 DynamoDB ServiceResource stand-in holding InMemoryTables"""
+    def __init__(self):
+        self.tables = {}
+
+    def add_table(self, name: str, key_name: str, items=()) -> InMemoryTable:
+        table = self.tables[name] = InMemoryTable(self, name, key_name)
+        for item in items:
+            table.put_item(Item=item)
+        return table
+
+    def Table(self, name: str) -> InMemoryTable:
+        return self.tables[name]
+
+    def batch_write_item(self, RequestItems):
+        for name, requests in RequestItems.items():
+            table = self.tables[name]
+            assert len(requests) <= 25, "BatchWriteItem takes at most 25 requests"
+            table.batch_writes.append(len(requests))
+            for request in requests:
+                if 'PutRequest' in request:
+                    table.put_item(Item=request['PutRequest']['Item'])
+                else:
+                    table.delete_item(Key=request['DeleteRequest']['Key'])
+        return {'UnprocessedItems': {}}
+
+    def batch_get_item(self, RequestItems):
+        responses = {}
+        for name, request in RequestItems.items():
+            table = self.tables[name]
+            table.reads.append(('batch_get_item', None))
+            responses[name] = [
+                copy.deepcopy(table.items[key[table.key_name]])
+                for key in request['Keys'] if key[table.key_name] in table.items
+            ]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+
+def _seller(seller_id, city, state, rating, tons, stock, price, delivery, product_ids, lat, lon):
+    return {
+        'SellerId': seller_id,
+        'Name': f"Farm {seller_id.replace('SELL', '')}",
+        'Phone': '+2348000000000',
+        'City': city,
+        'State': state,
+        'Latitude': Decimal(lat),
+        'Longitude': Decimal(lon),
+        'Rating': Decimal(rating),
+        'QuantityTonsAvailable': Decimal(tons),
+        'PhotoURL': f"https://s3.amazonaws.com/bucket/photo_{seller_id}.jpg",
+        'StockScore': Decimal(stock),
+        'PriceScore': Decimal(price),
+        'DeliveryScore': Decimal(delivery),
+        'ProductIds': product_ids,
+    }
+
+
+def _product(product_id, species, breed, min_price, max_price, seller_ids):
+    return {
+        'ProductId': product_id,
+        'LivestockType': f"{species} {breed}",
+        'Species': species,
+        'Breed': breed,
+        'BasePrice': Decimal((min_price + max_price) // 2),
+        'MinPrice': Decimal(min_price),
+        'MaxPrice': Decimal(max_price),
+        'SellerIds': seller_ids,
+    }
+
+
+def catalog_items():
+    """A small catalog shaped like the loaders' items: (products, sellers)"""
+    products = [
+        _product('SKU0001', 'Cattle', 'Sokoto Gudali', 350000, 420000, ['SELL1001', 'SELL1002']),
+        _product('SKU0002', 'Fish', 'Catfish', 2500, 3000, ['SELL1003']),
+        _product('SKU0003', 'Goat', 'Sokoto Red', 45000, 60000, ['SELL1002', 'SELL1004']),
+        _product('SKU0004', 'Poultry', 'Broiler', 4000, 5500, ['SELL1001', 'SELL1004']),
+        _product('SKU0005', 'Sheep', 'Yankasa', 80000, 95000, ['SELL1003']),
+    ]
+    sellers = [
+        _seller('SELL1001', 'Kaduna', 'Kaduna', '4.5', '12', '80', '70', '60', ['SKU0001', 'SKU0004'], '10.5105', '7.4165'),
+        _seller('SELL1002', 'Zaria', 'Kaduna', '3.9', '4', '55.5', '42.1', '90', ['SKU0001', 'SKU0003'], '11.0855', '7.7199'),
+        _seller('SELL1003', 'Lagos', 'Lagos', '4.9', '4', '42.1', '11.6', '16.7', ['SKU0002', 'SKU0005'], '6.5244', '3.3792'),
+        _seller('SELL1004', 'Abuja', 'FCT', '4.1', '9', '65', '88', '35', ['SKU0003', 'SKU0004'], '9.0765', '7.3986'),
+    ]
+    return products, sellers
+
+
+@pytest.fixture
+def dynamodb():
+    """An InMemoryResource holding the catalog_items() products and sellers tables"""
+    products, sellers = catalog_items()
+    resource = InMemoryResource()
+    resource.add_table(PRODUCTS_TABLE_NAME, 'ProductId', products)
+    resource.add_table(SELLERS_TABLE_NAME, 'SellerId', sellers)
+    return resource
+
+
+@pytest.fixture
+def service_app(dynamodb, monkeypatch, tmp_path):
+    """
+    The matching service app module reading the in-memory tables, with a
+    fresh snapshot and empty response caches. Snapshots are built from the
+    tables; no catalog artifact is booted.
+    """
+    import app
+
+    service = app.matching_service
+    monkeypatch.setattr(service, '_dynamodb', dynamodb)
+    monkeypatch.setattr(service, '_products_table', dynamodb.Table(PRODUCTS_TABLE_NAME))
+    monkeypatch.setattr(service, '_sellers_table', dynamodb.Table(SELLERS_TABLE_NAME))
+    monkeypatch.setattr(service, '_catalog', None)
+    monkeypatch.setattr(service, '_catalog_load_failed_at', None)
+    monkeypatch.setitem(service.config, 'catalog_artifact_path', str(tmp_path / 'missing.snapshot'))
+    monkeypatch.setitem(service.config, 'catalog_snapshot_enabled', True)
+    monkeypatch.setitem(service.config, 'scan_segments', 1)
+    monkeypatch.setattr(app, 'CURSOR_SIGNING_KEY', b'test-cursor-key')
+    app.search_response_cache.invalidate()
+    yield app
+    app.search_response_cache.invalidate()
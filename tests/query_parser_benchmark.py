@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Query parser benchmark for the matching service
+Runs every query of the 503-query suite through the single-pass
+extract_simple_parameters and the regex reference implementation, fails on
+any difference in the extracted parameters, and reports per-query parse time
+for both. Runs offline; no AWS calls are made.
+
+Usage: python tests/query_parser_benchmark.py [repeats]
+"""
+
+import os
+import sys
+import timeit
+from typing import Callable, List
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'ai-matching-service'))
+sys.path.insert(0, TESTS_DIR)
+
+import app
+from ultimate_503_test_suite import ULTIMATE_TEST_CASES
+
+def time_parser(parser: Callable, queries: List[str], repeats: int) -> float:
+    """Best-of-repeats parse time in microseconds per query"""
+    def parse_all():
+        for query in queries:
+            parser(query)
+    best = min(timeit.repeat(parse_all, number=1, repeat=repeats))
+    return best / len(queries) * 1_000_000
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    queries = [case['query'] for case in ULTIMATE_TEST_CASES]
+
+    print("🔎 QUERY PARSER BENCHMARK")
+    print("=" * 60)
+    print(f"Queries: {len(queries)}, repeats: {repeats}\n")
+
+    mismatches = 0
+    for query in queries:
+        expected = app._extract_simple_parameters_regex(query)
+        actual = app.extract_simple_parameters(query)
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ {query!r}\n   regex:       {expected}\n   single-pass: {actual}")
+    if mismatches:
+        print(f"\n❌ {mismatches} of {len(queries)} queries parsed differently")
+        sys.exit(1)
+    print(f"✅ Identical parameters for all {len(queries)} queries\n")
+
+    regex_us = time_parser(app._extract_simple_parameters_regex, queries, repeats)
+    single_pass_us = time_parser(app.extract_simple_parameters, queries, repeats)
+    print(f"{'Parser':<28}{'µs/query':>12}")
+    print("-" * 40)
+    print(f"{'regex reference':<28}{regex_us:>12.1f}")
+    print(f"{'single-pass':<28}{single_pass_us:>12.1f}")
+    print(f"\n⚡ Speedup: {regex_us / single_pass_us:.2f}x")
+
+if __name__ == "__main__":
+    main()
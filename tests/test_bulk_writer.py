@@ -0,0 +1,159 @@
+"""
+Unit tests for the loaders' BulkWriter against the in-memory tables from
+conftest.py, with a client that leaves part of each batch unprocessed.
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+import bulk_writer
+from bulk_writer import BATCH_WRITE_MAX_ITEMS, BATCH_WRITE_MAX_RETRIES, BulkWriteError, BulkWriter
+from conftest import InMemoryResource
+
+
+class PartialWriteResource(InMemoryResource):
+    """
+    InMemoryResource whose BatchWriteItem applies only the first `processed`
+    requests of a batch and returns the rest as UnprocessedItems, for the
+    first `partial_calls` calls with more requests than that; later calls
+    behave normally. error_code makes every call raise that ClientError instead.
+    """
+    def __init__(self, processed: int = 20, partial_calls: int = 2, error_code=None):
+        super().__init__()
+        self.processed = processed
+        self.partial_calls = partial_calls
+        self.error_code = error_code
+        self.calls = []
+        self.partial = 0
+
+    def batch_write_item(self, RequestItems):
+        (name, requests), = RequestItems.items()
+        self.calls.append(len(requests))
+        if self.error_code is not None:
+            raise ClientError({'Error': {'Code': self.error_code, 'Message': 'stub'}}, 'BatchWriteItem')
+        if self.partial >= self.partial_calls or len(requests) <= self.processed:
+            return super().batch_write_item(RequestItems)
+        self.partial += 1
+        super().batch_write_item({name: requests[:self.processed]})
+        unprocessed = requests[self.processed:]
+        return {'UnprocessedItems': {name: unprocessed} if unprocessed else {}}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(bulk_writer, 'BATCH_WRITE_BASE_DELAY_SECONDS', 0.0)
+
+
+def _items(count: int, start: int = 0):
+    return [{'ProductId': f"SKU{i:04d}", 'Breed': f"Breed {i}"} for i in range(start, start + count)]
+
+
+def test_unprocessed_items_are_retried_until_written():
+    resource = PartialWriteResource(processed=20, partial_calls=2)
+    table = resource.add_table('products', 'ProductId')
+
+    with BulkWriter(table, workers=1) as writer:
+        for item in _items(60):
+            writer.put(item)
+
+    assert sorted(table.items) == [item['ProductId'] for item in _items(60)]
+    # Two batches came back with 5 requests unprocessed and were resent once each
+    assert resource.calls == [25, 5, 25, 5, 10]
+    assert (writer.items_written, writer.batches, writer.retries) == (60, 3, 2)
+
+
+def test_batches_hold_at_most_25_requests_and_the_last_request_wins():
+    resource = InMemoryResource()
+    table = resource.add_table('products', 'ProductId', _items(10, start=200))
+
+    with BulkWriter(table, workers=4) as writer:
+        for item in _items(101):
+            writer.put(item)
+        writer.put({'ProductId': 'SKU0100', 'Breed': 'Replaced'})
+        writer.delete({'ProductId': 'SKU0099', 'Breed': 'ignored'})
+        for item in _items(10, start=200):
+            writer.delete(item)
+
+    assert max(table.batch_writes) == BATCH_WRITE_MAX_ITEMS
+    assert sum(table.batch_writes) == writer.items_written == 112
+    assert len(table.items) == 100
+    assert 'SKU0099' not in table.items
+    assert table.items['SKU0100']['Breed'] == 'Replaced'
+
+
+def test_only_keys_of_batches_in_flight_are_tracked():
+    resource = InMemoryResource()
+    table = resource.add_table('products', 'ProductId')
+
+    with BulkWriter(table, workers=2) as writer:
+        for item in _items(1000):
+            writer.put(item)
+            assert sum(len(keys) for keys in writer._in_flight.values()) <= 2 * writer.workers * BATCH_WRITE_MAX_ITEMS
+        writer.put({'ProductId': 'SKU0999', 'Breed': 'Replaced'})
+
+    assert writer._in_flight == {}
+    assert len(table.items) == 1000
+    assert table.items['SKU0999']['Breed'] == 'Replaced'
+
+
+def test_leaving_the_block_flushes_the_partial_batch():
+    resource = InMemoryResource()
+    table = resource.add_table('products', 'ProductId')
+
+    with BulkWriter(table) as writer:
+        for item in _items(BATCH_WRITE_MAX_ITEMS + 3):
+            writer.put(item)
+        assert len(table.items) < BATCH_WRITE_MAX_ITEMS + 3
+
+    assert len(table.items) == BATCH_WRITE_MAX_ITEMS + 3
+    assert table.batch_writes == [BATCH_WRITE_MAX_ITEMS, 3]
+
+
+def test_an_exception_in_the_block_skips_the_final_flush():
+    resource = InMemoryResource()
+    table = resource.add_table('products', 'ProductId')
+
+    with pytest.raises(KeyError):
+        with BulkWriter(table) as writer:
+            for item in _items(BATCH_WRITE_MAX_ITEMS + 3):
+                writer.put(item)
+            raise KeyError('Breed')
+
+    assert len(table.items) == BATCH_WRITE_MAX_ITEMS
+
+
+def test_non_retryable_errors_from_workers_propagate():
+    resource = PartialWriteResource(error_code='ValidationException')
+    table = resource.add_table('products', 'ProductId')
+
+    with pytest.raises(ClientError) as raised:
+        with BulkWriter(table, workers=2) as writer:
+            for item in _items(30):
+                writer.put(item)
+
+    assert raised.value.response['Error']['Code'] == 'ValidationException'
+    assert sorted(resource.calls) == [5, 25]
+
+
+def test_throttled_batches_are_retried():
+    resource = PartialWriteResource(error_code='ProvisionedThroughputExceededException')
+    table = resource.add_table('products', 'ProductId')
+
+    with pytest.raises(BulkWriteError):
+        with BulkWriter(table, workers=1) as writer:
+            writer.put(_items(1)[0])
+
+    assert resource.calls == [1] * (BATCH_WRITE_MAX_RETRIES + 1)
+    assert writer.retries == BATCH_WRITE_MAX_RETRIES
+
+
+def test_batches_left_unprocessed_raise_bulk_write_error():
+    resource = PartialWriteResource(processed=0, partial_calls=BATCH_WRITE_MAX_RETRIES + 1)
+    table = resource.add_table('products', 'ProductId')
+
+    with pytest.raises(BulkWriteError, match='left 3 requests unprocessed on products'):
+        with BulkWriter(table, workers=1) as writer:
+            for item in _items(3):
+                writer.put(item)
+
+    assert table.items == {}
+    assert writer.items_written == 0
@@ -0,0 +1,51 @@
+"""
+Round-trip tests for the catalog snapshot artifact written by the loaders
+and booted by the matching service.
+"""
+import pytest
+
+from chalicelib.catalog_artifact import (
+    ArtifactError, catalog_fingerprint, read_catalog_artifact, write_catalog_artifact
+)
+from conftest import catalog_items
+
+
+def as_floats(item):
+    return {name: float(value) if not isinstance(value, (str, list)) else value for name, value in item.items()}
+
+
+def test_written_catalog_reads_back_unchanged(tmp_path):
+    products, sellers = catalog_items()
+    del sellers[0]['PhotoURL']
+    sellers[1]['ProductIds'] = []
+    path = str(tmp_path / 'catalog.snapshot')
+
+    version = write_catalog_artifact(path, products, sellers)
+    catalog = read_catalog_artifact(path)
+
+    assert catalog['version'] == version == catalog_fingerprint(products, sellers)
+    assert catalog['products'] == sorted((as_floats(p) for p in products), key=lambda p: p['ProductId'])
+    assert catalog['sellers'] == sorted((as_floats(s) for s in sellers), key=lambda s: s['SellerId'])
+    assert 'PhotoURL' not in catalog['sellers'][0]
+    # The decoded items fingerprint like the items they were written from
+    assert catalog_fingerprint(catalog['products'], catalog['sellers']) == version
+
+
+def test_service_boots_the_snapshot_version_from_the_artifact(service_app, tmp_path, monkeypatch):
+    products, sellers = catalog_items()
+    path = str(tmp_path / 'catalog.snapshot')
+    version = write_catalog_artifact(path, products, sellers)
+    service = service_app.matching_service
+    monkeypatch.setitem(service.config, 'catalog_artifact_path', path)
+
+    artifact_catalog = service._load_catalog_artifact()
+
+    assert artifact_catalog.version == version == service._load_catalog().version
+    assert [s['SellerId'] for s in artifact_catalog.sellers] == sorted(s['SellerId'] for s in sellers)
+
+
+def test_non_artifact_files_are_rejected(tmp_path):
+    path = tmp_path / 'catalog.snapshot'
+    path.write_bytes(b'not a snapshot artifact')
+    with pytest.raises(ArtifactError):
+        read_catalog_artifact(str(path))
@@ -0,0 +1,154 @@
+"""
+Unit tests for the loaders' DeltaLoad against the in-memory tables from
+conftest.py: which items a reload writes, deletes and leaves alone.
+"""
+from decimal import Decimal
+
+import pytest
+
+from conftest import InMemoryResource
+from delta_load import (
+    CREATE, DELETE, ITEM_HASH_ATTRIBUTE, UNCHANGED, UPDATE, VERSION_ATTRIBUTE, VERSION_ITEM_KEY,
+    DeltaLoad, item_hash,
+)
+
+
+class RecordingResource(InMemoryResource):
+    """InMemoryResource that records the request kinds of every BatchWriteItem call"""
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def batch_write_item(self, RequestItems):
+        for requests in RequestItems.values():
+            self.batches.append({'put' if 'PutRequest' in request else 'delete' for request in requests})
+        return super().batch_write_item(RequestItems)
+
+
+def _product(i: int, price: int = 1000):
+    return {'ProductId': f"SKU{i:04d}", 'Species': 'Goat', 'BasePrice': Decimal(price), 'SellerIds': ['SELL1001']}
+
+
+def load(table, items, **options):
+    with DeltaLoad(table, workers=2, description='products', **options) as delta:
+        for item in items:
+            delta.put(dict(item))
+    return delta
+
+
+@pytest.fixture
+def resource():
+    return RecordingResource()
+
+
+@pytest.fixture
+def table(resource):
+    return resource.add_table('products', 'ProductId')
+
+
+def test_first_load_creates_every_item_with_its_hash(table):
+    delta = load(table, [_product(i) for i in range(30)])
+
+    assert {action for action in delta.actions.values()} == {CREATE}
+    assert delta.items_written == 30
+    assert all(item[ITEM_HASH_ATTRIBUTE] == item_hash(item) for item in table.items.values())
+
+
+def test_reloading_unchanged_items_writes_nothing(resource, table):
+    products = [_product(i) for i in range(30)]
+    load(table, products)
+    resource.batches.clear()
+
+    delta = load(table, products)
+
+    assert delta.plan()[UNCHANGED] == [(product['ProductId'],) for product in products]
+    assert delta.items_written == 0
+    assert resource.batches == []
+
+
+def test_changed_items_are_rewritten_and_removed_items_deleted(resource, table):
+    load(table, [_product(i) for i in range(30)])
+    resource.batches.clear()
+
+    products = [_product(i, price=2000 if i in (3, 17) else 1000) for i in range(30) if i not in (5, 6)]
+    products.append(_product(30))
+    delta = load(table, products)
+
+    plan = delta.plan()
+    assert plan[UPDATE] == [('SKU0003',), ('SKU0017',)]
+    assert plan[CREATE] == [('SKU0030',)]
+    assert plan[DELETE] == [('SKU0005',), ('SKU0006',)]
+    assert len(plan[UNCHANGED]) == 26
+    assert delta.items_written == 5
+    assert sorted(table.items) == sorted(product['ProductId'] for product in products)
+    assert table.items['SKU0017']['BasePrice'] == Decimal(2000)
+    # Stale items are deleted only after every changed item has been written
+    assert resource.batches == [{'put'}, {'delete'}]
+
+
+def test_an_interrupted_load_deletes_nothing_and_a_rerun_converges(resource, table):
+    load(table, [_product(i) for i in range(60)], version_item=True)
+    version = table.items[VERSION_ITEM_KEY][VERSION_ATTRIBUTE]
+    resource.batches.clear()
+
+    # Every price changes and SKU0059 is dropped, but the load fails part-way
+    products = [_product(i, price=2000) for i in range(59)]
+    with pytest.raises(RuntimeError):
+        with DeltaLoad(table, workers=2, description='products', version_item=True) as delta:
+            for i, item in enumerate(products):
+                if i == 40:
+                    raise RuntimeError('sheet read failed')
+                delta.put(dict(item))
+
+    # The one full batch already sent has landed; nothing was deleted and the version is unchanged
+    assert resource.batches == [{'put'}]
+    assert table.batch_writes[-1] == 25
+    assert 'SKU0059' in table.items
+    assert table.items[VERSION_ITEM_KEY][VERSION_ATTRIBUTE] == version
+
+    rerun = load(table, products, version_item=True)
+
+    plan = rerun.plan()
+    assert len(plan[UNCHANGED]) == 25
+    assert len(plan[UPDATE]) == 34
+    assert plan[DELETE] == [('SKU0059',)]
+    assert {key: item['BasePrice'] for key, item in table.items.items() if key != VERSION_ITEM_KEY} == {
+        product['ProductId']: Decimal(2000) for product in products
+    }
+    assert table.items[VERSION_ITEM_KEY][VERSION_ATTRIBUTE] == rerun.version != version
+
+
+def test_the_version_item_is_written_only_when_the_content_changes(resource, table):
+    products = [_product(i) for i in range(5)]
+    first = load(table, products, version_item=True)
+    resource.batches.clear()
+
+    again = load(table, products, version_item=True)
+
+    assert again.version == first.version == table.items[VERSION_ITEM_KEY][VERSION_ATTRIBUTE]
+    assert resource.batches == []
+    assert (VERSION_ITEM_KEY,) not in again.actions
+
+
+def test_dry_runs_plan_without_writing(resource, table, capsys):
+    load(table, [_product(i) for i in range(3)])
+    resource.batches.clear()
+    before = {key: dict(item) for key, item in table.items.items()}
+
+    delta = load(table, [_product(0, price=5), _product(1), _product(3)], dry_run=True)
+
+    assert delta.plan() == {CREATE: [('SKU0003',)], UPDATE: [('SKU0000',)], UNCHANGED: [('SKU0001',)], DELETE: [('SKU0002',)]}
+    assert delta.items_written == 0
+    assert resource.batches == []
+    assert table.items == before
+    assert 'Dry run of products in products: 1 to create, 1 to update, 1 to delete, 1 unchanged' in capsys.readouterr().out
+
+
+def test_rewrite_writes_unchanged_items_too(table):
+    products = [_product(i) for i in range(5)]
+    load(table, products)
+
+    delta = load(table, products, rewrite=True)
+
+    assert {action for action in delta.actions.values()} == {UNCHANGED}
+    assert delta.items_written == 5
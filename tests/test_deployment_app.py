@@ -0,0 +1,163 @@
+"""
+Unit tests for the single-table deployment app's GET /products, run against
+a table loaded through the loaders' DeltaLoad.
+"""
+import importlib.util
+import os
+from decimal import Decimal
+
+import pytest
+from chalice.test import Client
+
+from conftest import REPO_ROOT, InMemoryResource
+from delta_load import VERSION_ATTRIBUTE, VERSION_ITEM_KEY, DeltaLoad
+
+TABLE_NAME = 'livestock-matching-table'
+
+
+def product_item(name, species, min_price, max_price):
+    return {
+        'ProductName': name,
+        'Species': species,
+        'BasePrice': Decimal((min_price + max_price) // 2),
+        'MinPrice': Decimal(min_price),
+        'MaxPrice': Decimal(max_price),
+        'SellerIds': [{'SellerId': 'SELL1001', 'City': 'Kaduna'}],
+    }
+
+
+PRODUCTS = [
+    product_item('Sokoto Gudali', 'Cattle', 350000, 420000),
+    product_item('Catfish', 'Fish', 2500, 3000),
+    product_item('Sokoto Red', 'Goat', 45000, 60000),
+    product_item('Broiler', 'Poultry', 4000, 5500),
+]
+
+
+def load(table, items):
+    with DeltaLoad(table, workers=2, description='products', key_names=['ProductName'], version_item=True) as delta:
+        for item in items:
+            delta.put(dict(item))
+    return delta
+
+
+@pytest.fixture
+def deployment_app(monkeypatch):
+    spec = importlib.util.spec_from_file_location('deployment_app', os.path.join(REPO_ROOT, 'deployment-package', 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    table = InMemoryResource().add_table(TABLE_NAME, 'ProductName')
+    monkeypatch.setattr(module.matching_service, 'table', table)
+    monkeypatch.setattr(module, 'CURSOR_SIGNING_KEY', b'test-cursor-key')
+    return module
+
+
+def get_products(client, etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    return client.http.get('/products?limit=10', headers=headers)
+
+
+def test_products_etag_revalidates_with_one_get_item(deployment_app):
+    table = deployment_app.matching_service.table
+    load(table, PRODUCTS)
+    assert table.items[VERSION_ITEM_KEY][VERSION_ATTRIBUTE]
+
+    with Client(deployment_app.app) as client:
+        first = get_products(client)
+        etag = first.headers['ETag']
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'public, max-age=60'
+        assert sorted(p['product_name'] for p in first.json_body['products']) == sorted(p['ProductName'] for p in PRODUCTS)
+
+        table.reads.clear()
+        revalidated = get_products(client, etag)
+        assert revalidated.status_code == 304
+        assert revalidated.headers['Cache-Control'] == 'public, max-age=60'
+        assert table.reads == [('get_item', None)]
+
+
+def test_products_etag_follows_the_loaded_catalog(deployment_app):
+    table = deployment_app.matching_service.table
+    load(table, PRODUCTS)
+
+    with Client(deployment_app.app) as client:
+        etag = get_products(client).headers['ETag']
+
+        # An unchanged reload writes nothing, not even the version item
+        table.batch_writes.clear()
+        assert load(table, PRODUCTS).items_written == 0
+        assert table.batch_writes == []
+        assert get_products(client, etag).status_code == 304
+
+        changed = [dict(PRODUCTS[0], MinPrice=Decimal(340000))] + PRODUCTS[1:]
+        load(table, changed)
+        refreshed = get_products(client, etag)
+        assert refreshed.status_code == 200
+        assert refreshed.headers['ETag'] != etag
+
+
+def test_products_without_a_version_item_fall_back_to_a_page_fingerprint(deployment_app):
+    table = deployment_app.matching_service.table
+    for item in PRODUCTS:
+        table.put_item(Item=item)
+
+    with Client(deployment_app.app) as client:
+        first = get_products(client)
+        assert first.status_code == 200
+        assert len(first.json_body['products']) == len(PRODUCTS)
+        assert get_products(client, first.headers['ETag']).status_code == 304
+
+
+def test_products_cursors_page_through_the_table_with_exclusive_start_keys(deployment_app, monkeypatch):
+    table = deployment_app.matching_service.table
+    load(table, PRODUCTS)
+    scans = []
+    scan = table.scan
+    monkeypatch.setattr(table, 'scan', lambda **params: scans.append(params) or scan(**params))
+
+    names, cursor = [], None
+    with Client(deployment_app.app) as client:
+        while True:
+            response = client.http.get('/products?limit=2' + (f"&cursor={cursor}" if cursor else ''))
+            assert response.status_code == 200
+            names.extend(product['product_name'] for product in response.json_body['products'])
+            cursor = response.json_body.get('next_cursor')
+            if cursor is None:
+                break
+
+    assert names == sorted(p['ProductName'] for p in PRODUCTS)
+    # Each cursor carries the previous page's LastEvaluatedKey back to the scan
+    assert [params.get('ExclusiveStartKey') for params in scans] == [
+        None, {'ProductName': 'Broiler'}, {'ProductName': 'Sokoto Gudali'}
+    ]
+    assert all(params['Limit'] == 2 for params in scans)
+
+
+def test_products_reject_tampered_and_foreign_cursors(deployment_app, monkeypatch):
+    load(deployment_app.matching_service.table, PRODUCTS)
+    with Client(deployment_app.app) as client:
+        cursor = client.http.get('/products?limit=2').json_body['next_cursor']
+        payload, signature = cursor.split('.')
+        forged_payload = deployment_app.encode_cursor({'start_key': {'ProductName': 'Catfish'}}).split('.')[0]
+        tampered = client.http.get(f"/products?limit=2&cursor={forged_payload}.{signature}")
+
+        monkeypatch.setattr(deployment_app, 'CURSOR_SIGNING_KEY', b'another-deployment')
+        foreign = client.http.get(f"/products?limit=2&cursor={cursor}")
+
+    for response in (tampered, foreign):
+        assert response.status_code == 400
+        assert response.json_body == {'error': 'Invalid cursor'}
+        assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_products_without_a_signing_key_issue_no_cursors(deployment_app, monkeypatch):
+    load(deployment_app.matching_service.table, PRODUCTS)
+    with Client(deployment_app.app) as client:
+        cursor = client.http.get('/products?limit=2').json_body['next_cursor']
+        monkeypatch.setattr(deployment_app, 'CURSOR_SIGNING_KEY', None)
+        first_page = client.http.get('/products?limit=3')
+        with_cursor = client.http.get(f"/products?limit=2&cursor={cursor}")
+
+    assert first_page.status_code == 200
+    assert 'next_cursor' not in first_page.json_body
+    assert with_cursor.status_code == 400
@@ -0,0 +1,140 @@
+"""
+Unit tests for the loaders' streaming sheet ingest: the running per-product
+aggregates must equal the list-based grouping the loaders used before.
+"""
+import os
+from collections import defaultdict
+
+import openpyxl
+import pytest
+
+from conftest import REPO_ROOT
+from excel_stream import PriceStats, aggregate_by_key, iter_sheet_rows
+
+DATASET_PATH = os.path.join(REPO_ROOT, 'deployment-package', 'data', 'datasets', 'sellers_dataset.xlsx')
+HEADERS = ['Unnamed: 0', 'SellerID', 'ProductID', 'Species', 'Breed', 'UnitPrice', None]
+
+# (SellerID, ProductID, Species, Breed, UnitPrice), sorted by ProductID
+SAMPLE_ROWS = [
+    ('SELL1001', 'SKU0001', 'Cattle', 'Sokoto Gudali', 350000),
+    ('SELL1002', 'SKU0001', 'Cattle', 'Sokoto Gudali', 420000),
+    ('SELL1001', 'SKU0001', 'Cattle', 'Sokoto Gudali', 380500),
+    ('SELL1003', 'SKU0002', 'Fish', 'Catfish', 2500),
+    ('SELL1002', 'SKU0003', 'Goat', 'Sokoto Red', 60000),
+    ('SELL1004', 'SKU0003', 'Goat', 'Sokoto Red', 45000),
+    ('SELL1001', 'SKU0004', 'Poultry', 'Broiler', 5500),
+    ('SELL1004', 'SKU0004', 'Poultry', 'Broiler', 4000),
+    ('SELL1003', 'SKU0005', 'Sheep', 'Yankasa', 87000),
+]
+# The same rows, ascending until SKU0001 comes back after SKU0003
+UNSORTED_ROWS = [SAMPLE_ROWS[i] for i in (0, 3, 4, 1, 6, 5, 8, 2, 7)]
+
+
+def write_workbook(path, rows):
+    """A Sheet1 workbook shaped like the seller dataset, with blank and seller-less rows mixed in"""
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = 'Sheet1'
+    sheet.append(HEADERS)
+    for i, (seller_id, product_id, species, breed, price) in enumerate(rows):
+        sheet.append([i, seller_id, product_id, species, breed, price, None])
+        if i == 2:
+            sheet.append([])
+            sheet.append([i, None, 'SKU9999', 'Fish', 'Tilapia', 1])
+    wb.save(path)
+    return str(path)
+
+
+def list_based_aggregates(path):
+    """Per-product aggregates computed as the loaders did before streaming: every row in a list first"""
+    wb = openpyxl.load_workbook(path)
+    sheet = wb['Sheet1']
+    data = []
+    headers = [cell.value for cell in sheet[1] if cell.value]
+    for row in sheet.iter_rows(min_row=2, values_only=True):
+        row_dict = {headers[i]: value for i, value in enumerate(row) if i < len(headers)}
+        if row_dict.get('SellerID'):
+            data.append(row_dict)
+
+    products = defaultdict(lambda: {'SellerIds': [], 'UnitPrices': []})
+    for entry in data:
+        info = products[entry['ProductID']]
+        info['SellerIds'].append(entry['SellerID'])
+        info['LivestockType'] = f"{entry['Species']} {entry['Breed']}"
+        info['UnitPrices'].append(entry['UnitPrice'])
+    return {
+        product_id: {
+            'LivestockType': info['LivestockType'],
+            'SellerIds': sorted(set(info['SellerIds'])),
+            'MinPrice': min(info['UnitPrices']),
+            'MaxPrice': max(info['UnitPrices']),
+            'BasePrice': sum(info['UnitPrices']) / len(info['UnitPrices']),
+        }
+        for product_id, info in products.items()
+    }
+
+
+def streamed_aggregates(path):
+    """Per-product aggregates from the streaming ingest, and the products in on_final order"""
+    def new_product(entry):
+        return {'SellerIds': set(), 'UnitPrices': PriceStats()}
+
+    def add_row(info, entry):
+        info['SellerIds'].add(entry['SellerID'])
+        info['LivestockType'] = f"{entry['Species']} {entry['Breed']}"
+        info['UnitPrices'].add(entry['UnitPrice'])
+
+    finalized = []
+    def on_final(product_id, info):
+        prices = info['UnitPrices']
+        finalized.append((product_id, {
+            'LivestockType': info['LivestockType'],
+            'SellerIds': sorted(info['SellerIds']),
+            'MinPrice': prices.minimum,
+            'MaxPrice': prices.maximum,
+            'BasePrice': prices.average,
+        }))
+
+    states = aggregate_by_key(iter_sheet_rows(path), 'ProductID', new_product, add_row, on_final)
+    return states, finalized
+
+
+@pytest.mark.parametrize('rows', [SAMPLE_ROWS, UNSORTED_ROWS], ids=['sorted', 'unsorted'])
+def test_streamed_aggregates_match_the_list_based_grouping(tmp_path, rows):
+    path = write_workbook(tmp_path / 'sellers.xlsx', rows)
+
+    expected = list_based_aggregates(path)
+    states, finalized = streamed_aggregates(path)
+
+    assert list(states) == list(expected)
+    # The last on_final call for each product carries its complete aggregates
+    assert dict(finalized) == expected
+    assert 'SKU9999' not in states
+
+
+def test_sorted_sheets_finalize_each_product_once_in_order(tmp_path):
+    path = write_workbook(tmp_path / 'sellers.xlsx', SAMPLE_ROWS)
+
+    _, finalized = streamed_aggregates(path)
+
+    assert [product_id for product_id, _ in finalized] == ['SKU0001', 'SKU0002', 'SKU0003', 'SKU0004', 'SKU0005']
+
+
+def test_products_finalized_early_are_finalized_again_when_they_reappear(tmp_path):
+    path = write_workbook(tmp_path / 'sellers.xlsx', UNSORTED_ROWS)
+
+    _, finalized = streamed_aggregates(path)
+
+    # SKU0001 and SKU0002 end while the sheet is still ascending; SKU0001 then
+    # reappears, so it and the rest are finalized after the last row
+    assert [product_id for product_id, _ in finalized] == ['SKU0001', 'SKU0002', 'SKU0001', 'SKU0003', 'SKU0004', 'SKU0005']
+    assert (finalized[0][1]['SellerIds'], finalized[0][1]['MaxPrice']) == (['SELL1001'], 350000)
+    assert (finalized[2][1]['SellerIds'], finalized[2][1]['MaxPrice']) == (['SELL1001', 'SELL1002'], 420000)
+
+
+def test_the_shipped_dataset_streams_to_the_list_based_aggregates():
+    expected = list_based_aggregates(DATASET_PATH)
+    states, finalized = streamed_aggregates(DATASET_PATH)
+
+    assert list(states) == list(expected)
+    assert dict(finalized) == expected
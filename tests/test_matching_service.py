@@ -0,0 +1,425 @@
+"""
+Unit tests for the matching service's search, scoring and catalog endpoints,
+run against the in-memory tables from conftest.py.
+"""
+import json
+import random
+from decimal import Decimal
+
+import pytest
+from chalice.test import Client
+
+from conftest import PRODUCTS_TABLE_NAME, SELLERS_TABLE_NAME
+
+
+def post_json(client, path, body):
+    return client.http.post(path, headers={'Content-Type': 'application/json'}, body=json.dumps(body))
+
+
+def test_location_search_reads_only_local_sellers_without_snapshot(service_app, dynamodb, monkeypatch):
+    monkeypatch.setitem(service_app.matching_service.config, 'catalog_snapshot_enabled', False)
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search', {'query': 'Cattle Sokoto Gudali in Kaduna'})
+
+    assert response.status_code == 200
+    assert [seller['location'] for seller in response.json_body['sellers']] == ['Kaduna']
+    assert sellers_table.reads == [('query', 'CityIndex')]
+
+
+def test_location_fallback_scans_sellers_only_when_no_local_seller_matches(service_app, dynamodb, monkeypatch):
+    monkeypatch.setitem(service_app.matching_service.config, 'catalog_snapshot_enabled', False)
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search', {'query': 'Cattle Sokoto Gudali in Lagos'})
+
+    assert response.status_code == 200
+    assert {seller['location'] for seller in response.json_body['sellers']} == {'Kaduna', 'Zaria'}
+    # The CityIndex query, then one paginated scan of every seller for the fallback
+    pages = len(sellers_table.items) // sellers_table.page_size + 1
+    assert sellers_table.reads == [('query', 'CityIndex')] + [('scan', None)] * pages
+
+
+def test_quantities_do_not_filter_search_results(service_app):
+    # Suite case "Find 7 tons Fish Catfish capacity": the Catfish seller holds 4 tons,
+    # and the catalog records no per-product capacity to compare a quantity with
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search', {'query': 'Find 7 tons Fish Catfish capacity'})
+
+    assert response.status_code == 200
+    assert [seller['farm_name'] for seller in json.loads(response.body)['sellers']] == ['Farm 1003']
+
+
+def _scored_seller(seller_id, rating, stock, price, delivery):
+    return {
+        'SellerId': seller_id,
+        'Rating': Decimal(rating),
+        'StockScore': Decimal(stock),
+        'PriceScore': Decimal(price),
+        'DeliveryScore': Decimal(delivery),
+    }
+
+
+def test_vectorized_scores_match_the_scalar_reference(service_app, monkeypatch):
+    rng = random.Random(20240610)
+    sellers = [_scored_seller('SELL0000', '4.9', '42.1', '11.6', '16.7')]
+    while len(sellers) < 5000:
+        seller = _scored_seller(
+            f"SELL{len(sellers):04d}",
+            f"{rng.randint(0, 50) / 10:.1f}",
+            *(f"{rng.randint(0, 1000) / 10:.1f}" for _ in range(3))
+        )
+        # Keep every row near a rounding boundary, plus a random sample of the rest
+        unrounded = sum(float(seller[name]) / scale * weight for name, scale, weight in zip(
+            service_app.SCORE_FEATURES, service_app.SCORE_SCALES, service_app.SCORE_WEIGHTS
+        ))
+        if abs(unrounded * 1000 % 1 - 0.5) < 1e-6 or rng.random() < 0.2:
+            sellers.append(seller)
+    catalog = service_app.CatalogSnapshot([], sellers)
+    monkeypatch.setattr(service_app.matching_service, '_catalog', catalog)
+
+    candidates = [(seller, [{}] * (i % 7)) for i, seller in enumerate(catalog.sellers)]
+    service = service_app.matching_service
+    expected = [
+        service._calculate_relevance_score({**seller, 'matching_products': products})
+        for seller, products in candidates
+    ]
+    assert service._score_sellers(candidates) == expected
+    assert expected[0] == 0.497
+
+
+def test_proximity_reads_the_snapshot_without_modifying_it(service_app, dynamodb, monkeypatch):
+    service = service_app.matching_service
+    catalog = service.get_catalog()
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+    sellers_table.reads.clear()
+
+    nearby = service.find_sellers_by_proximity('Kaduna', 200, 'Cattle Sokoto Gudali')
+
+    assert [(s['SellerId'], s['distance_km']) for s in nearby] == [('SELL1001', 0.0), ('SELL1002', 72.01)]
+    assert sellers_table.reads == []
+    assert all('distance_km' not in seller for seller in catalog.sellers)
+
+    monkeypatch.setitem(service.config, 'catalog_snapshot_enabled', False)
+    from_table = service.find_sellers_by_proximity('Kaduna', 200, 'Cattle Sokoto Gudali')
+    assert [(s['SellerId'], s['distance_km']) for s in from_table] == [('SELL1001', 0.0), ('SELL1002', 72.01)]
+    assert all('distance_km' not in item for item in sellers_table.items.values())
+
+
+def test_popular_products_always_send_cache_control(service_app, monkeypatch):
+    service = service_app.matching_service
+    with Client(service_app.app) as client:
+        fresh = client.http.get('/insights/popular-products')
+        revalidated = client.http.get('/insights/popular-products', headers={'If-None-Match': fresh.headers['ETag']})
+
+        monkeypatch.setitem(service.config, 'catalog_snapshot_enabled', False)
+        without_snapshot = client.http.get('/insights/popular-products')
+
+        monkeypatch.setattr(service, 'get_catalog', lambda: 1 / 0)
+        failed = client.http.get('/insights/popular-products')
+
+    assert (fresh.status_code, revalidated.status_code) == (200, 304)
+    assert fresh.headers['Cache-Control'] == revalidated.headers['Cache-Control'] == 'public, max-age=60'
+    assert without_snapshot.status_code == 200
+    assert 'ETag' not in without_snapshot.headers
+    assert without_snapshot.headers['Cache-Control'] == 'public, max-age=60'
+    assert without_snapshot.json_body == fresh.json_body
+    assert failed.status_code == 500
+    assert failed.headers['Cache-Control'] == 'no-store'
+
+
+@pytest.mark.parametrize('body', [[], ['Find cattle'], 'x', 42])
+def test_batch_search_rejects_non_object_bodies(service_app, body):
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search/batch', body)
+
+    assert response.status_code == 400
+    assert response.json_body == {'error': 'Request body must be a JSON object with "queries"'}
+
+
+def test_batch_search_answers_each_query_in_order(service_app):
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search/batch', {'queries': ['Fish Catfish', '', 'Fish Catfish']})
+
+    results = response.json_body['results']
+    assert response.status_code == 200
+    assert [('response' in r, 'error' in r) for r in results] == [(True, False), (False, True), (True, False)]
+    assert results[0]['response'] == results[2]['response']
+    assert response.json_body['unique_searches'] == 1
+
+
+def test_a_failed_catalog_load_is_not_retried_until_the_backoff_passes(service_app, monkeypatch):
+    service = service_app.matching_service
+    attempts = []
+    def failing_load():
+        attempts.append(1)
+        raise RuntimeError('ProvisionedThroughputExceededException')
+    monkeypatch.setattr(service, '_load_catalog', failing_load)
+
+    with Client(service_app.app) as client:
+        first = post_json(client, '/search', {'query': 'Cattle Sokoto Gudali in Kaduna'})
+        second = post_json(client, '/search', {'query': 'Goat Sokoto Red in Abuja'})
+
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert first.json_body['sellers']
+    assert len(attempts) == 1
+
+    # Once the backoff has passed the next call loads the snapshot again
+    monkeypatch.setattr(service, '_catalog_load_failed_at', service._catalog_load_failed_at - service.config['catalog_retry_seconds'])
+    monkeypatch.setattr(service, '_load_catalog', lambda: service_app.CatalogSnapshot([], []))
+    assert service.get_catalog() is not None
+    assert service._catalog_load_failed_at is None
+
+
+def _put_version_items(service_app, dynamodb, products_version, sellers_version):
+    for name, key_name, version in ((PRODUCTS_TABLE_NAME, 'ProductId', products_version),
+                                    (SELLERS_TABLE_NAME, 'SellerId', sellers_version)):
+        dynamodb.Table(name).put_item(Item={key_name: service_app.CATALOG_VERSION_KEY,
+                                            service_app.CATALOG_VERSION_ATTRIBUTE: version})
+
+
+def test_refresh_skips_the_scans_while_the_table_versions_are_unchanged(service_app, dynamodb):
+    _put_version_items(service_app, dynamodb, 'p1', 's1')
+    service = service_app.matching_service
+    products_table, sellers_table = dynamodb.Table(PRODUCTS_TABLE_NAME), dynamodb.Table(SELLERS_TABLE_NAME)
+    catalog = service.get_catalog()
+    products_table.reads.clear()
+    sellers_table.reads.clear()
+
+    service._refresh_catalog()
+
+    assert service.get_catalog() is catalog
+    assert products_table.reads == sellers_table.reads == [('batch_get_item', None)]
+
+
+def test_refresh_rescans_once_a_table_version_changes(service_app, dynamodb):
+    _put_version_items(service_app, dynamodb, 'p1', 's1')
+    service = service_app.matching_service
+    catalog = service.get_catalog()
+    dynamodb.Table(SELLERS_TABLE_NAME).items['SELL1001']['Rating'] = Decimal('1.1')
+    _put_version_items(service_app, dynamodb, 'p1', 's2')
+
+    service._refresh_catalog()
+
+    refreshed = service.get_catalog()
+    assert refreshed is not catalog
+    assert refreshed.table_versions == ('p1', 's2')
+    assert refreshed.sellers_by_id['SELL1001']['Rating'] == 1.1
+
+
+@pytest.mark.parametrize('segments', [1, 2])
+def test_scans_leave_out_the_version_items(service_app, dynamodb, segments):
+    _put_version_items(service_app, dynamodb, 'p1', 's1')
+    service = service_app.matching_service
+    products_table = dynamodb.Table(PRODUCTS_TABLE_NAME)
+
+    scanned = list(service._scan_items(products_table, total_segments=segments))
+
+    assert sorted(item['ProductId'] for item in scanned) == sorted(products_table.items.keys() - {service_app.CATALOG_VERSION_KEY})
+    assert service_app.CATALOG_VERSION_KEY not in service.get_catalog().sellers_by_id
+
+
+def test_segmented_scans_return_every_item_exactly_once(service_app, dynamodb):
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+    for i in range(20):
+        sellers_table.put_item(Item=dict(sellers_table.items['SELL1001'], SellerId=f"SELL3{i:03d}"))
+    sellers_table.reads.clear()
+
+    scanned = list(service_app.matching_service._scan_items(sellers_table, total_segments=4))
+
+    assert sorted(seller['SellerId'] for seller in scanned) == sorted(sellers_table.items)
+    # 24 sellers in 4 segments of 6, each read in pages of 3
+    assert len(sellers_table.reads) == 8
+
+
+def test_a_failing_scan_segment_raises_to_the_caller(service_app, dynamodb, monkeypatch):
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+    scan = sellers_table.scan
+    def failing_scan(**params):
+        if params.get('Segment') == 1:
+            raise RuntimeError('ProvisionedThroughputExceededException')
+        return scan(**params)
+    monkeypatch.setattr(sellers_table, 'scan', failing_scan)
+
+    with pytest.raises(RuntimeError, match='ProvisionedThroughputExceededException'):
+        list(service_app.matching_service._scan_items(sellers_table, total_segments=2))
+
+
+def _add_broiler_sellers(dynamodb, count):
+    products, sellers = dynamodb.Table(PRODUCTS_TABLE_NAME), dynamodb.Table(SELLERS_TABLE_NAME)
+    for i in range(count):
+        seller = dict(sellers.items['SELL1001'], SellerId=f"SELL20{i:02d}", Rating=Decimal(f"3.{i}"))
+        sellers.put_item(Item=seller)
+        products.items['SKU0004']['SellerIds'].append(seller['SellerId'])
+
+
+def test_search_cursors_page_through_the_ranking_without_overlap(service_app, dynamodb):
+    _add_broiler_sellers(dynamodb, 3)
+    with Client(service_app.app) as client:
+        everything = post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 10}).json_body
+        pages = [post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 2}).json_body]
+        while 'next_cursor' in pages[-1]:
+            pages.append(post_json(client, '/search', {'cursor': pages[-1]['next_cursor']}).json_body)
+
+    assert [len(page['sellers']) for page in pages] == [2, 2, 1]
+    assert [seller for page in pages for seller in page['sellers']] == everything['sellers']
+    assert 'next_cursor' not in everything
+
+
+def test_search_rejects_tampered_cursors(service_app, dynamodb):
+    _add_broiler_sellers(dynamodb, 3)
+    with Client(service_app.app) as client:
+        cursor = post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 2}).json_body['next_cursor']
+        payload = service_app.decode_cursor(cursor)
+        forged = service_app.encode_cursor(dict(payload, offset=0)).split('.')[0] + '.' + cursor.split('.')[1]
+        responses = [post_json(client, '/search', {'cursor': value}) for value in (forged, cursor + 'x', 'garbage')]
+
+    for response in responses:
+        assert response.status_code == 400
+        assert response.json_body == {'error': 'Invalid cursor'}
+
+
+def test_search_rejects_cursors_from_an_older_catalog_version(service_app, dynamodb):
+    _add_broiler_sellers(dynamodb, 3)
+    service = service_app.matching_service
+    with Client(service_app.app) as client:
+        cursor = post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 2}).json_body['next_cursor']
+        dynamodb.Table(SELLERS_TABLE_NAME).items['SELL2000']['Rating'] = Decimal('4.9')
+        service._refresh_catalog()
+        response = post_json(client, '/search', {'cursor': cursor})
+
+    assert response.status_code == 400
+    assert response.json_body == {'error': 'Search results have changed since this cursor was issued; start a new search'}
+
+
+def test_search_without_a_signing_key_issues_no_cursors(service_app, dynamodb, monkeypatch):
+    _add_broiler_sellers(dynamodb, 3)
+    with Client(service_app.app) as client:
+        cursor = post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 2}).json_body['next_cursor']
+        monkeypatch.setattr(service_app, 'CURSOR_SIGNING_KEY', None)
+        service_app.search_response_cache.invalidate()
+        first_page = post_json(client, '/search', {'query': 'Poultry Broiler', 'limit': 2})
+        with_cursor = post_json(client, '/search', {'cursor': cursor})
+
+    assert len(first_page.json_body['sellers']) == 2
+    assert 'next_cursor' not in first_page.json_body
+    assert with_cursor.status_code == 400
+
+
+def _record_batch_gets(dynamodb, monkeypatch, unprocessed=lambda keys: []):
+    """Record the keys of every BatchGetItem request, leaving unprocessed(keys) of each unread"""
+    requests = []
+    read = dynamodb.batch_get_item
+    def batch_get_item(RequestItems):
+        (name, request), = RequestItems.items()
+        requests.append(list(request['Keys']))
+        left = unprocessed(request['Keys'])
+        response = read({name: {'Keys': [key for key in request['Keys'] if key not in left]}})
+        response['UnprocessedKeys'] = {name: {'Keys': left}} if left else {}
+        return response
+    monkeypatch.setattr(dynamodb, 'batch_get_item', batch_get_item)
+    return requests
+
+
+def test_batch_gets_send_at_most_100_unique_keys_per_request(service_app, dynamodb, monkeypatch):
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+    for i in range(250):
+        sellers_table.put_item(Item=dict(sellers_table.items['SELL1001'], SellerId=f"SELL3{i:03d}"))
+    seller_ids = [f"SELL3{i:03d}" for i in range(250)]
+    requests = _record_batch_gets(dynamodb, monkeypatch)
+
+    sellers = service_app.matching_service._batch_get_by_ids(sellers_table, 'SellerId', seller_ids + seller_ids[::2])
+
+    assert sorted(len(keys) for keys in requests) == [50, 100, 100]
+    assert sorted(key['SellerId'] for keys in requests for key in keys) == seller_ids
+    assert sorted(seller['SellerId'] for seller in sellers) == seller_ids
+
+
+def test_batch_gets_retry_unprocessed_keys_until_every_item_is_read(service_app, dynamodb, monkeypatch):
+    monkeypatch.setattr(service_app, 'BATCH_GET_BASE_DELAY_SECONDS', 0)
+    requests = _record_batch_gets(dynamodb, monkeypatch, unprocessed=lambda keys: keys[1:])
+    seller_ids = ['SELL1001', 'SELL1002', 'SELL1003']
+
+    sellers = service_app.matching_service._batch_get_by_ids(dynamodb.Table(SELLERS_TABLE_NAME), 'SellerId', seller_ids)
+
+    assert [len(keys) for keys in requests] == [3, 2, 1]
+    assert [seller['SellerId'] for seller in sellers] == seller_ids
+
+
+def test_batch_gets_raise_once_the_retries_are_exhausted(service_app, dynamodb, monkeypatch):
+    monkeypatch.setattr(service_app, 'BATCH_GET_BASE_DELAY_SECONDS', 0)
+    requests = _record_batch_gets(dynamodb, monkeypatch, unprocessed=lambda keys: keys)
+    sellers_table = dynamodb.Table(SELLERS_TABLE_NAME)
+
+    with pytest.raises(service_app.ServiceError, match=f"BatchGetItem left 2 keys unprocessed on {SELLERS_TABLE_NAME}"):
+        service_app.matching_service._batch_get_items(sellers_table, [{'SellerId': 'SELL1001'}, {'SellerId': 'SELL1002'}])
+
+    assert len(requests) == service_app.BATCH_GET_MAX_RETRIES + 1
+
+
+@pytest.fixture
+def search_cache(service_app, monkeypatch):
+    """A two-entry, one-second response cache on a clock the test moves"""
+    clock = [1000.0]
+    monkeypatch.setattr(service_app.time, 'monotonic', lambda: clock[0])
+    cache = service_app.SearchResponseCache(max_size=2, ttl_seconds=1)
+    monkeypatch.setattr(service_app, 'search_response_cache', cache)
+    cache.clock = clock
+    return cache
+
+
+def test_search_cache_drops_its_responses_when_the_catalog_version_changes(service_app, dynamodb, search_cache):
+    with Client(service_app.app) as client:
+        first = post_json(client, '/search', {'query': 'Poultry Broiler'}).json_body
+        post_json(client, '/search', {'query': 'Poultry Broiler'})
+        dynamodb.Table(SELLERS_TABLE_NAME).items['SELL1001']['Rating'] = Decimal('1.1')
+        service_app.matching_service._refresh_catalog()
+        changed = post_json(client, '/search', {'query': 'Poultry Broiler'}).json_body
+
+    assert (search_cache.hits, search_cache.misses, search_cache.invalidations) == (1, 2, 1)
+    assert changed != first
+
+
+def test_search_cache_responses_expire_after_the_ttl(service_app, search_cache):
+    with Client(service_app.app) as client:
+        post_json(client, '/search', {'query': 'Poultry Broiler'})
+        search_cache.clock[0] += 1
+        post_json(client, '/search', {'query': 'Poultry Broiler'})
+        search_cache.clock[0] += 1.5
+        post_json(client, '/search', {'query': 'Poultry Broiler'})
+
+    assert (search_cache.hits, search_cache.misses) == (1, 2)
+
+
+def test_search_cache_evicts_the_least_recently_used_response(service_app, search_cache):
+    queries = ['Poultry Broiler', 'Goat Sokoto Red', 'Cattle Sokoto Gudali']
+    with Client(service_app.app) as client:
+        for query in queries[:2] + queries[:1] + queries[2:]:
+            post_json(client, '/search', {'query': query})
+        misses = search_cache.misses
+        post_json(client, '/search', {'query': queries[0]})
+        assert search_cache.misses == misses
+        post_json(client, '/search', {'query': queries[1]})
+
+    assert search_cache.misses == misses + 1
+    assert search_cache.stats()['size'] == 2
+
+
+def test_search_cache_skips_responses_built_for_a_replaced_catalog(service_app, dynamodb, search_cache, monkeypatch):
+    search = service_app._search
+    def search_while_the_catalog_changes(params, offset, limit, version):
+        response = search(params, offset, limit, version)
+        # Another request sees the new snapshot before this one stores its response
+        dynamodb.Table(SELLERS_TABLE_NAME).items['SELL1001']['Rating'] = Decimal('1.1')
+        service_app.matching_service._refresh_catalog()
+        search_cache.get(service_app.matching_service.get_catalog().version, 'another search')
+        return response
+    monkeypatch.setattr(service_app, '_search', search_while_the_catalog_changes)
+
+    with Client(service_app.app) as client:
+        response = post_json(client, '/search', {'query': 'Poultry Broiler'})
+
+    assert response.status_code == 200
+    assert search_cache.stats()['size'] == 0
@@ -0,0 +1,107 @@
+"""
+Unit tests for /search query parsing: canonicalization, the parse cache and
+the fuzzy typo index, checked against the regex reference parser.
+"""
+import pytest
+
+import app
+
+EMPTY_PARSE = {
+    'livestock_type': None,
+    'location': {},
+    'price_range': {},
+    'quantity': {},
+    'quality_requirements': {},
+}
+
+
+@pytest.mark.parametrize('query, plain', [
+    ('Cattle under ₦40,000!', 'cattle under 40000'),
+    ('Find goats under 1,50,000 in Kaduna.', 'find goats under 150000 in kaduna'),
+    ('Show me sheep below ₦1,200,000?', 'show me sheep below 1200000'),
+    ('I need 2.5 tons of fish, in Lagos.', 'i need 2.5 tons of fish in lagos'),
+    ('Top-rated Poultry Broiler sellers; under 5,000', 'top rated poultry broiler sellers under 5000'),
+    ('Sheep (Yankasa) in Kano state...', 'sheep (yankasa) in kano state'),
+])
+def test_punctuated_queries_parse_like_their_plain_form(query, plain):
+    assert app.canonical_query(query) == plain
+    assert app.parse_query(query) == app._extract_simple_parameters_regex(plain)
+
+
+def test_comma_grouped_prices_stay_one_number():
+    assert app.canonical_query('under ₦1,50,000') == 'under 150000'
+    assert app.parse_query('cattle under 1,50,000')['price_range'] == {'max': 150000}
+
+
+@pytest.mark.parametrize('query', ['. ?', '!!!', '₦ ,'])
+def test_punctuation_only_queries_parse_as_empty(query):
+    assert app.parse_query(query) == EMPTY_PARSE
+
+
+@pytest.mark.parametrize('query', ['', '   '])
+def test_blank_queries_are_rejected(query):
+    with pytest.raises(app.ValidationError):
+        app.parse_query(query)
+
+
+@pytest.mark.parametrize('word, term', [
+    ('catle', 'cattle'),
+    ('goaats', 'goats'),
+    ('kadunna', 'kaduna'),
+    ('yannkasa', 'yankasa'),
+    ('chikcens', 'chickens'),
+])
+def test_misspelled_vocabulary_words_are_corrected(word, term):
+    assert app.nearest_vocabulary_term(word) == term
+
+
+@pytest.mark.parametrize('word', [
+    'steep', 'crows', 'sheer', 'sheen', 'while', 'write', 'lamps', 'dulls', 'lulls',
+    'fished', 'fisher', 'legos', 'between', 'under',
+])
+def test_english_words_are_never_corrected(word):
+    assert app.nearest_vocabulary_term(word) is None
+
+
+def test_short_words_are_corrected_by_one_edit_only():
+    assert app.nearest_vocabulary_term('shepp') == 'sheep'
+    assert app.nearest_vocabulary_term('shpep') == 'sheep'
+    assert app.nearest_vocabulary_term('shxxp') is None
+    assert app.nearest_vocabulary_term('gxaxs') is None
+
+
+@pytest.mark.parametrize('query', [
+    'Steep hills in Kano',
+    'Crows near Zaria',
+    'Sheer luck under 50000',
+    'Fished in Lagos',
+    'Find chickkenns in Lagos',
+])
+def test_english_words_and_two_edit_guesses_set_no_livestock_type(query):
+    assert app.parse_query(query)['livestock_type'] is None
+
+
+@pytest.mark.parametrize('query, livestock_type', [
+    ('Find catle sellers', 'Cattle Sokoto Gudali'),
+    ('Find a catle seller in Kano', 'Cattle Sokoto Gudali'),
+    ('tilapai in lagso', 'Fish Tilapia'),
+    ('chikens in lagos', 'Poultry Broiler'),
+    ('broilrs under 5000', 'Poultry Broiler'),
+    ('Find goaats in Kaduna', 'Goat Sokoto Red'),
+    ('yankassaa near Zaria', 'Sheep Yankasa'),
+    ('chickkenns for my farm in Lagos', 'Poultry Broiler'),
+])
+def test_corrections_set_livestock_type(query, livestock_type):
+    assert app.parse_query(query)['livestock_type'] == livestock_type
+
+
+def test_typo_corrected_queries_fill_both_type_and_location():
+    params = app.parse_query('tilapai in lagso')
+    assert params['location'] == app.parse_query('Fish Tilapia in Lagos')['location']
+
+
+def test_misspelled_locations_are_corrected_without_a_livestock_cue():
+    params = app.parse_query('Sheep Yankasa in Kadunna')
+    assert params['livestock_type'] == 'Sheep Yankasa'
+    assert params['location'] == app.parse_query('Sheep Yankasa in Kaduna')['location']
+    assert app.parse_query('Sheep Yankasa in Legos')['location'] == {}
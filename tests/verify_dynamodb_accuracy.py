@@ -13,6 +13,8 @@ from collections import defaultdict
 os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
 
 API_URL = "https://mxu25s1yia.execute-api.eu-west-1.amazonaws.com/api"
+# Version item the data loader writes to each table alongside the catalog
+CATALOG_VERSION_KEY = '#catalog-version'
 
 class DynamoDBVerifier:
     def __init__(self):
@@ -30,11 +32,11 @@ class DynamoDBVerifier:
         
         # Load products
         products_response = self.products_table.scan()
-        self.db_products = products_response['Items']
+        self.db_products = [p for p in products_response['Items'] if p.get('ProductId') != CATALOG_VERSION_KEY]
         
         # Load sellers
         sellers_response = self.sellers_table.scan()
-        self.db_sellers = sellers_response['Items']
+        self.db_sellers = [s for s in sellers_response['Items'] if s.get('SellerId') != CATALOG_VERSION_KEY]
         
         print(f"✅ Loaded {len(self.db_products)} products and {len(self.db_sellers)} sellers")
         